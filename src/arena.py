@@ -0,0 +1,307 @@
+"""
+Arena: many snakes, many food items, one board.
+
+All snakes move at the same time. Each tick every snake takes its step,
+the tails that moved away are cleared, and then one pass over the heads
+checks them against a shared occupancy grid (one owner id per cell).
+Head-to-head, head-to-body and obstacle crashes are all decided in that
+pass, so a tick costs O(snakes) no matter how long the snakes are.
+"""
+import random
+from array import array
+
+from engine import Rules
+from freecells import FreeCells
+from snake import Snake
+
+EMPTY = 0
+OBSTACLE = -1  # snake ids are 1, 2, 3, ...
+
+
+class Arena:
+    """
+    The many-snake rules. Snakes are keyed by id (ids are positive ints,
+    picked by the caller or handed out by spawn()). Snakes listed in
+    bots steer themselves towards food; the rest are driven with turn().
+    """
+
+    def __init__(self, width=1200, height=1200, seed=None, rules=None, block_size=20,
+                 food_per_snake=0.25):
+        self.width = width
+        self.height = height
+        self.block_size = block_size
+        self.cols = width // block_size
+        self.rows = height // block_size
+        self.rules = rules or Rules()
+        self.rng = random.Random(seed)
+        self.food_per_snake = food_per_snake
+
+        self.grid = array("i", [EMPTY]) * (self.cols * self.rows)  # cell index -> owner
+        self.snakes = {}          # id -> Snake, in spawn order
+        self.scores = {}          # id -> score of the current life
+        self.bots = set()         # ids of the snakes steer_bots() drives
+        self.food = {}            # (x, y) -> is_special
+        self._food_index = FreeCells()  # the same food cells, for O(1) random picks
+        self._targets = {}        # bot id -> the food it is heading for
+        self.obstacle_cells = {}  # (x, y) -> True
+        self.ticks = 0
+        self.level = 1
+        self._next_id = 1
+
+        for _ in range(self.rules.start_obstacles):
+            self._add_random_obstacle()
+        self._top_up_food()
+
+    def _index(self, cell):
+        return (cell[1] // self.block_size) * self.cols + cell[0] // self.block_size
+
+    def _on_board(self, cell):
+        x, y = cell
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def tick_rate(self):
+        """Ticks per second: like the single-player game, +1 per level."""
+        return self.rules.base_speed + self.level - 1
+
+    # -- placing things -------------------------------------------------
+
+    def _random_free_cell(self, tries=64):
+        """A random empty cell without food, or None. Random probes first, then a scan."""
+        grid, food, size = self.grid, self.food, self.block_size
+        count = len(grid)
+        for _ in range(tries):
+            i = self.rng.randrange(count)
+            cell = (i % self.cols * size, i // self.cols * size)
+            if grid[i] == EMPTY and cell not in food:
+                return cell
+        start = self.rng.randrange(count)
+        for offset in range(count):
+            i = (start + offset) % count
+            cell = (i % self.cols * size, i // self.cols * size)
+            if grid[i] == EMPTY and cell not in food:
+                return cell
+        return None
+
+    def _add_food(self):
+        cell = self._random_free_cell()
+        if cell is not None:
+            self.food[cell] = self.rng.random() < self.rules.special_food_chance
+            self._food_index.release(cell)
+        return cell
+
+    def _take_food(self, cell):
+        """Remove eaten food from cell. Returns whether it was special (None if there was no food)."""
+        special = self.food.pop(cell, None)
+        if special is not None:
+            self._food_index.take(cell)
+        return special
+
+    def _top_up_food(self):
+        wanted = max(1, int(len(self.snakes) * self.food_per_snake))
+        while len(self.food) < wanted:
+            if self._add_food() is None:
+                break
+
+    def _add_random_obstacle(self):
+        cell = self._random_free_cell()
+        if cell is not None:
+            self.grid[self._index(cell)] = OBSTACLE
+            self.obstacle_cells[cell] = True
+        return cell
+
+    # -- snakes -------------------------------------------------------------
+
+    def spawn(self, snake_id=None, bot=False):
+        """
+        Put a new 3-long snake, heading right, on a free stretch of board.
+        Returns its id, or None if no room was found.
+        """
+        if snake_id is None:
+            snake_id = self._next_id
+        self._next_id = max(self._next_id, snake_id + 1)
+        if snake_id in self.snakes:
+            return snake_id
+
+        size = self.block_size
+        grid = self.grid
+        for _ in range(100):
+            cell = self._random_free_cell()
+            if cell is None:
+                return None
+            x, y = cell
+            body = [(x, y), (x - size, y), (x - 2 * size, y)]
+            # the body and a few cells ahead must be free
+            room = body[1:] + [(x + i * size, y) for i in range(1, 4)]
+            if all(self._on_board(c) and grid[self._index(c)] == EMPTY and c not in self.food for c in room):
+                break
+        else:
+            return None
+
+        snake = Snake(block_size=size)
+        snake.set_segments(body)
+        for c in body:
+            grid[self._index(c)] = snake_id
+        self.snakes[snake_id] = snake
+        self.scores[snake_id] = 0
+        if bot:
+            self.bots.add(snake_id)
+        self._top_up_food()
+        return snake_id
+
+    def remove(self, snake_id):
+        """Take a snake off the board and free its cells."""
+        self._clear_snake(snake_id)
+
+    def _clear_snake(self, snake_id):
+        snake = self.snakes.pop(snake_id, None)
+        if snake is None:
+            return
+        grid = self.grid
+        for cell in snake.segments:
+            if self._on_board(cell):
+                i = self._index(cell)
+                if grid[i] == snake_id:
+                    grid[i] = EMPTY
+        self.bots.discard(snake_id)
+        self._targets.pop(snake_id, None)
+
+    def turn(self, snake_id, direction):
+        snake = self.snakes.get(snake_id)
+        if snake is not None:
+            snake.change_direction(direction)
+
+    # -- bots -----------------------------------------------------------------
+
+    def steer_bots(self):
+        """
+        Point every bot at its food target, never onto an occupied cell
+        or off the board when there is a choice. O(1) per bot.
+        """
+        grid, food, size = self.grid, self.food, self.block_size
+        width, height = self.width, self.height
+        for snake_id in self.bots:
+            snake = self.snakes[snake_id]
+            target = self._targets.get(snake_id)
+            if target not in food:
+                target = self._targets[snake_id] = self._food_index.sample(self.rng)
+                if target is None:
+                    continue
+            x, y = snake.segments[0]
+            cur_dx, cur_dy = snake.next_direction
+            best = None
+            for dx, dy in ((size, 0), (-size, 0), (0, size), (0, -size)):
+                if dx == -cur_dx and dy == -cur_dy:
+                    continue
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height):
+                    continue
+                if grid[(ny // size) * self.cols + nx // size] != EMPTY:
+                    continue
+                distance = abs(target[0] - nx) + abs(target[1] - ny)
+                if best is None or distance < best[0]:
+                    best = (distance, (dx, dy))
+            if best is not None:
+                snake.change_direction(best[1])
+
+    # -- ticking --------------------------------------------------------------
+
+    def step(self):
+        """
+        Move every snake at once and resolve crashes and eating.
+        Returns (grew, dead, eaters, new_obstacles): ids of snakes that
+        did not drop their tail, ids that crashed (already removed), ids
+        that ate this tick, and obstacles added by a level-up.
+        """
+        self.ticks += 1
+        self.steer_bots()
+        grid = self.grid
+        size, cols = self.block_size, self.cols
+        width, height = self.width, self.height
+
+        moved = []
+        for snake_id, snake in self.snakes.items():
+            moved.append((snake_id, snake, snake.move()))
+
+        # tails leave first, so following another snake's tail is safe
+        grew = []
+        for snake_id, snake, tail in moved:
+            if tail is None:
+                grew.append(snake_id)
+            elif not snake.occupies(tail):
+                i = (tail[1] // size) * cols + tail[0] // size
+                if grid[i] == snake_id:
+                    grid[i] = EMPTY
+
+        # one pass over the heads against the grid
+        claimed = {}  # cell index -> id of the head that got there first
+        dead = set()
+        for snake_id, snake, _ in moved:
+            head = snake.segments[0]
+            x, y = head
+            if not (0 <= x < width and 0 <= y < height):
+                dead.add(snake_id)
+                continue
+            i = (y // size) * cols + x // size
+            owner = grid[i]
+            if owner == OBSTACLE or (owner != EMPTY and (owner != snake_id or snake._cells[head] > 1)):
+                dead.add(snake_id)  # obstacle, another body, or its own body
+                continue
+            other = claimed.get(i)
+            if other is not None:
+                dead.add(snake_id)  # head-to-head: both lose
+                dead.add(other)
+                continue
+            claimed[i] = snake_id
+
+        for i, snake_id in claimed.items():
+            if snake_id not in dead:
+                grid[i] = snake_id
+        for snake_id in dead:
+            self._clear_snake(snake_id)
+
+        # eating
+        rules = self.rules
+        eaters = []
+        for i, snake_id in claimed.items():
+            if snake_id in dead:
+                continue
+            head = (i % cols * size, i // cols * size)
+            special = self._take_food(head)
+            if special is None:
+                continue
+            eaters.append(snake_id)
+            snake = self.snakes[snake_id]
+            if special:
+                for _ in range(rules.special_food_growth):
+                    snake.grow()
+                self.scores[snake_id] += rules.special_food_points
+            else:
+                snake.grow()
+                self.scores[snake_id] += rules.food_points
+        if eaters or dead:
+            self._top_up_food()
+
+        # the board speeds up with its best living snake
+        new_obstacles = []
+        best = max((self.scores[s] for s in self.snakes), default=0)
+        new_level = best // rules.points_per_level + 1
+        if new_level > self.level:
+            self.level = new_level
+            for _ in range(rules.obstacles_per_level):
+                cell = self._add_random_obstacle()
+                if cell is not None:
+                    new_obstacles.append(cell)
+        return grew, sorted(dead), eaters, new_obstacles
+
+    def draw(self, screen, atlas=None):
+        """Draws obstacles, food and every snake."""
+        if atlas is None:
+            from sprites import SpriteAtlas  # imported here so the rules run without pygame
+            atlas = SpriteAtlas.get(self.block_size)
+        blits = [(atlas.obstacle, cell) for cell in self.obstacle_cells]
+        blits += [(atlas.special_food if special else atlas.food, cell) for cell, special in self.food.items()]
+        body = atlas.body
+        for snake in self.snakes.values():
+            blits += [(body, cell) for cell in snake.segments]
+            blits.append((atlas.head(snake.direction), snake.segments[0]))
+        screen.blits(blits, doreturn=False)
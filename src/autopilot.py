@@ -0,0 +1,263 @@
+"""
+Autopilot: steers the snake towards the food along a shortest safe path.
+
+Each tick it:
+1. keeps a distance-to-food map (walls, HUD band and obstacles
+   accounted for, the snake ignored), grown by an A* search from the
+   food towards the head only as far as the head's next cells. The
+   search is kept across ticks, so a tick usually settles a handful of
+   cells; a new obstacle is repaired in place, and only a moved food
+   starts a new search;
+2. takes the legal move that is closest to the food by that map, as
+   long as a flood fill from there can still reach the tail (or finds at
+   least as many free cells as the snake is long);
+3. when the budget runs out first, falls back to a cheap survival rule:
+   the legal move with the most open neighbours.
+"""
+import heapq
+import time
+from collections import deque
+
+INFINITY = float("inf")
+
+
+class Autopilot:
+    """Per-game decision maker; call decide(sim) once per tick."""
+
+    def __init__(self, budget=0.002):
+        # seconds per decision; None means no limit, which also makes the
+        # choices independent of machine speed (use it for simulations)
+        self.budget = budget
+        self.fallbacks = 0    # ticks decided by the survival rule
+        self._food = None     # the food the distance map is rooted at
+        self._obstacle_cells = None
+        self._obstacle_count = 0
+        self._dist = {}       # cell -> exact steps from the food, for settled cells
+        self._open = {}       # frontier cell -> best steps found so far
+        self._heap = []       # the frontier, keyed for the current head
+        self._target = None   # the head the heap is keyed for
+
+    # -- board helpers -------------------------------------------------
+
+    @staticmethod
+    def _steps(sim):
+        size = sim.snake.block_size
+        return ((0, -size), (0, size), (-size, 0), (size, 0))
+
+    @staticmethod
+    def _on_board(sim, cell):
+        x, y = cell
+        return 0 <= x < sim.width and sim.top_margin <= y < sim.height and cell not in sim.walls
+
+    # -- distance-to-food map, kept up to date incrementally ------------
+
+    def _neighbours(self, sim, cell):
+        """The cells next to cell that a path can use (snake ignored)."""
+        x, y = cell
+        obstacles, walls = sim.obstacle_cells, sim.walls
+        width, height, top = sim.width, sim.height, sim.top_margin
+        for dx, dy in self._steps(sim):
+            nxt = (x + dx, y + dy)
+            if 0 <= nxt[0] < width and top <= nxt[1] < height \
+                    and nxt not in obstacles and nxt not in walls:
+                yield nxt
+
+    def _reset_map(self, sim, food):
+        self._food = food
+        self._obstacle_cells = sim.obstacle_cells
+        self._obstacle_count = len(sim.obstacles)
+        self._dist = {}
+        self._open = {food: 0}
+        self._target = None
+
+    def _block(self, sim, cell):
+        """
+        A new obstacle on cell: forget only the distances whose every
+        shortest path ran through it, and put those cells back on the
+        frontier from their settled neighbours.
+        """
+        dist, open_g = self._dist, self._open
+        open_g.pop(cell, None)
+        if cell not in dist:
+            return  # nothing settled was reached through it
+        removed = {cell}
+        queue = deque([cell])
+        while queue:  # level by level, so a level's removals are known before the next
+            d = dist[queue[0]] + 1
+            parent = queue.popleft()
+            for nxt in self._neighbours(sim, parent):
+                if dist.get(nxt) != d or nxt in removed:
+                    continue
+                if any(dist.get(p) == d - 1 and p not in removed for p in self._neighbours(sim, nxt)):
+                    continue  # still one step behind another settled cell
+                removed.add(nxt)
+                queue.append(nxt)
+        for lost in removed:
+            del dist[lost]
+        removed.discard(cell)
+        for lost in removed | set(open_g):
+            best = min((dist[p] for p in self._neighbours(sim, lost) if p in dist), default=None)
+            if best is None:
+                open_g.pop(lost, None)
+            else:
+                open_g[lost] = best + 1
+        self._target = None
+
+    def _update_food_map(self, sim, targets, deadline):
+        """
+        Settle the distance from the food of the nearest cell in targets
+        (the head's next cells), so that it is known to be nearest. The
+        map is an A* search from the food towards the head, kept between
+        ticks: settled distances stay exact while the head moves, so a
+        tick usually settles a handful of cells. It restarts when the
+        food moves, and a new obstacle is repaired in place. Returns
+        False if the deadline passed first.
+        """
+        food = (sim.food.x, sim.food.y)
+        if food != self._food or sim.obstacle_cells is not self._obstacle_cells:
+            self._reset_map(sim, food)
+        elif len(sim.obstacles) > self._obstacle_count:
+            for obs in sim.obstacles[self._obstacle_count:]:
+                self._block(sim, (obs.x, obs.y))
+            self._obstacle_count = len(sim.obstacles)
+
+        dist, open_g = self._dist, self._open
+        size = sim.snake.block_size
+        head_x, head_y = head = sim.snake.segments[0]
+
+        def key(cell, g):
+            # Manhattan distance to the head, less the step onto a target:
+            # consistent, so a cell's distance is exact once it is popped,
+            # and the smallest key bounds every unsettled target's distance.
+            # Ties go to the deeper cell, which heads straight for the target.
+            h = (abs(cell[0] - head_x) + abs(cell[1] - head_y)) // size - 1
+            return (g + max(h, 0), -g, cell)
+
+        if head != self._target:
+            self._target = head
+            self._heap = [key(cell, g) for cell, g in open_g.items()]
+            heapq.heapify(self._heap)
+        heap = self._heap
+
+        best = min((dist[cell] for cell in targets if cell in dist), default=INFINITY)
+        expanded = 0
+        while heap and best > heap[0][0]:
+            if not expanded & 63 and time.perf_counter() > deadline:
+                return False
+            _, neg_g, cell = heapq.heappop(heap)
+            g = -neg_g
+            if open_g.get(cell) != g:
+                continue  # superseded by a shorter route
+            del open_g[cell]
+            dist[cell] = g
+            if cell in targets:
+                best = min(best, g)
+            for nxt in self._neighbours(sim, cell):
+                if nxt not in dist and g + 1 < open_g.get(nxt, INFINITY):
+                    open_g[nxt] = g + 1
+                    heapq.heappush(heap, key(nxt, g + 1))
+            expanded += 1
+        return True
+
+    # -- safety check ---------------------------------------------------
+
+    def _room_after(self, sim, head, deadline):
+        """
+        Flood fill from a would-be head. Returns True if it reaches the
+        tail or finds at least as many cells as the snake is long,
+        False if it is boxed in, None if the deadline passed first.
+        """
+        snake = sim.snake
+        tail = snake.segments[-1]
+        tail_moves = snake.grow_pending == 0 and head != (sim.food.x, sim.food.y)
+        need = len(snake.segments) + 1
+        obstacles = sim.obstacle_cells
+        walls = sim.walls
+        steps = self._steps(sim)
+        width, height, top = sim.width, sim.height, sim.top_margin
+
+        seen = {head}
+        queue = deque([head])
+        while queue:
+            x, y = queue.popleft()
+            for dx, dy in steps:
+                nxt = (x + dx, y + dy)
+                if nxt in seen:
+                    continue
+                if nxt == tail and tail_moves and len(seen) > 1:
+                    return True
+                if nxt in obstacles or nxt in walls or snake.occupies(nxt):
+                    continue
+                if not (0 <= nxt[0] < width and top <= nxt[1] < height):
+                    continue
+                seen.add(nxt)
+                if len(seen) >= need:
+                    return True
+                queue.append(nxt)
+            if len(seen) & 63 == 0 and time.perf_counter() > deadline:
+                return None
+        return False
+
+    # -- decision -------------------------------------------------------
+
+    def _legal_moves(self, sim):
+        """Moves that don't crash on the very next tick."""
+        snake = sim.snake
+        head_x, head_y = snake.segments[0]
+        cur_dx, cur_dy = snake.next_direction
+        tail = snake.segments[-1]
+        tail_moves = snake.grow_pending == 0
+        moves = []
+        for dx, dy in self._steps(sim):
+            if dx == -cur_dx and dy == -cur_dy:
+                continue  # can't reverse
+            cell = (head_x + dx, head_y + dy)
+            if not self._on_board(sim, cell) or cell in sim.obstacle_cells:
+                continue
+            if snake.occupies(cell) and not (cell == tail and tail_moves):
+                continue
+            moves.append(((dx, dy), cell))
+        return moves
+
+    def _open_neighbours(self, sim, cell):
+        count = 0
+        x, y = cell
+        for dx, dy in self._steps(sim):
+            nxt = (x + dx, y + dy)
+            if self._on_board(sim, nxt) and nxt not in sim.obstacle_cells and not sim.snake.occupies(nxt):
+                count += 1
+        return count
+
+    def decide(self, sim):
+        """Return the direction to take this tick (None keeps going)."""
+        deadline = INFINITY if self.budget is None else time.perf_counter() + self.budget
+        moves = self._legal_moves(sim)
+        if not moves:
+            return None  # nothing safe; let the game end
+
+        # nearest move first; the next one is only looked up if it isn't safe
+        dist = self._dist
+        remaining = {cell: direction for direction, cell in moves}
+        while remaining:
+            if not self._update_food_map(sim, remaining, deadline):
+                break  # out of time
+            cell = min(remaining, key=lambda cell: dist.get(cell, INFINITY))
+            direction = remaining.pop(cell)
+            room = self._room_after(sim, cell, deadline)
+            if room:
+                return direction
+            if room is None:
+                break  # out of time
+        else:
+            # every move looks boxed in: take the roomiest one
+            return self._survival_move(sim, moves)
+
+        self.fallbacks += 1
+        return self._survival_move(sim, moves)
+
+    def _survival_move(self, sim, moves):
+        """Cheap rule: the move with the most open neighbours, nearer food first."""
+        dist = self._dist
+        best = max(moves, key=lambda move: (self._open_neighbours(sim, move[1]),
+                                             -dist.get(move[1], INFINITY)))
+        return best[0]
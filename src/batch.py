@@ -0,0 +1,199 @@
+"""
+Batch self-play: run many headless games across a process pool and
+aggregate the results, for tuning the difficulty knobs in engine.Rules.
+
+    python batch.py --games 100000 --policy random --rule special_food_chance=0.3
+
+Game i always uses seed + i, so a run gives the same results no matter
+how many workers share it.
+"""
+import argparse
+import json
+import os
+import random
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from engine import Simulation, Rules
+from eventlog import log
+from bots import load_policy
+
+# one record per game, stored flat in an array of 64-bit ints
+RECORD_FIELDS = ("seed", "score", "level", "ticks", "length", "cause", "millis")
+CAUSES = (None, "wall", "obstacle", "self")  # cause 0 means the game hit max_ticks
+
+
+def _init_worker():
+    log.set_level("off")
+
+
+def play_chunk(policy_name, rules, first_seed, count, max_ticks=100000, width=600, height=600):
+    """
+    Play count games with seeds first_seed, first_seed + 1, ...
+    Returns their records as one flat array (see RECORD_FIELDS).
+    millis is how long the game would last in real time at the level tick rates.
+    """
+    factory = load_policy(policy_name)
+    rules = Rules(**rules)
+    sim = Simulation(width, height, seed=first_seed, rules=rules)
+    base_speed = rules.base_speed
+    records = array("q")
+
+    for seed in range(first_seed, first_seed + count):
+        sim.reset(seed)
+        policy = factory(random.Random(seed))
+        step = sim.step
+        seconds = 0.0
+        while sim.ticks < max_ticks:
+            seconds += 1.0 / (base_speed + sim.level - 1)
+            if not step(policy(sim)):
+                break
+        records.extend((seed, sim.score, sim.level, sim.ticks, len(sim.snake.segments),
+                        CAUSES.index(sim.end_cause), int(seconds * 1000)))
+    return records
+
+
+class BatchStats:
+    """Running totals and distributions over game records."""
+
+    def __init__(self):
+        self.games = 0
+        self.ticks = 0
+        self.scores = Counter()
+        self.levels = Counter()
+        self.causes = Counter()
+        self.lengths = Counter()
+        self.millis = 0
+
+    def add(self, records):
+        width = len(RECORD_FIELDS)
+        for i in range(0, len(records), width):
+            seed, score, level, ticks, length, cause, millis = records[i:i + width]
+            self.games += 1
+            self.ticks += ticks
+            self.scores[score] += 1
+            self.levels[level] += 1
+            self.causes[CAUSES[cause] or "max_ticks"] += 1
+            self.lengths[length] += 1
+            self.millis += millis
+
+    @staticmethod
+    def _percentiles(counter, fractions=(0.5, 0.9, 0.99)):
+        total = sum(counter.values())
+        result = {}
+        if not total:
+            return result
+        items = sorted(counter.items())
+        for fraction in fractions:
+            target = fraction * total
+            seen = 0
+            for value, count in items:
+                seen += count
+                if seen >= target:
+                    result[f"p{round(fraction * 100)}"] = value
+                    break
+        return result
+
+    def summary(self):
+        games = max(self.games, 1)
+        mean = sum(s * c for s, c in self.scores.items()) / games
+        variance = sum((s - mean) ** 2 * c for s, c in self.scores.items()) / games
+        return {
+            "games": self.games,
+            "ticks": self.ticks,
+            "score_mean": mean,
+            "score_stdev": variance ** 0.5,
+            "score_percentiles": self._percentiles(self.scores),
+            "score_max": max(self.scores) if self.scores else 0,
+            "length_percentiles": self._percentiles(self.lengths),
+            "mean_game_seconds": self.millis / games / 1000,
+            "levels": dict(sorted(self.levels.items())),
+            "end_causes": dict(self.causes),
+        }
+
+
+def run_batch(games, policy="random", rules=None, seed=0, workers=None, chunk_size=500,
+              max_ticks=100000, records_path=None):
+    """
+    Play games across worker processes and return the aggregated BatchStats.
+    Chunks are handed out a few at a time, and their records are folded
+    into the stats (and appended to records_path) as soon as they arrive.
+    """
+    rules = (rules or Rules()).as_dict()
+    workers = workers or os.cpu_count() or 1
+    stats = BatchStats()
+    chunks = [(seed + start, min(chunk_size, games - start)) for start in range(0, games, chunk_size)]
+    out = open(records_path, "ab") if records_path else None
+
+    def collect(records):
+        stats.add(records)
+        if out:
+            records.tofile(out)
+
+    level = log.level  # the single-process path runs here; give the caller its log back
+    try:
+        if workers == 1:
+            _init_worker()
+            for first_seed, count in chunks:
+                collect(play_chunk(policy, rules, first_seed, count, max_ticks))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                pending = set()
+                todo = iter(chunks)
+                while True:
+                    # keep every worker busy without queueing the whole run
+                    while len(pending) < workers * 2:
+                        chunk = next(todo, None)
+                        if chunk is None:
+                            break
+                        pending.add(pool.submit(play_chunk, policy, rules, chunk[0], chunk[1], max_ticks))
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+    finally:
+        log.set_level(level)
+        if out:
+            out.close()
+    return stats
+
+
+def _parse_rule(text):
+    name, value = text.split("=", 1)
+    if name not in Rules().as_dict():
+        raise argparse.ArgumentTypeError(f"unknown rule {name!r}")
+    return name, float(value) if "." in value else int(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many headless games and summarize them")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--policy", default="random", help="built-in bot name or module:function")
+    parser.add_argument("--rule", type=_parse_rule, action="append", default=[],
+                        help="override a Rules knob, e.g. special_food_chance=0.3 (repeatable)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, help="processes to use (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--max-ticks", type=int, default=100000)
+    parser.add_argument("--records", metavar="PATH", help="append raw int64 records to PATH")
+    parser.add_argument("--json", metavar="PATH", help="save the summary as JSON")
+    args = parser.parse_args()
+
+    rules = Rules(**dict(args.rule))
+    start = time.perf_counter()
+    stats = run_batch(args.games, args.policy, rules, args.seed, args.workers,
+                      args.chunk_size, args.max_ticks, args.records)
+    elapsed = time.perf_counter() - start
+
+    summary = stats.summary()
+    summary["rules"] = rules.as_dict()
+    summary["policy"] = args.policy
+    summary["elapsed_seconds"] = elapsed
+    print(json.dumps(summary, indent=2))
+    print(f"{stats.games / elapsed:.0f} games/s, {stats.ticks / elapsed:.0f} ticks/s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
@@ -0,0 +1,253 @@
+"""
+Benchmarks for the hot paths: simulation ticks, food/obstacle placement
+and drawing. Runs under SDL's dummy video driver, so no window is needed.
+
+    python benchmark.py --json results.json
+    python benchmark.py --compare results.json   # flags slowdowns
+
+Every result is a rate (higher is better), keyed by a readable name.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from engine import Simulation, HUD_HEIGHT
+from eventlog import log
+
+BLOCK = 20
+
+
+def _loop_cells(cols, rows):
+    """Cells around the edge of the board, clockwise from the top-left."""
+    top = [(c, 0) for c in range(cols)]
+    right = [(cols - 1, r) for r in range(1, rows)]
+    bottom = [(c, rows - 1) for c in range(cols - 2, -1, -1)]
+    left = [(0, r) for r in range(rows - 2, 0, -1)]
+    return [(c * BLOCK, HUD_HEIGHT + r * BLOCK) for c, r in top + right + bottom + left]
+
+
+def _loop_simulation(cols, rows, length=3, obstacles=0):
+    """
+    Build a simulation whose snake (of the given length) runs around the
+    edge of a cols x rows board forever, with obstacles everywhere else.
+    Returns (sim, turns) where turns maps a head cell to the direction
+    that keeps it on the loop.
+    """
+    loop = _loop_cells(cols, rows)
+    if length >= len(loop):
+        raise ValueError(f"snake of length {length} does not fit a {cols}x{rows} loop")
+    turns = {}
+    for i, (x, y) in enumerate(loop):
+        nx, ny = loop[(i + 1) % len(loop)]
+        turns[(x, y)] = (nx - x, ny - y)
+
+    sim = Simulation(cols * BLOCK, rows * BLOCK + HUD_HEIGHT)
+    sim.clear_obstacles()
+    for cell in sim.snake.segments:
+        sim.free_cells.release(cell)
+    sim.snake.set_segments(loop[i] for i in range(length - 1, -1, -1))
+    sim.snake.direction = turns[loop[length - 2]]
+    # keep food and new obstacles off the loop
+    for cell in loop:
+        sim.free_cells.take(cell)
+    if (sim.food.x, sim.food.y) in turns:
+        sim._respawn_food_safely()
+    for _ in range(obstacles):
+        sim._add_random_obstacle()
+    return sim, turns
+
+
+def bench_ticks(cols, rows, length=3, obstacles=0, ticks=20000):
+    """Simulation ticks per second for one board size, snake length and obstacle count."""
+    sim, turns = _loop_simulation(cols, rows, length, obstacles)
+    step = sim.step
+    snake = sim.snake
+    start = time.perf_counter()
+    for _ in range(ticks):
+        step(turns[snake.segments[0]])
+    elapsed = time.perf_counter() - start
+    assert not sim.game_over, "loop snake should never crash"
+    return ticks / elapsed
+
+
+def bench_placement(fill, cols=100, rows=98, repeats=2000):
+    """
+    Food respawns and obstacle placements per second once the given
+    fraction of the board is already taken.
+    """
+    sim = Simulation(cols * BLOCK, rows * BLOCK + HUD_HEIGHT)
+    total = len(sim.free_cells)
+    while len(sim.free_cells) > total * (1 - fill) + 1:
+        sim.free_cells.take(sim.free_cells.sample())
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        # give the old food cell back so the fill level stays put
+        sim.free_cells.release((sim.food.x, sim.food.y))
+        sim._respawn_food_safely()
+    food_rate = repeats / (time.perf_counter() - start)
+
+    adds = min(repeats, len(sim.free_cells) - 1)
+    start = time.perf_counter()
+    for _ in range(adds):
+        sim._add_random_obstacle()
+    obstacle_rate = adds / (time.perf_counter() - start)
+    return food_rate, obstacle_rate
+
+
+def bench_draw(dirty_rects, length=60, frames=500):
+    """Game.draw frames per second on the default 600x600 window."""
+    import pygame
+    from game import Game
+
+    game = Game(dirty_rects=dirty_rects)
+    sim, turns = _loop_simulation(game.width // BLOCK, (game.height - HUD_HEIGHT) // BLOCK, length)
+    sim.record_changes = dirty_rects
+    game.sim = sim
+    game.draw()
+
+    elapsed = 0.0
+    for _ in range(frames):
+        sim.step(turns[sim.snake.segments[0]])
+        start = time.perf_counter()
+        game.draw()
+        elapsed += time.perf_counter() - start
+    pygame.quit()
+    return frames / elapsed
+
+
+def bench_world_draw(cols, rows, frames=500):
+    """Game.draw frames per second in huge-board mode; should not depend on the world size."""
+    import pygame
+    from game import Game
+
+    game = Game(world_size=(cols, rows), seed=1)
+    game.sim.clear_obstacles()
+    for _ in range(cols * rows // 50):  # same obstacle density on every size
+        game.sim._add_random_obstacle()
+    elapsed = 0.0
+    for i in range(frames):
+        # slide the snake along a row so the camera scrolls
+        game.sim.snake.teleport_to(cols * 10 + (i % 40) * 20, rows * 10)
+        start = time.perf_counter()
+        game.draw()
+        elapsed += time.perf_counter() - start
+    pygame.quit()
+    return frames / elapsed
+
+
+def bench_vecenv(num_envs, steps=200):
+    """Board-ticks per second of the batched NumPy environment (random actions)."""
+    import numpy as np
+    from vecenv import VecEnv
+
+    env = VecEnv(num_envs, seed=1)
+    actions = np.random.default_rng(1).integers(-1, 4, size=(steps, num_envs))
+    start = time.perf_counter()
+    for row in actions:
+        env.step(row)
+    return num_envs * steps / (time.perf_counter() - start)
+
+
+def run_all(quick=False):
+    """Run every benchmark and return {name: rate}."""
+    ticks = 5000 if quick else 20000
+    repeats = 500 if quick else 2000
+    frames = 100 if quick else 500
+    results = {}
+
+    for cols, rows in [(30, 28), (100, 98), (300, 298)]:
+        results[f"ticks_per_s/board={cols}x{rows}/len=3"] = bench_ticks(cols, rows, ticks=ticks)
+    for length in [3, 100, 1000]:
+        results[f"ticks_per_s/board=300x298/len={length}"] = bench_ticks(300, 298, length, ticks=ticks)
+    for count in [0, 100, 1000, 5000]:
+        results[f"ticks_per_s/board=100x98/obstacles={count}"] = bench_ticks(100, 98, obstacles=count, ticks=ticks)
+
+    for fill in [0.0, 0.5, 0.9, 0.99]:
+        food_rate, obstacle_rate = bench_placement(fill, repeats=repeats)
+        results[f"food_respawns_per_s/fill={fill}"] = food_rate
+        results[f"obstacles_added_per_s/fill={fill}"] = obstacle_rate
+
+    results["frames_per_s/full"] = bench_draw(False, frames=frames)
+    results["frames_per_s/dirty_rects"] = bench_draw(True, frames=frames)
+    for cols, rows in [(50, 50), (2000, 2000)]:
+        results[f"frames_per_s/world={cols}x{rows}"] = bench_world_draw(cols, rows, frames=frames)
+    try:
+        import numpy  # noqa: F401  (the batched environment is optional)
+    except ImportError:
+        return results
+    for count in [1, 64, 4096]:
+        results[f"board_ticks_per_s/vecenv/envs={count}"] = bench_vecenv(count, steps=50 if quick else 200)
+    return results
+
+
+def _metadata():
+    """Where and on what the numbers were measured."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    try:
+        import pygame
+        pygame_version = pygame.version.ver
+    except ImportError:
+        pygame_version = None
+    return {
+        "commit": commit or None,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pygame": pygame_version,
+        "machine": platform.machine(),
+    }
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Print each rate next to the baseline one.
+    Returns the names that got slower by more than tolerance.
+    """
+    slower = []
+    for name, rate in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        change = rate / old - 1
+        flag = ""
+        if change < -tolerance:
+            slower.append(name)
+            flag = "  <-- slower"
+        print(f"{name:50s} {old:14.1f} -> {rate:14.1f}  {change:+7.1%}{flag}")
+    return slower
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the game's hot paths")
+    parser.add_argument("--json", help="save results to this file")
+    parser.add_argument("--compare", help="compare against results saved earlier")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="slowdown that counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    args = parser.parse_args()
+
+    log.set_level("off")  # game events would only add noise to the timings
+    results = run_all(quick=args.quick)
+    for name, rate in results.items():
+        print(f"{name:50s} {rate:14.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": _metadata(), "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        print()
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
@@ -0,0 +1,54 @@
+"""
+Bot policies for headless play.
+
+A policy factory takes a random.Random and returns a policy; a policy
+takes the Simulation and returns a direction to turn to, or None to
+keep going. Factories are looked up by name so they can be named on the
+command line and in worker processes.
+"""
+import importlib
+
+from autopilot import Autopilot
+
+DIRECTIONS = [(0, -20), (0, 20), (-20, 0), (20, 0)]
+
+
+def random_turns(rng):
+    """Turns at random every few ticks."""
+    def policy(sim):
+        if rng.random() < 0.2:
+            return rng.choice(DIRECTIONS)
+        return None
+    return policy
+
+
+def straight(rng):
+    """Never turns; a baseline for how long the board lets you live."""
+    def policy(sim):
+        return None
+    return policy
+
+
+def autopilot(rng):
+    """Shortest safe path to the food (see autopilot.py), no time limit so runs repeat exactly."""
+    return Autopilot(budget=None).decide
+
+
+POLICIES = {
+    "autopilot": autopilot,
+    "random": random_turns,
+    "straight": straight,
+}
+
+
+def load_policy(name):
+    """
+    Return the policy factory called name: a built-in name from POLICIES
+    or "module:function" for your own.
+    """
+    if name in POLICIES:
+        return POLICIES[name]
+    if ":" not in name:
+        raise ValueError(f"unknown policy {name!r}, expected one of {sorted(POLICIES)} or module:function")
+    module_name, attr = name.split(":", 1)
+    return getattr(importlib.import_module(module_name), attr)
@@ -0,0 +1,125 @@
+"""
+Camera and chunked background for boards bigger than the window.
+
+The world is drawn through a viewport that follows the snake's head.
+The background is cut into square chunks that are rendered on first
+sight and kept in a small LRU cache, so a frame costs the same on a
+50x50 board as on a 5000x5000 one.
+"""
+from collections import OrderedDict
+
+import pygame
+
+BACKGROUND_COLOR = (15, 15, 20)
+GRID_COLOR = (40, 40, 50)
+WALL_COLOR = (70, 70, 90)
+VOID_COLOR = (5, 5, 8)  # outside the world, when it is smaller than the view
+
+
+class Camera:
+    """
+    Maps world pixels to screen pixels for a view_width x view_height
+    viewport whose top-left corner sits at screen_pos on the screen.
+    """
+
+    def __init__(self, view_width, view_height, world_width, world_height, screen_pos=(0, 0)):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.screen_x, self.screen_y = screen_pos
+        self.x = 0  # world position of the viewport's top-left corner
+        self.y = 0
+
+    @property
+    def rect(self):
+        """The viewport on the screen."""
+        return pygame.Rect(self.screen_x, self.screen_y, self.view_width, self.view_height)
+
+    def follow(self, x, y, size=0):
+        """Center the view on a world point, without showing past the world's edges."""
+        self.x = max(0, min(x + size // 2 - self.view_width // 2, self.world_width - self.view_width))
+        self.y = max(0, min(y + size // 2 - self.view_height // 2, self.world_height - self.view_height))
+
+    def to_screen(self, x, y):
+        return (x - self.x + self.screen_x, y - self.y + self.screen_y)
+
+    def visible_cells(self, block_size):
+        """World (x0, y0, x1, y1) of the first and one-past-last visible cells."""
+        x0 = self.x - self.x % block_size
+        y0 = self.y - self.y % block_size
+        x1 = min(self.x + self.view_width, self.world_width)
+        y1 = min(self.y + self.view_height, self.world_height)
+        return x0, y0, x1, y1
+
+    def sees(self, x, y, size):
+        """True if a size x size block at world (x, y) is at least partly in view."""
+        return (x + size > self.x and x < self.x + self.view_width
+                and y + size > self.y and y < self.y + self.view_height)
+
+
+class ChunkedBackground:
+    """
+    Grid background for a world of any size, rendered chunk_cells x
+    chunk_cells cells at a time. At most maxsize chunks are kept;
+    the least recently drawn one is dropped first.
+    """
+
+    def __init__(self, world_width, world_height, block_size=20, chunk_cells=16, maxsize=64, walls=()):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.block_size = block_size
+        self.chunk_size = chunk_cells * block_size
+        self.maxsize = maxsize
+        self._chunks = OrderedDict()
+        self.walls = walls if len(walls) else None  # a map's walls (cells), baked into the chunks
+        self.renders = 0  # chunks rendered so far (cache misses)
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def _render(self, cx, cy):
+        size = self.chunk_size
+        left, top = cx * size, cy * size
+        surface = pygame.Surface((size, size))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(VOID_COLOR)
+        inside = pygame.Rect(0, 0, min(size, self.world_width - left), min(size, self.world_height - top))
+        surface.fill(BACKGROUND_COLOR, inside)
+        for x in range(0, inside.width, self.block_size):
+            pygame.draw.line(surface, GRID_COLOR, (x, 0), (x, inside.height - 1))
+        for y in range(0, inside.height, self.block_size):
+            pygame.draw.line(surface, GRID_COLOR, (0, y), (inside.width - 1, y))
+        if self.walls is not None:
+            walls, block = self.walls, self.block_size
+            for y in range(0, inside.height, block):
+                for x in range(0, inside.width, block):
+                    if (left + x, top + y) in walls:
+                        surface.fill(WALL_COLOR, (x, y, block, block))
+        self.renders += 1
+        return surface
+
+    def chunk(self, cx, cy):
+        """The surface for chunk (cx, cy), rendering it on first use."""
+        key = (cx, cy)
+        surface = self._chunks.get(key)
+        if surface is not None:
+            self._chunks.move_to_end(key)
+            return surface
+        surface = self._chunks[key] = self._render(cx, cy)
+        if len(self._chunks) > self.maxsize:
+            self._chunks.popitem(last=False)
+        return surface
+
+    def draw(self, screen, camera):
+        """Blit the chunks the camera can see."""
+        size = self.chunk_size
+        first_cx, first_cy = camera.x // size, camera.y // size
+        last_cx = (camera.x + camera.view_width - 1) // size
+        last_cy = (camera.y + camera.view_height - 1) // size
+        blits = []
+        for cy in range(first_cy, last_cy + 1):
+            for cx in range(first_cx, last_cx + 1):
+                blits.append((self.chunk(cx, cy), camera.to_screen(cx * size, cy * size)))
+        screen.blits(blits, doreturn=False)
@@ -0,0 +1,349 @@
+import copy
+import random
+from collections import deque
+from snake import Snake
+from food import Food
+from obstacle import Obstacle
+import freecells
+from eventlog import log
+from levelmap import LevelMap
+from snapshot import Snapshot
+
+HUD_HEIGHT = 40  # top band reserved for score/level, nothing spawns there
+
+
+class Rules:
+    """
+    The difficulty knobs, all in one place so simulations can try
+    different values. The defaults are the normal game.
+    """
+
+    def __init__(self, base_speed=10, special_food_chance=0.15, food_points=5,
+                 special_food_points=20, special_food_growth=3, points_per_level=20,
+                 start_obstacles=3, obstacles_per_level=1):
+        self.base_speed = base_speed                    # ticks per second at level 1 (+1 per level)
+        self.special_food_chance = special_food_chance
+        self.food_points = food_points
+        self.special_food_points = special_food_points
+        self.special_food_growth = special_food_growth  # segments added by special food
+        self.points_per_level = points_per_level
+        self.start_obstacles = start_obstacles
+        self.obstacles_per_level = obstacles_per_level
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+class Simulation:
+    """
+    Headless game rules.
+    Owns the snake, food, obstacles, score and level and advances
+    them one tick at a time. Never touches pygame, so it can run
+    on a machine without a display.
+    """
+
+    def __init__(self, width=600, height=600, top_margin=HUD_HEIGHT, seed=None, rules=None):
+        self.width = width
+        self.height = height
+        self.top_margin = top_margin
+        self.rules = rules or Rules()
+        self._empty_board = None  # every cell free but the walls; copied on each reset
+        # A designed map (levelmap.LevelMap) adds fixed walls, a spawn
+        # point and no-food zones; see load_map()
+        self.level_map = None
+        self.map_ref = None  # (file path, checksum) of level_map, recorded in snapshots
+        self.walls = ()
+        # When True, every cell whose contents change is appended to
+        # changed_cells so a renderer can redraw just those cells.
+        self.record_changes = False
+        # When True, every turn() is kept in inputs as (tick, direction)
+        # so the game can be saved as a replay.
+        self.record_inputs = False
+        # Bumped whenever the whole state is replaced (reset or restore),
+        # so views kept up to date tick by tick know to start over.
+        self.generation = 0
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """
+        Start a fresh game: new objects, score 0, level 1.
+        All randomness comes from self.rng, seeded with seed (a fresh
+        random seed when None), so the same seed and inputs always
+        replay the same game.
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.generation += 1
+        self.inputs = []
+        self.score = 0
+        self.level = 1
+        self.game_over = False
+        self.end_cause = None  # "wall", "obstacle" or "self" once the game is over
+        self.ticks = 0
+        self.changed_cells = []
+        self._create_objects()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, rules=None):
+        """A new simulation on the snapshot's board (and map), in the snapshot's state."""
+        width, height, top_margin, _ = snapshot.board
+        sim = cls(width, height, top_margin, seed=snapshot.seed, rules=rules)
+        if snapshot.level_map is not None:
+            sim.load_map(LevelMap.load(*snapshot.level_map))
+        sim.record_inputs = bool(snapshot.inputs)
+        sim.restore(snapshot)
+        return sim
+
+    def snapshot(self):
+        """
+        The current state as a Snapshot. Cheap: it shares the cell
+        tuples with the game instead of copying them, and leaves out the
+        free-cell index, which restore() rebuilds from the cells.
+        """
+        snake = self.snake
+        food = self.food
+        scalars = (self.ticks, self.score, self.level, self.game_over, self.end_cause,
+                   snake.grow_pending, snake.direction, food.x, food.y, food.is_special)
+        return Snapshot(
+            (self.width, self.height, self.top_margin, snake.block_size),
+            self.seed, self.rng.getstate(), scalars,
+            tuple(snake.segments), tuple(snake.turn_queue),
+            tuple(self.obstacle_cells), tuple(self.inputs) if self.record_inputs else (),
+            self.map_ref,
+        )
+
+    def restore(self, snapshot):
+        """Put the game back in a state taken with snapshot() on the same board size."""
+        (self.ticks, self.score, self.level, self.game_over, self.end_cause,
+         grow_pending, direction, food_x, food_y, special) = snapshot.scalars
+        self.seed = snapshot.seed
+        self.rng.setstate(snapshot.rng_state)
+        self.generation += 1
+
+        snake = self.snake
+        snake.set_segments(snapshot.segments)
+        snake.direction = direction
+        snake.turn_queue = deque(snapshot.turn_queue)
+        snake.grow_pending = grow_pending
+
+        food = self.food
+        food.x, food.y, food.is_special = food_x, food_y, special
+
+        cells = self.obstacle_cells
+        if tuple(cells) != snapshot.obstacles:
+            size = snake.block_size
+            self.obstacles = [cells.get(cell) or Obstacle(cell[0], cell[1], size=size)
+                              for cell in snapshot.obstacles]
+            self.obstacle_cells = {(obs.x, obs.y): obs for obs in self.obstacles}
+        # what the index samples depends only on the taken cells
+        free = self.free_cells = self._empty_board.copy()
+        for cell in snapshot.segments:
+            free.take(cell)
+        for cell in snapshot.obstacles:
+            free.take(cell)
+        free.take((food_x, food_y))
+        self.inputs = list(snapshot.inputs)
+        self.changed_cells = []
+
+    def clone(self):
+        """An independent copy of this simulation, for trying moves out."""
+        other = copy.copy(self)
+        other.rng = random.Random()
+        other.snake = Snake(block_size=self.snake.block_size)
+        other.food = copy.copy(self.food)
+        other.food.rng = other.rng
+        other.obstacle_cells = {}
+        other.restore(self.snapshot())
+        return other
+
+    def load_map(self, level_map):
+        """
+        Play on a designed map from now on, starting a new game with the
+        same seed. The map must cover the board below the HUD band.
+        Its walls are looked up in the map's bitmap, not copied into
+        obstacles; snapshots don't store them.
+        """
+        size = self.snake.block_size
+        if (level_map.cols * size, level_map.rows * size) != (self.width, self.height - self.top_margin):
+            raise ValueError(f"a {level_map.cols}x{level_map.rows} map doesn't fit this board")
+        level_map.check_spawn()
+        self.level_map = level_map
+        self.map_ref = (level_map.path, level_map.checksum())
+        self.walls = level_map.on_board(size, self.top_margin)
+        self._empty_board = freecells.for_board(self.width, self.height, size, self.top_margin, self.walls)
+        self.reset(self.seed)
+
+    def _mark(self, cell):
+        """Remember a changed cell for the renderer (only when asked to)."""
+        if self.record_changes:
+            self.changed_cells.append(cell)
+
+    def _create_objects(self):
+        """Create or reset all game objects."""
+        self.snake = Snake()
+        if self.level_map is not None:
+            self.snake.set_segments(self.walls.cell(col, row) for col, row in self.level_map.spawn_body())
+            (head_x, head_y), (next_x, next_y) = self.snake.segments[0], self.snake.segments[1]
+            self.snake.direction = (head_x - next_x, head_y - next_y)
+
+        # Every empty cell, kept up to date as things move or appear
+        if self._empty_board is None:
+            self._empty_board = freecells.for_board(
+                self.width, self.height, self.snake.block_size, self.top_margin)
+        self.free_cells = self._empty_board.copy()
+        for cell in self.snake.segments:
+            self.free_cells.take(cell)
+
+        # Food should respect HUD
+        self.food = Food(
+            block_size=self.snake.block_size,
+            width=self.width,
+            height=self.height,
+            top_margin=self.top_margin,
+            free_cells=self.free_cells,
+            rng=self.rng,
+            special_chance=self.rules.special_food_chance,
+            excluded=self.walls.no_food if self.level_map is not None else None,
+        )
+
+        # Game start with a few obstacles, but they don't overlap
+        self.obstacles = []
+        self.obstacle_cells = {}  # (x, y) -> Obstacle, one lookup per collision check
+        for _ in range(self.rules.start_obstacles):
+            self._add_random_obstacle()
+
+    def _update_level(self):
+        """Update level based on score, and trigger level-up effects."""
+        new_level = self.score // self.rules.points_per_level + 1  # every 20 points = new level: 1,2,3,...
+
+        if new_level > self.level:
+            self.level = new_level
+            self._on_level_up()
+
+    def _on_level_up(self):
+        """Effects when a new level is reached."""
+        log.info("level_up", level=self.level)
+        # Add a new random obstacle each level
+        for _ in range(self.rules.obstacles_per_level):
+            self._add_random_obstacle()
+
+    def _add_random_obstacle(self):
+        """Add a new obstacle at a random free grid position."""
+        cell = self.free_cells.sample(self.rng)
+        if cell is None:
+            log.warning("no_free_cell", placing="obstacle")
+            return
+
+        x, y = cell
+        self.add_obstacle(x, y)
+        log.debug("obstacle_added", x=x, y=y)
+
+    def add_obstacle(self, x, y):
+        """Put an obstacle on the (x, y) cell and index it."""
+        obs = Obstacle(x, y, size=self.snake.block_size)
+        self.obstacles.append(obs)
+        self.obstacle_cells[(x, y)] = obs
+        self.free_cells.take((x, y))
+        self._mark((x, y))
+        return obs
+
+    def clear_obstacles(self):
+        """Remove every obstacle and give their cells back."""
+        for cell in self.obstacle_cells:
+            self.free_cells.release(cell)
+        self.obstacles = []
+        self.obstacle_cells = {}
+
+    def _respawn_food_safely(self):
+        """
+        Respawn food on a free cell, so never on the snake or an obstacle.
+        """
+        if not self.food.respawn(self.free_cells):
+            log.warning("no_free_cell", placing="food")
+            return
+        self._mark((self.food.x, self.food.y))
+
+    def turn(self, direction):
+        """Ask the snake to turn on an upcoming tick (kept for replays)."""
+        if self.record_inputs:
+            self.inputs.append((self.ticks, direction))
+        self.snake.change_direction(direction)
+
+    def step(self, action=None):
+        """
+        Advance the game by one tick.
+        action is an optional (dx, dy) direction applied before moving.
+        Returns True while the game is still running.
+        """
+        if self.game_over:
+            return False
+
+        if action is not None:
+            self.turn(action)
+
+        tail = self.snake.move()
+        self.ticks += 1
+
+        # The head now covers its cell and a dropped tail frees one up.
+        # Done before the crash checks, so the index always matches the
+        # cells (restore() rebuilds it from them); a head off the board or
+        # on a wall is ignored, and one on an obstacle or the body was taken.
+        head = self.snake.head
+        self.free_cells.take(head)
+        if tail is not None and not self.snake.occupies(tail):
+            self.free_cells.release(tail)
+
+        # End the game if the snake hits the wall (or one of the map's walls)
+        if self.snake.is_out_of_bounds(self.width, self.height, top_margin=self.top_margin) \
+                or head in self.walls:
+            log.info("game_over", cause="wall", score=self.score)
+            self.game_over = True
+            self.end_cause = "wall"
+            return False
+
+        # End the game if the snake hits an obstacle
+        if head in self.obstacle_cells:
+            log.info("game_over", cause="obstacle", score=self.score)
+            self.game_over = True
+            self.end_cause = "obstacle"
+            return False
+
+        # End the game if the snake runs into itself
+        if self.snake.check_self_collision():
+            log.info("game_over", cause="self", score=self.score)
+            self.game_over = True
+            self.end_cause = "self"
+            return False
+
+        if self.record_changes:
+            # new head, old head (now body) and the dropped tail
+            self.changed_cells.append(head)
+            self.changed_cells.append(self.snake.segments[1])
+            if tail is not None:
+                self.changed_cells.append(tail)
+
+        # Check snake–food collision
+        if head == (self.food.x, self.food.y):
+            # Snake eats food
+            rules = self.rules
+            if self.food.is_special:
+                # Special food: big bonus
+                for _ in range(rules.special_food_growth):
+                    self.snake.grow()                   # grow by 3 segments total
+                self.score += rules.special_food_points  # +20 points
+                log.info("food_eaten", special=True, score=self.score)
+            else:
+                # Normal food
+                self.snake.grow()                       # +1 segment
+                self.score += rules.food_points          # +5 points
+                log.info("food_eaten", special=False, score=self.score)
+
+            # Respawn food somewhere safe (not on snake or obstacles)
+            self._respawn_food_safely()
+
+            # Update level
+            self._update_level()
+
+        return True
@@ -0,0 +1,91 @@
+import atexit
+import sys
+import threading
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING"}
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+
+
+class EventLog:
+    """
+    Structured game event log.
+    Each record is an event name plus key=value fields. Records below
+    the current level are dropped before anything is formatted, and kept
+    records are written in batches by a background thread, so the game
+    loop never waits on a slow terminal or pipe.
+    """
+
+    def __init__(self, level=INFO, stream=None, flush_interval=0.25):
+        self.level = level
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self._buffer = deque()
+        self._start = time.perf_counter()
+        self._thread = None
+        self._stop = threading.Event()
+        self._write_lock = threading.Lock()
+
+    def set_level(self, level):
+        """Set the level from a number or a name like "debug" or "off"."""
+        self.level = LEVELS[level] if isinstance(level, str) else level
+
+    def debug(self, event, **fields):
+        if DEBUG >= self.level:
+            self._record(DEBUG, event, fields)
+
+    def info(self, event, **fields):
+        if INFO >= self.level:
+            self._record(INFO, event, fields)
+
+    def warning(self, event, **fields):
+        if WARNING >= self.level:
+            self._record(WARNING, event, fields)
+
+    def _record(self, level, event, fields):
+        self._buffer.append((time.perf_counter() - self._start, level, event, fields))
+        if self._thread is None:
+            self._start_flusher()
+
+    def _start_flusher(self):
+        self._thread = threading.Thread(target=self._flush_loop, name="eventlog", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered so far."""
+        with self._write_lock:
+            buffer = self._buffer
+            lines = []
+            while buffer:
+                elapsed, level, event, fields = buffer.popleft()
+                parts = [f"{elapsed:9.3f}", LEVEL_NAMES[level], event]
+                parts.extend(f"{key}={value}" for key, value in fields.items())
+                lines.append(" ".join(parts))
+            if lines:
+                stream = self.stream or sys.stdout
+                stream.write("\n".join(lines) + "\n")
+                stream.flush()
+
+    def close(self):
+        """Stop the background thread and write what is left."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+
+
+# Shared log for the whole game. Quiet unless something goes wrong, so
+# importing the rules (tests, bots, tools) prints nothing; main.py and
+# server.py turn game events on with --log-level.
+log = EventLog(level=WARNING)
@@ -0,0 +1,293 @@
+"""
+Headless clip export: re-simulate a recorded game and render every tick
+through Game.draw onto SDL's dummy display, as fast as the CPU allows.
+
+    python export.py game.prrp clip.gif --start 300 --end 900
+    python export.py game.prrp frames/              # a PNG per tick
+    python export.py quick.snap clip.gif            # a saved game, from its recorded inputs
+
+Frames are written one at a time, so memory stays the same for a clip of
+any length. PNGs are saved by pygame. GIFs are encoded here: a fixed
+palette (a 6x6x6 color cube plus grays), and each frame is only the
+rectangle that changed since the previous one, with unchanged pixels
+transparent. GIF export needs numpy; PNG export doesn't.
+"""
+import argparse
+import os
+import struct
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from engine import HUD_HEIGHT
+from eventlog import log
+from replay import Replay, ReplayPlayer
+
+TRANSPARENT = 255  # palette index of unchanged pixels in GIF frames
+
+
+class PngSequence:
+    """Writes each frame as directory/frame_00000.png, frame_00001.png, ..."""
+
+    def __init__(self, directory, prefix="frame"):
+        self.directory = directory
+        self.prefix = prefix
+        self.frames = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, surface, duration):
+        pygame.image.save(surface, os.path.join(self.directory, f"{self.prefix}_{self.frames:05d}.png"))
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+def _palette():
+    """216 color-cube entries, 39 grays and the transparent slot."""
+    levels = (0, 51, 102, 153, 204, 255)
+    colors = [(r, g, b) for r in levels for g in levels for b in levels]
+    colors += [(v, v, v) for v in range(6, 255, 6) if v % 51][:39]
+    colors.append((0, 0, 0))
+    return colors
+
+
+def _lzw(indices, min_size=8):
+    """GIF-flavoured LZW of a bytes object of palette indices, as the packed code stream."""
+    clear, end = 1 << min_size, (1 << min_size) + 1
+    out = bytearray()
+    buffer = bits = 0
+    size = min_size + 1
+    next_code = end + 1
+    table = {}
+
+    def emit(code):
+        nonlocal buffer, bits, size
+        buffer |= code << bits
+        bits += size
+        while bits >= 8:
+            out.append(buffer & 0xFF)
+            buffer >>= 8
+            bits -= 8
+        if next_code >= 1 << size and size < 12:
+            size += 1
+
+    emit(clear)
+    prefix = indices[0]
+    for value in indices[1:]:
+        key = prefix << 8 | value
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        emit(prefix)
+        if next_code >= 4095:
+            emit(clear)
+            table = {}
+            next_code = end + 1
+            size = min_size + 1
+        else:
+            table[key] = next_code
+            next_code += 1
+        prefix = value
+    emit(prefix)
+    emit(end)
+    if bits:
+        out.append(buffer & 0xFF)
+    return out
+
+
+class GifWriter:
+    """
+    Streams an animated GIF. A frame is held back until the next one
+    arrives, so repeated frames just lengthen the one before them.
+    """
+
+    def __init__(self, path, width, height, loop=True):
+        import numpy as np  # imported here so PNG export runs without numpy
+
+        self.np = np
+        self.width = width
+        self.height = height
+        self.frames = 0
+        self.file = open(path, "wb")
+        palette = _palette()
+        # nearest palette entry for every 5-bit-per-channel color
+        channel = np.arange(32) * 8 + 4
+        grid = np.stack(np.meshgrid(channel, channel, channel, indexing="ij"), axis=-1).reshape(-1, 1, 3)
+        colors = np.array(palette[:TRANSPARENT], dtype=np.int32).reshape(1, -1, 3)
+        self._lut = ((grid - colors) ** 2).sum(axis=2).argmin(axis=1).astype(np.uint8)
+        # colors that are in the palette keep their own entry (the table
+        # would turn pure black into the darkest gray), looked up as 0xRRGGBB
+        rgb = np.array([r << 16 | g << 8 | b for r, g, b in palette[:TRANSPARENT]], dtype=np.uint32)
+        order = np.argsort(rgb)
+        self._exact_rgb = rgb[order]
+        self._exact_index = order.astype(np.uint8)
+        self._previous = None
+        self._pending = None  # (image block, seconds) not written yet
+        self._clock = 0.0     # seconds of frames handed in, for rounding delays without drift
+        self._written_cs = 0
+
+        header = b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF7, 0, 0)
+        header += bytes(value for color in palette for value in color)
+        if loop:
+            header += b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00"
+        self.file.write(header)
+
+    def _encode(self, surface):
+        """
+        The image block for a frame: the rectangle that changed since the
+        last frame, with unchanged pixels transparent. None if nothing did.
+        """
+        np = self.np
+        pixels = pygame.surfarray.pixels2d(surface).T  # (height, width) view of the mapped colors
+        previous = self._previous
+        self._previous = pixels.copy()
+        if previous is None:
+            top, left, bottom, right = 0, 0, self.height, self.width
+            changed = None
+        else:
+            changed = pixels != previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            if not len(rows):
+                return None
+            cols = np.flatnonzero(changed.any(axis=0))
+            top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            changed = changed[top:bottom, left:right]
+
+        # palette indices of the rectangle: exact palette colors as they
+        # are, anything else through the 5-bit-per-channel table
+        block = pixels[top:bottom, left:right]
+        rgb = np.zeros(block.shape, dtype=np.uint32)
+        for mask, shift, place in zip(surface.get_masks()[:3], surface.get_shifts()[:3], (16, 8, 0)):
+            rgb |= ((block & mask) >> shift) << place
+        packed = (rgb >> 9 & 0x7C00) | (rgb >> 6 & 0x3E0) | (rgb >> 3 & 0x1F)
+        indices = self._lut[packed]
+        keys = self._exact_rgb
+        found = np.minimum(np.searchsorted(keys, rgb), len(keys) - 1)
+        exact = keys[found] == rgb
+        indices[exact] = self._exact_index[found[exact]]
+        if changed is not None:
+            indices[~changed] = TRANSPARENT
+        del pixels, block  # unlock the surface
+
+        data = _lzw(indices.tobytes())
+        out = bytearray(struct.pack("<BHHHHB", 0x2C, left, top, right - left, bottom - top, 0))
+        out.append(8)
+        for start in range(0, len(data), 255):
+            chunk = data[start:start + 255]
+            out.append(len(chunk))
+            out += chunk
+        out.append(0)
+        return bytes(out)
+
+    def _flush(self):
+        image, seconds = self._pending
+        self._clock += seconds
+        delay = max(round(self._clock * 100) - self._written_cs, 2)  # viewers slow down anything under 2 cs
+        self._written_cs += delay
+        # graphic control: keep the previous frame under this one, index 255 is transparent
+        self.file.write(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0x05, delay, TRANSPARENT, 0))
+        self.file.write(image)
+        self.frames += 1
+
+    def write(self, surface, duration):
+        image = self._encode(surface)
+        if image is None and self._pending is not None:
+            pending, seconds = self._pending
+            self._pending = (pending, seconds + duration)
+            return
+        if self._pending is not None:
+            self._flush()
+        self._pending = (image, duration)
+
+    def close(self):
+        if self._pending is not None:
+            self._flush()
+            self._pending = None
+        self.file.write(b"\x3B")
+        self.file.close()
+
+
+def writer_for(path, width, height):
+    """A GifWriter for *.gif, otherwise a PngSequence in the path as a directory."""
+    if path.lower().endswith(".gif"):
+        return GifWriter(path, width, height)
+    return PngSequence(path)
+
+
+def replay_from_snapshot(snapshot):
+    """A Replay of a saved game up to its snapshot, from the inputs it recorded."""
+    width, height, top_margin, block_size = snapshot.board
+    return Replay(snapshot.seed, width, height, top_margin, snapshot.inputs,
+                  snapshot.ticks, snapshot.score, block_size, snapshot.level_map)
+
+
+def export_replay(replay, path, start=0, end=None, hold=1.0):
+    """
+    Render ticks start..end of a replay (to the end of the game by
+    default) into path. Each frame lasts one tick at that level's speed;
+    the last one is held for hold seconds. Returns the number of frames
+    rendered.
+    """
+    from game import Game  # imported here so the display driver is set first
+
+    player = ReplayPlayer(replay)
+    level_map = player.sim.level_map
+    if replay.top_margin == 0:
+        # a huge-board game: seen through the camera, like it was played
+        world_size = (replay.width // replay.block_size, replay.height // replay.block_size)
+        game = Game(seed=replay.seed, world_size=world_size, level_map=level_map)
+    elif replay.top_margin == HUD_HEIGHT:
+        game = Game(replay.width, replay.height, seed=replay.seed, level_map=level_map)
+    else:
+        raise ValueError(f"can't draw a board with a {replay.top_margin} px top margin")
+    game.sim = player.sim
+    player.seek(start)
+    end = replay.ticks if end is None else min(end, replay.ticks)
+    writer = writer_for(path, game.width, game.height)
+    frames = 0
+    try:
+        while True:
+            game.draw()
+            last = player.sim.ticks >= end or player.sim.game_over
+            writer.write(game.screen, hold if last else 1.0 / game.tick_rate())
+            frames += 1
+            if last:
+                break
+            player.step()
+    finally:
+        writer.close()
+        pygame.quit()
+    return frames
+
+
+def _load(path):
+    """A Replay from a replay file or a snapshot file."""
+    with open(path, "rb") as f:
+        magic = f.read(4)
+    if magic == b"PRSN":
+        from snapshot import Snapshot
+        snapshot = Snapshot.load(path)
+        if not snapshot.inputs:
+            raise SystemExit(f"{path}: this save has no recorded inputs to re-simulate")
+        return replay_from_snapshot(snapshot)
+    return Replay.load(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a recorded game to a GIF or a PNG sequence")
+    parser.add_argument("source", help="a replay (--record) or a saved game (--save)")
+    parser.add_argument("target", help="clip.gif, or a directory for PNG frames")
+    parser.add_argument("--start", type=int, default=0, help="first tick to render")
+    parser.add_argument("--end", type=int, help="last tick to render (default: the end of the game)")
+    args = parser.parse_args()
+
+    log.set_level("off")
+    replay = _load(args.source)
+    started = time.perf_counter()
+    frames = export_replay(replay, args.target, args.start, args.end)
+    elapsed = time.perf_counter() - started
+    print(f"{frames} frames in {elapsed:.1f}s ({frames / max(elapsed, 1e-9):.0f} frames/s) -> {args.target}")
@@ -1,62 +1,77 @@
-import pygame
 import random
+from eventlog import log
+
 class Food:
     """
     Represents the normal and special food
     that the snake eats.
     """
-    def __init__(self, block_size=20, width=600, height=600, top_margin=40):
+
+    MAX_TRIES = 256  # draws that may land in no-food zones before scanning instead
+
+    def __init__(self, block_size=20, width=600, height=600, top_margin=40, free_cells=None, rng=None,
+                 special_chance=0.15, excluded=None):
         self.block_size = block_size
+        self.excluded = excluded  # cell -> True where food must not go (a map's no-food zones)
+        self.special_chance = special_chance
+        self.rng = rng or random  # a seeded random.Random makes respawns repeatable
         self.width = width
         self.height = height
         self.top_margin = top_margin  # keep food below HUD
+
+        # grid positions never change, so build them once
+        self.x_positions = list(range(0, self.width, self.block_size))
+        min_y = max(self.top_margin, 0)
+        max_y = self.height - self.block_size
+        self.y_positions = list(range(min_y, max_y + 1, self.block_size))
+
         self.x = 0
         self.y = 0
         self.is_special = False
-        self.respawn()
+        self.respawn(free_cells)
 
-    def respawn(self):
+    def respawn(self, free_cells=None):
         """
         Places food at a new random position on the grid.
         Ensures it does NOT spawn under the top HUD bar.
-        Randomly decides if this food is special
+        With a FreeCells index the spot is picked from (and taken out of)
+        the free cells, so it never lands on anything.
+        Randomly decides if this food is special.
+        Returns False if there was no free cell left (outside the no-food zones).
         """
-        x_positions = list(range(0, self.width, self.block_size))
-        min_y = max(self.top_margin, 0)
-        max_y = self.height - self.block_size
-        y_positions = list(range(min_y, max_y + 1, self.block_size))
+        if free_cells is None:
+            self.x = self.rng.choice(self.x_positions)
+            self.y = self.rng.choice(self.y_positions)
+        else:
+            cell = free_cells.sample(self.rng)
+            if self.excluded is not None:
+                # draw again while the cell is in a no-food zone
+                for _ in range(self.MAX_TRIES):
+                    if cell is None or not self.excluded(cell):
+                        break
+                    cell = free_cells.sample(self.rng)
+                else:
+                    # the zones cover most of what is free: pick from a scan
+                    allowed = [c for c in free_cells if not self.excluded(c)]
+                    cell = self.rng.choice(allowed) if allowed else None
+            if cell is None:
+                return False
+            free_cells.take(cell)
+            self.x, self.y = cell
 
-        self.x = random.choice(x_positions)
-        self.y = random.choice(y_positions)
-        self.is_special = (random.random() < 0.15) #15% chance this food is special
+        self.is_special = (self.rng.random() < self.special_chance) #15% chance this food is special
 
-        kind = "SPECIAL" if self.is_special else "normal"
-        print(f"{kind} food respawned at ({self.x}, {self.y})")
+        log.debug("food_respawned", x=self.x, y=self.y, special=self.is_special)
+        return True
 
-    def draw(self, screen):
+    def draw(self, screen, atlas=None):
         """
         Draws the food:
         Normal: red circle
         Special: blue-gold circle
         """
-        center_x = self.x + self.block_size // 2
-        center_y = self.y + self.block_size // 2
-        radius = self.block_size // 2 - 2
-
-        if self.is_special:
-            pygame.draw.circle(screen, (0, 120, 255), (center_x, center_y), radius)
-            pygame.draw.circle(
-                screen,
-                (255, 215, 0),
-                (center_x - radius // 2, center_y - radius // 2),
-                3,
-            )
-        else:
-
-            pygame.draw.circle(screen, (220, 40, 40), (center_x, center_y), radius)
-            pygame.draw.circle(
-                screen,
-                (255, 255, 255),
-                (center_x - radius // 2, center_y - radius // 2),
-                2,
-            )
+        if atlas is None:
+            from sprites import SpriteAtlas  # imported here so the rules run without pygame
+            atlas = SpriteAtlas.get(self.block_size)
+        sprite = atlas.special_food if self.is_special else atlas.food
+        screen.blit(sprite, (self.x, self.y))
@@ -0,0 +1,244 @@
+import math
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+
+class FreeCells:
+    """
+    Index of any set of cells, for O(1) random picks: the arena keeps
+    its food cells in one. (A board's free cells use GridFreeCells, see
+    for_board().) Cells are stored in a list with a cell -> position map
+    next to it, so adding a cell, taking it out and picking a uniformly
+    random one are all O(1). What sample() picks depends on the order
+    cells came and went.
+    """
+
+    def __init__(self, cells=()):
+        self._cells = []
+        self._pos = {}
+        for cell in cells:
+            self.release(cell)
+
+    @classmethod
+    def for_board(cls, width, height, block_size=20, top_margin=40):
+        """Every playable cell of a board, below the HUD band."""
+        return cls((x, y)
+                   for y in range(top_margin, height, block_size)
+                   for x in range(0, width, block_size))
+
+    def copy(self):
+        """An independent copy, much cheaper than building a new index."""
+        other = FreeCells()
+        other._cells = self._cells.copy()
+        other._pos = self._pos.copy()
+        return other
+
+    def __len__(self):
+        return len(self._cells)
+
+    def __contains__(self, cell):
+        return cell in self._pos
+
+    def __iter__(self):
+        return iter(self._cells)
+
+    def take(self, cell):
+        """Mark a cell as occupied. Cells that are not free are ignored."""
+        i = self._pos.pop(cell, None)
+        if i is None:
+            return
+        last = self._cells.pop()
+        if i < len(self._cells):
+            # move the last cell into the hole left behind
+            self._cells[i] = last
+            self._pos[last] = i
+
+    def release(self, cell):
+        """Mark a cell as free again. Cells that are already free are ignored."""
+        if cell in self._pos:
+            return
+        self._pos[cell] = len(self._cells)
+        self._cells.append(cell)
+
+    def sample(self, rng=random):
+        """Return a uniformly random free cell, or None if the board is full."""
+        if not self._cells:
+            return None
+        return self._cells[rng.randrange(len(self._cells))]
+
+
+class GridFreeCells:
+    """
+    Same interface as FreeCells for the free cells of a whole board.
+    The free cells are the set bits of a bitmap in board order, and the
+    taken ones are also kept as a cell -> index map, so giving one back
+    needs no coordinate math. While at
+    least 1/8 of the board is free, sample() draws random cells until it
+    hits a free one (O(1) on average); on a fuller board it picks the
+    n-th free cell in O(log n): a Fenwick tree over the free counts of
+    blocks of about sqrt(n) cells finds its block, and halving the
+    block's bits finds the cell. The tree is only built (and kept up to
+    date) once the board gets that full, so taking and releasing stay
+    O(1) before that.
+
+    What sample() picks depends only on which cells are taken and on the
+    rng, never on the order they were taken in. So the index never needs
+    saving: the snake, obstacles and food rebuild it (that is how
+    snapshots restore it), and a copy costs one bit per cell plus the
+    taken cells.
+    """
+
+    MAX_TRIES = 64  # random draws before picking the n-th free cell instead
+
+    def __init__(self, width, height, block_size=20, top_margin=40, blocked=()):
+        self.block_size = block_size
+        self.top_margin = top_margin
+        self.cols = max(width // block_size, 0)
+        self.rows = max((height - top_margin + block_size - 1) // block_size, 0)
+        total = self.cols * self.rows
+        # cells that are never free (a map's walls), shared by every copy;
+        # anything with __contains__ and iteration over on-board cells
+        self._blocked = blocked
+        # bit i & 7 of byte i >> 3 is set while cell i is free
+        self._bits = bytearray(b"\xff" * (total >> 3))
+        if total & 7:
+            self._bits.append((1 << (total & 7)) - 1)
+        for cell in blocked:
+            i = self._index(cell)
+            self._bits[i >> 3] &= ~(1 << (i & 7))
+        self._free_total = int.from_bytes(self._bits, "little").bit_count()  # with nothing taken
+        self._taken = {}  # taken cell -> its index
+        self._block_bytes = max(math.isqrt(total), 32) + 7 >> 3  # tree blocks, in whole bytes
+        self._tree = None  # Fenwick tree of the blocks' free counts, while the board is full
+
+    def copy(self):
+        other = GridFreeCells(0, 0, self.block_size, self.top_margin)
+        other.cols, other.rows, other._block_bytes = self.cols, self.rows, self._block_bytes
+        other._blocked, other._free_total = self._blocked, self._free_total
+        other._bits = self._bits.copy()
+        other._taken = self._taken.copy()
+        other._tree = None if self._tree is None else self._tree.copy()
+        return other
+
+    def _cell(self, i):
+        return (i % self.cols * self.block_size, i // self.cols * self.block_size + self.top_margin)
+
+    def _index(self, cell):
+        """The cell's position in board order, or -1 if it is off the board."""
+        x, y = cell
+        col, rem_x = divmod(x, self.block_size)
+        row, rem_y = divmod(y - self.top_margin, self.block_size)
+        if rem_x or rem_y or not (0 <= col < self.cols and 0 <= row < self.rows):
+            return -1
+        return row * self.cols + col
+
+    def _block_bits(self, block):
+        """A tree block's free cells as the bits of one int."""
+        step = self._block_bytes
+        return int.from_bytes(self._bits[block * step:(block + 1) * step], "little")
+
+    def _build_tree(self):
+        blocks = (len(self._bits) + self._block_bytes - 1) // self._block_bytes
+        tree = [0] + [self._block_bits(block).bit_count() for block in range(blocks)]  # 1-based
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, i, delta):
+        """Change the free count of cell i's block in the tree."""
+        tree = self._tree
+        i = (i >> 3) // self._block_bytes + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def __len__(self):
+        return self._free_total - len(self._taken)
+
+    def __contains__(self, cell):
+        if cell in self._taken:
+            return False
+        i = self._index(cell)
+        return i >= 0 and self._bits[i >> 3] >> (i & 7) & 1 == 1
+
+    def __iter__(self):
+        """The free cells in board order (O(n); for rare full scans)."""
+        for byte_index, byte in enumerate(self._bits):
+            while byte:
+                low = byte & -byte
+                yield self._cell(byte_index * 8 + low.bit_length() - 1)
+                byte ^= low
+
+    def take(self, cell):
+        """Mark a cell as occupied. Cells off the board or blocked are ignored."""
+        if cell in self._taken:
+            return
+        x, y = cell
+        size = self.block_size
+        col, row = x // size, (y - self.top_margin) // size
+        if not (0 <= col < self.cols and 0 <= row < self.rows) \
+                or col * size != x or row * size + self.top_margin != y:
+            return
+        i = row * self.cols + col
+        byte = self._bits[i >> 3]
+        mask = 1 << (i & 7)
+        if byte & mask:
+            self._bits[i >> 3] = byte ^ mask
+            self._taken[cell] = i
+            if self._tree is not None:
+                self._add(i, -1)
+
+    def release(self, cell):
+        """Mark a cell as free again."""
+        i = self._taken.pop(cell, None)
+        if i is not None:
+            self._bits[i >> 3] |= 1 << (i & 7)
+            if self._tree is not None:
+                self._add(i, 1)
+
+    def sample(self, rng=random):
+        """Return a uniformly random free cell, or None if the board is full."""
+        free = self._free_total - len(self._taken)
+        if not free:
+            return None
+        total = self.cols * self.rows
+        if free * 8 >= total:
+            if free * 4 >= total:
+                self._tree = None  # roomy again: stop paying for the tree
+            bits = self._bits
+            for _ in range(self.MAX_TRIES):
+                i = rng.randrange(total)
+                if bits[i >> 3] >> (i & 7) & 1:
+                    return self._cell(i)
+        # the n-th free cell in board order: its block from the tree...
+        n = rng.randrange(free)
+        if self._tree is None:
+            self._build_tree()
+        tree = self._tree
+        block = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if block + step < len(tree) and tree[block + step] <= n:
+                block += step
+                n -= tree[block]
+            step >>= 1
+        # ...then its bit, halving the block's bits each step
+        bits, offset, width = self._block_bits(block), 0, self._block_bytes * 8
+        while width > 1:
+            half = width >> 1
+            below = (bits >> offset & ((1 << half) - 1)).bit_count()
+            if n < below:
+                width = half
+            else:
+                n -= below
+                offset += half
+                width -= half
+        return self._cell(block * self._block_bytes * 8 + offset)
+
+
+def for_board(width, height, block_size=20, top_margin=40, blocked=()):
+    """The free-cell index of a game board, with the blocked cells never free."""
+    return GridFreeCells(width, height, block_size, top_margin, blocked)
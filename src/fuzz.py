@@ -0,0 +1,417 @@
+"""
+Invariant fuzzer: play lots of short random games on random boards and
+rules, and check the rules' invariants after every tick.
+
+    python fuzz.py --seconds 60                # all cores for a minute
+    python fuzz.py --replay failure.json       # re-run a saved failure
+
+Every case is built from its seed alone (board size, Rules knobs, and
+sometimes a random map), and the inputs are random turns, bursts of
+turns and reversal attempts, steered away from crashes most of the time
+so games last. A failing case is shrunk to the fewest turn inputs that
+still break the same invariant and saved as JSON, which --replay runs
+again tick by tick.
+
+The invariants, checked in O(1) per tick:
+    food never on the snake, an obstacle or a wall
+    every cell grid-aligned, on the board and below the HUD band
+    length (plus pending growth) = start length + growth from food eaten
+    no 180-degree turns, and exactly one cell per move
+    level follows the score, and the free-cell index adds up
+"""
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from engine import Simulation, Rules, HUD_HEIGHT
+from eventlog import log
+from levelmap import LevelMap
+
+BLOCK = 20
+STEPS = ((0, -BLOCK), (0, BLOCK), (-BLOCK, 0), (BLOCK, 0))
+
+
+class Violation(Exception):
+    """An invariant that did not hold; invariant is its short name."""
+
+    def __init__(self, invariant, message):
+        super().__init__(f"{invariant}: {message}")
+        self.invariant = invariant
+        self.message = message
+
+
+class InvariantChecker:
+    """Call after_step() after every Simulation.step(); raises Violation."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.size = sim.snake.block_size
+        self.cells = (sim.width // self.size) * ((sim.height - sim.top_margin) // self.size)
+        self.walls = len(sim.walls)
+        self.start_length = len(sim.snake.segments)
+        self.growth = 0
+        self.score = sim.score
+        self.head = sim.snake.segments[0]
+        self.last_move = sim.snake.direction
+        self.food = (sim.food.x, sim.food.y, sim.food.is_special)
+        self.obstacles = 0
+        for cell in sim.snake.segments:
+            self._on_grid(cell, "snake")
+        self._check_board()
+
+    def _on_grid(self, cell, what):
+        sim = self.sim
+        x, y = cell
+        if x % self.size or (y - sim.top_margin) % self.size:
+            raise Violation("grid", f"{what} at {cell} is off the grid")
+        if y < sim.top_margin:
+            raise Violation("hud", f"{what} at {cell} is under the HUD band")
+        if not (0 <= x < sim.width and y < sim.height):
+            raise Violation("board", f"{what} at {cell} is off the board")
+
+    def _check_board(self):
+        sim, snake = self.sim, self.sim.snake
+        for obs in sim.obstacles[self.obstacles:]:
+            cell = (obs.x, obs.y)
+            self._on_grid(cell, "obstacle")
+            if snake.occupies(cell) or cell in sim.walls:
+                raise Violation("obstacle", f"obstacle placed on an occupied cell {cell}")
+        self.obstacles = len(sim.obstacles)
+
+        food = (sim.food.x, sim.food.y)
+        self._on_grid(food, "food")
+        if snake.occupies(food):
+            raise Violation("food", f"food at {food} is on the snake")
+        if food in sim.obstacle_cells or food in sim.walls:
+            raise Violation("food", f"food at {food} is on an obstacle")
+        if sim.level_map is not None and sim.walls.no_food(food):
+            raise Violation("food", f"food at {food} is in a no-food zone")
+
+        if sim.level != sim.score // sim.rules.points_per_level + 1:
+            raise Violation("level", f"level {sim.level} at score {sim.score}")
+        used = len(snake._cells) + len(sim.obstacle_cells) + self.walls + 1
+        if len(sim.free_cells) != self.cells - used:
+            raise Violation("free_cells", f"{len(sim.free_cells)} free cells, expected {self.cells - used}")
+
+    def after_step(self):
+        sim, snake = self.sim, self.sim.snake
+        head = snake.segments[0]
+        move = (head[0] - self.head[0], head[1] - self.head[1])
+        if move == (-self.last_move[0], -self.last_move[1]):
+            raise Violation("reversal", f"the snake reversed from {self.last_move} to {move}")
+        if abs(move[0]) + abs(move[1]) != self.size:
+            raise Violation("move", f"the head moved by {move}")
+        self.head = head
+        self.last_move = move
+        if sim.game_over:
+            return  # the head is where it crashed, possibly off the board
+
+        self._on_grid(head, "head")
+        x, y, special = self.food
+        if head == (x, y):
+            rules = sim.rules
+            self.growth += rules.special_food_growth if special else 1
+            self.score += rules.special_food_points if special else rules.food_points
+        if sim.score != self.score:
+            raise Violation("score", f"score {sim.score}, expected {self.score}")
+        length = len(snake.segments) + snake.grow_pending
+        if length != self.start_length + self.growth:
+            raise Violation("length", f"length {length}, expected {self.start_length + self.growth}")
+        if len(snake._cells) != len(snake.segments):
+            raise Violation("body", "two segments share a cell")
+        self.food = (sim.food.x, sim.food.y, sim.food.is_special)
+        self._check_board()
+
+
+# -- cases ------------------------------------------------------------------
+
+def make_case(seed):
+    """The board, rules and (maybe) map of a case, all picked from its seed."""
+    rng = random.Random(seed)
+    cols, rows = rng.randint(11, 40), rng.randint(9, 30)  # the default start fits from 11x9
+    rules = Rules(
+        special_food_chance=rng.choice((0.0, 0.15, 0.5, 1.0)),
+        points_per_level=rng.choice((5, 20, 100)),
+        start_obstacles=rng.choice((0, 3, cols * rows // 10)),
+        obstacles_per_level=rng.randint(0, 3),
+    )
+    case = {"seed": seed, "width": cols * BLOCK, "height": rows * BLOCK + HUD_HEIGHT,
+            "rules": rules.as_dict(), "map": None}
+    if rng.random() < 0.25:
+        level_map = LevelMap(cols, rows)
+        density = rng.choice((0.02, 0.1))
+        for row in range(rows):
+            for col in range(cols):
+                if rng.random() < density:
+                    level_map.set_wall(col, row)
+        level_map.spawn = (rng.randrange(2, cols - 1), rng.randrange(rows))
+        for col, row in level_map.spawn_body() + [(level_map.spawn[0] + 1, level_map.spawn[1])]:
+            level_map.set_wall(col, row, False)
+        col, row = rng.randrange(cols), rng.randrange(rows)
+        level_map.zones = ((col, row, rng.randint(1, cols - col), rng.randint(1, rows - row)),)
+        case["map"] = level_map.to_text()
+    return case
+
+
+_boards = {}  # (width, height) -> Simulation, reset for each case
+
+
+def _simulation(case):
+    rules = Rules(**case["rules"])
+    if case["map"]:
+        sim = Simulation(case["width"], case["height"], seed=case["seed"], rules=rules)
+        sim.load_map(LevelMap.from_text(case["map"]))
+        return sim
+    sim = _boards.get((case["width"], case["height"]))
+    if sim is None:
+        sim = _boards[case["width"], case["height"]] = Simulation(case["width"], case["height"])
+    sim.rules = rules
+    sim.reset(case["seed"])
+    return sim
+
+
+def _blocked(sim, cell):
+    x, y = cell
+    return (not (0 <= x < sim.width and sim.top_margin <= y < sim.height)
+            or cell in sim.obstacle_cells or cell in sim.walls or sim.snake.occupies(cell))
+
+
+def _random_turns(sim, rng):
+    """This tick's turns: mostly none or a dodge, sometimes a burst of anything (reversals too)."""
+    if rng.random() < 0.03:
+        return [rng.choice(STEPS) for _ in range(rng.randint(1, 3))]
+    snake = sim.snake
+    dx, dy = snake.next_direction
+    x, y = snake.segments[0]
+    if _blocked(sim, (x + dx, y + dy)) and rng.random() < 0.99:
+        turns = [(dy, dx), (-dy, -dx)]
+        rng.shuffle(turns)
+        for tx, ty in turns:
+            if not _blocked(sim, (x + tx, y + ty)):
+                return [(tx, ty)]
+    return []
+
+
+def play_case(case, inputs=None, max_ticks=5000):
+    """
+    Play a case with fresh random turns (inputs=None) or with given
+    (tick, direction) inputs. Returns (ticks, inputs, violation or None).
+    """
+    sim = _simulation(case)
+    sim.record_inputs = True
+    rng = random.Random(case["seed"] ^ 0x5EED)
+    pending = None if inputs is None else list(inputs)
+    i = 0
+    try:
+        checker = InvariantChecker(sim)
+        while sim.ticks < max_ticks and not sim.game_over:
+            if pending is None:
+                for direction in _random_turns(sim, rng):
+                    sim.turn(direction)
+            else:
+                while i < len(pending) and pending[i][0] == sim.ticks:
+                    sim.turn(pending[i][1])
+                    i += 1
+            sim.step()
+            checker.after_step()
+    except Violation as violation:
+        return sim.ticks, sim.inputs, violation
+    return sim.ticks, sim.inputs, None
+
+
+def fuzz_chunk(first_seed, count, max_ticks=5000):
+    """Play count cases. Returns (ticks played, failures as plain dicts)."""
+    ticks = 0
+    failures = []
+    for seed in range(first_seed, first_seed + count):
+        case = make_case(seed)
+        played, inputs, violation = play_case(case, max_ticks=max_ticks)
+        ticks += played
+        if violation is not None:
+            failures.append(_failure(case, inputs, played, violation))
+    return ticks, failures
+
+
+def _failure(case, inputs, tick, violation):
+    return dict(case, inputs=[[t, dx, dy] for t, (dx, dy) in inputs], tick=tick,
+                invariant=violation.invariant, message=violation.message)
+
+
+def _inputs(failure):
+    return [(t, (dx, dy)) for t, dx, dy in failure["inputs"]]
+
+
+# -- shrinking ----------------------------------------------------------------
+
+def shrink(failure, max_ticks=5000):
+    """
+    The fewest, earliest inputs that still break the same invariant.
+    Delta debugging drops halves, then quarters, ... down to single
+    inputs while that keeps failing; then each input is tried earlier
+    (which can let more of them go), until nothing changes.
+    """
+    case = {key: failure[key] for key in ("seed", "width", "height", "rules", "map")}
+    invariant = failure["invariant"]
+    runs = 0
+
+    def fails(inputs):
+        nonlocal runs
+        runs += 1
+        result = play_case(case, inputs, max_ticks)
+        return result if result[2] is not None and result[2].invariant == invariant else None
+
+    inputs = [item for item in _inputs(failure) if item[0] <= failure["tick"]]
+    best = fails(inputs)
+    if best is None:
+        return dict(failure, shrink_runs=runs, reproduced=False)
+
+    changed = True
+    while changed:
+        changed = False
+        parts = 2
+        while inputs:
+            chunk = -(-len(inputs) // parts)
+            for start in range(0, len(inputs), chunk):
+                candidate = inputs[:start] + inputs[start + chunk:]
+                result = fails(candidate)
+                if result is not None:
+                    inputs, best = candidate, result
+                    parts = max(parts - 1, 2)
+                    break
+            else:
+                if chunk == 1:
+                    break
+                parts = min(parts * 2, len(inputs))
+
+        # move inputs earlier, to the previous input's tick or halfway there
+        for k, (tick, direction) in enumerate(inputs):
+            low = inputs[k - 1][0] if k else 0
+            for earlier in (low, (low + tick) // 2):
+                if earlier < tick:
+                    candidate = inputs[:k] + [(earlier, direction)] + inputs[k + 1:]
+                    result = fails(candidate)
+                    if result is not None:
+                        inputs, best = candidate, result
+                        changed = True
+                        break
+
+    ticks, _, violation = best
+    shrunk = _failure(case, inputs, ticks, violation)
+    shrunk["shrink_runs"] = runs
+    shrunk["reproduced"] = True
+    return shrunk
+
+
+def replay_failure(failure, max_ticks=5000):
+    """Re-run a saved failure's inputs. Returns the violation, or None if it no longer happens."""
+    case = {key: failure[key] for key in ("seed", "width", "height", "rules", "map")}
+    return play_case(case, _inputs(failure), max_ticks)[2]
+
+
+# -- running ------------------------------------------------------------------
+
+def _init_worker():
+    log.set_level("off")
+
+
+def run_fuzz(cases=None, seconds=None, seed=0, workers=None, chunk_size=200, max_ticks=5000,
+             max_failures=10):
+    """
+    Fuzz cases seed, seed + 1, ... across worker processes until cases
+    have run or seconds have passed (or max_failures were found).
+    Returns {"cases", "ticks", "failures"}; failures are not shrunk yet.
+    """
+    workers = workers or os.cpu_count() or 1
+    deadline = None if seconds is None else time.perf_counter() + seconds
+    result = {"cases": 0, "ticks": 0, "failures": []}
+    starts = iter(range(seed, seed + cases, chunk_size) if cases is not None
+                  else iter(lambda: None, 0))  # endless when running for a time
+    next_seed = seed
+
+    def next_chunk():
+        nonlocal next_seed
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        if len(result["failures"]) >= max_failures:
+            return None
+        if cases is not None:
+            first = next(starts, None)
+            return None if first is None else (first, min(chunk_size, seed + cases - first))
+        first, next_seed = next_seed, next_seed + chunk_size
+        return first, chunk_size
+
+    def collect(chunk, outcome):
+        ticks, failures = outcome
+        result["cases"] += chunk[1]
+        result["ticks"] += ticks
+        result["failures"].extend(failures)
+
+    if workers == 1:
+        level = log.level  # the cases run here; give the caller its log back
+        _init_worker()
+        try:
+            while True:
+                chunk = next_chunk()
+                if chunk is None:
+                    break
+                collect(chunk, fuzz_chunk(chunk[0], chunk[1], max_ticks))
+        finally:
+            log.set_level(level)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            pending = {}
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = next_chunk()
+                    if chunk is None:
+                        break
+                    pending[pool.submit(fuzz_chunk, chunk[0], chunk[1], max_ticks)] = chunk
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    collect(pending.pop(future), future.result())
+    result["failures"].sort(key=lambda failure: failure["seed"])
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fuzz the game rules and check invariants every tick")
+    parser.add_argument("--cases", type=int, help="number of cases (default: run for --seconds)")
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first case")
+    parser.add_argument("--workers", type=int, help="processes to use (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    parser.add_argument("--max-ticks", type=int, default=5000, help="ticks per case at most")
+    parser.add_argument("--out", metavar="PATH", default="fuzz-failure.json",
+                        help="where to save the shrunk first failure")
+    parser.add_argument("--replay", metavar="PATH", help="re-run a saved failure instead of fuzzing")
+    args = parser.parse_args()
+
+    if args.replay:
+        log.set_level("off")
+        with open(args.replay) as f:
+            failure = json.load(f)
+        violation = replay_failure(failure, args.max_ticks)
+        print(f"{len(failure['inputs'])} inputs: " + (str(violation) if violation else "no violation"))
+        raise SystemExit(1 if violation else 0)
+
+    start = time.perf_counter()
+    result = run_fuzz(args.cases, None if args.cases else args.seconds, args.seed,
+                      args.workers, args.chunk_size, args.max_ticks)
+    elapsed = time.perf_counter() - start
+    print(f"{result['cases']} cases, {result['ticks']} ticks in {elapsed:.1f}s "
+          f"({result['ticks'] / elapsed * 60 / 1e6:.1f}M ticks/min), {len(result['failures'])} failures")
+    if result["failures"]:
+        log.set_level("off")
+        first = result["failures"][0]
+        shrunk = shrink(first, args.max_ticks)
+        with open(args.out, "w") as f:
+            json.dump(shrunk, f)
+        print(f"seed {first['seed']}: {first['invariant']}: {first['message']}")
+        print(f"shrunk from {len(first['inputs'])} to {len(shrunk['inputs'])} inputs "
+              f"in {shrunk['shrink_runs']} runs; saved to {args.out}")
+        raise SystemExit(1)
@@ -1,8 +1,32 @@
+import os
+import time
 import pygame
-import random
-from snake import Snake
-from food import Food
-from obstacle import Obstacle
+from engine import Simulation, HUD_HEIGHT
+from textcache import TextCache
+from sprites import SpriteAtlas
+from profiler import FrameProfiler
+from autopilot import Autopilot
+from camera import Camera, ChunkedBackground, WALL_COLOR
+from eventlog import log
+
+# None tells pygame.font.Font to load pygame's own bundled font
+# (freesansbold.ttf), which skips the system font scan SysFont does on
+# first use
+BUNDLED_FONT = None
+
+# (head_color, body_color) for each level
+LEVEL_COLORS = (
+    # level 1
+    ((0, 220, 0), (0, 180, 0)),        # green
+    # level 2
+    ((0, 210, 255), (0, 150, 220)),    # cyan/blue
+    # level 3
+    ((255, 210, 0), (220, 170, 0)),    # yellow/orange
+    # level 4
+    ((255, 120, 0), (220, 90, 0)),     # deeper orange
+    # level 5+
+    ((220, 0, 120), (180, 0, 90)),     # magenta/purple
+)
 
 class Game:
     """
@@ -10,121 +34,179 @@ class Game:
     Handles initialization, game loop, updates, and rendering.
     """
 
-    def __init__(self, width=600, height=600):
-        pygame.init()
+    def __init__(self, width=600, height=600, dirty_rects=False, render_fps=60, interpolate=False,
+                 profile_path=None, seed=None, record_path=None, autopilot=False,
+                 world_size=None, save_path=None, launch_time=None, level_map=None):
+        # Seconds spent in each startup phase, up to the first frame.
+        # launch_time (a perf_counter value) adds the time before Game().
+        self.startup_times = {}
+        self._startup_last = time.perf_counter()
+        if launch_time is not None:
+            self.startup_times["imports"] = self._startup_last - launch_time
+
+        # Only what the game uses: pygame.init() would also start audio,
+        # joystick and the rest
+        pygame.display.init()
+        pygame.font.init()
+        self._startup_phase("pygame_init")
+
+        # A designed map (levelmap.LevelMap) sets the board size: the window
+        # shrinks to a small map, a bigger one is played in huge-board mode
+        if level_map is not None:
+            block_size = 20
+            if level_map.cols * block_size <= width and level_map.rows * block_size <= height - HUD_HEIGHT:
+                width, height = level_map.cols * block_size, level_map.rows * block_size + HUD_HEIGHT
+            else:
+                world_size = (level_map.cols, level_map.rows)
         self.width = width
         self.height = height
 
         self.screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Snake Game")
-
+        self._startup_phase("display")
 
         self.clock = pygame.time.Clock() #Clock for FPS control
-        self.font_large = pygame.font.SysFont(None, 48)
-        self.font_small = pygame.font.SysFont(None, 32)
-
-        # Game state
+        self.font_small = pygame.font.Font(BUNDLED_FONT, 32)
+        self._font_large = None  # paused and game-over titles, loaded on first use
+        self._font_tiny = None   # profiler overlay, loaded on first use
+        self._startup_phase("fonts")
+        self.text_cache = TextCache()  # HUD and overlay text, rasterized once
+
+        # Per-phase frame timings; F3 shows them in the HUD, and they are
+        # written to profile_path (.json or .csv) when the game exits
+        self.profiler = FrameProfiler()
+        self.profile_path = profile_path
+        self.show_profile = False
+        self._profile_lines = ("", "")
+
+        # Window state
         self.running = True
-        self.game_over = False
         self.paused = False
 
-        # Base speed, score and level
-        self.base_speed = 10
-        self.score = 0
-        self.level = 1
-
-        self._create_objects()
-
-    def _create_objects(self):
-        """Create or reset all game objects."""
-        self.snake = Snake()
-
-        # Food should respect HUD
-        self.food = Food(
-            block_size=self.snake.block_size,
-            width=self.width,
-            height=self.height,
-            top_margin=40,
-        )
-
-        # Game start with a few obstacles, but they don't overlap
-        self.obstacles = []
-        for _ in range(3):
-            self._add_random_obstacle()
+        # The simulation ticks at its own level-based rate on a fixed
+        # timestep; rendering and input run at render_fps. With
+        # interpolate, the snake glides between cells instead of jumping.
+        self.render_fps = render_fps
+        self.interpolate = interpolate
+        self.max_frame_time = 0.25  # longer hiccups are not caught up on
+        self._accumulator = 0.0
+        self._alpha = 0.0  # how far we are into the next tick, 0..1
+
+        # Score, level and objects live in the simulation.
+        # Huge-board mode: with world_size=(cols, rows) the board is its own
+        # size, and the window shows the part around the head below the HUD.
+        self.camera = None
+        if world_size:
+            cols, rows = world_size
+            block_size = 20  # the snake's default block size
+            self.sim = Simulation(cols * block_size, rows * block_size, top_margin=0, seed=seed)
+            self.camera = Camera(self.width, self.height - HUD_HEIGHT,
+                                 self.sim.width, self.sim.height, screen_pos=(0, HUD_HEIGHT))
+        else:
+            self.sim = Simulation(self.width, self.height, top_margin=HUD_HEIGHT, seed=seed)
+        if level_map is not None:
+            self.sim.load_map(level_map)
+        if self.camera is not None:
+            self.world_background = ChunkedBackground(self.sim.width, self.sim.height, block_size,
+                                                      walls=self.sim.walls)
+        self.base_speed = self.sim.rules.base_speed
+        self._startup_phase("simulation")
+
+        # Attract mode: the autopilot steers; A toggles it during play
+        self.autopilot = Autopilot() if autopilot else None
+
+        # Channel tensor for bots, made by the first observe() call
+        self._observation = None
+
+        # F5 saves the game in progress to save_path, F9 loads it back
+        self.save_path = save_path
+
+        # With record_path, each finished game is saved there as a replay
+        self.record_path = record_path
+        self.sim.record_inputs = True
+        self._replay_saved = False
+
+        # Grid + HUD bar never change, so render them once; the plain grid
+        # behind the game-over screen is built the first time it is needed
+        self.play_background = self._build_play_background()
+        self._background = None
+        self._startup_phase("backgrounds")
+
+        # Dirty-rect mode: after a full frame, only changed cells and the
+        # HUD are redrawn and pushed with display.update(rects). A scrolling
+        # camera changes every pixel, so it is off in huge-board mode.
+        self.dirty_rects = dirty_rects and self.camera is None
+        self.sim.record_changes = self.dirty_rects
+        self._frame_key = None   # what the last full frame showed
+        self._hud_values = None  # (score, level) last drawn in the HUD
+
+    # The rules live in self.sim; these keep the old attribute names working.
+    @property
+    def snake(self):
+        return self.sim.snake
+
+    @property
+    def food(self):
+        return self.sim.food
+
+    @property
+    def obstacles(self):
+        return self.sim.obstacles
+
+    @property
+    def score(self):
+        return self.sim.score
+
+    @property
+    def level(self):
+        return self.sim.level
+
+    @property
+    def game_over(self):
+        return self.sim.game_over
+
+    @property
+    def font_large(self):
+        if self._font_large is None:
+            self._font_large = pygame.font.Font(BUNDLED_FONT, 48)
+        return self._font_large
+
+    @property
+    def font_tiny(self):
+        if self._font_tiny is None:
+            self._font_tiny = pygame.font.Font(BUNDLED_FONT, 18)
+        return self._font_tiny
+
+    @property
+    def background(self):
+        """Plain grid behind the game-over screen."""
+        if self._background is None:
+            self._background = self._build_grid()
+        return self._background
+
+    def _startup_phase(self, name):
+        """Record how long a startup phase took, since the previous one."""
+        now = time.perf_counter()
+        self.startup_times[name] = now - self._startup_last
+        self._startup_last = now
+
+    def startup_report(self):
+        """Startup phases in milliseconds, one per line, with the total."""
+        lines = [f"{name:<12} {seconds * 1000:8.1f} ms" for name, seconds in self.startup_times.items()]
+        lines.append(f"{'total':<12} {sum(self.startup_times.values()) * 1000:8.1f} ms")
+        return "\n".join(lines)
 
     def _get_snake_colors_for_level(self):
         """
         Return (head_color, body_color) based on current level.
         """
-        palette = [
-            # level 1
-            ((0, 220, 0), (0, 180, 0)),        # green
-            # level 2
-            ((0, 210, 255), (0, 150, 220)),    # cyan/blue
-            # level 3
-            ((255, 210, 0), (220, 170, 0)),    # yellow/orange
-            # level 4
-            ((255, 120, 0), (220, 90, 0)),     # deeper orange
-            # level 5+
-            ((220, 0, 120), (180, 0, 90)),     # magenta/purple
-        ]
-        idx = min(self.level - 1, len(palette) - 1)
-        return palette[idx]
-
-    def _update_level(self):
-        """Update level based on score, and trigger level-up effects."""
-        new_level = self.score // 20 + 1  # every 20 points = new level: 1,2,3,...
-
-        if new_level > self.level:
-            self.level = new_level
-            self._on_level_up()
-
-    def _on_level_up(self):
-        """Effects when a new level is reached."""
-        print(f"LEVEL UP! Now level {self.level}")
-        # Add a new random obstacle each level
-        self._add_random_obstacle()
-
-    def _add_random_obstacle(self):
-        """Add a new obstacle at a random safe grid position."""
-        block_size = self.snake.block_size
-        top_margin = 40  # avoid HUD area
-        x_positions = list(range(0, self.width, block_size))
-        y_positions = list(range(top_margin, self.height, block_size))
-
-        # NOT allowed position (snake, food, existing obstacles)
-        forbidden = set(self.snake.segments)
-        forbidden.add((self.food.x, self.food.y))
-        for obs in self.obstacles:
-            if hasattr(obs, "x") and hasattr(obs, "y"):
-                forbidden.add((obs.x, obs.y))
-
-        # find a free spot
-        for _ in range(100):
-            x = random.choice(x_positions)
-            y = random.choice(y_positions)
-            if (x, y) not in forbidden:
-                self.obstacles.append(Obstacle(x, y))
-                print(f"New obstacle added at ({x}, {y})")
-                return
-
-        print("Could not find a free spot for new obstacle.")
-
-    def _respawn_food_safely(self):
-        """
-        Respawn food, but avoid placing it on the snake or on any obstacle.
-        """
-        forbidden = set(self.snake.segments)
-        for obs in self.obstacles:
-            if hasattr(obs, "x") and hasattr(obs, "y"):
-                forbidden.add((obs.x, obs.y))
-
-        for _ in range(100):
-            self.food.respawn()
-            if (self.food.x, self.food.y) not in forbidden:
-                return
+        idx = min(self.level - 1, len(LEVEL_COLORS) - 1)
+        return LEVEL_COLORS[idx]
 
-        print("Warning: could not find free spot for food after 100 tries.")
+    def _get_sprites_for_level(self):
+        """Sprite atlas in the current level's snake colors."""
+        head_color, body_color = self._get_snake_colors_for_level()
+        return SpriteAtlas.get(self.snake.block_size, head_color, body_color)
 
     def handle_events(self):
         """Handles keyboard and quit events."""
@@ -137,35 +219,76 @@ class Game:
                 if event.key == pygame.K_ESCAPE:
                     self.running = False
 
+                # F3 toggles the frame profiler overlay
+                if event.key == pygame.K_F3:
+                    self.show_profile = not self.show_profile
+                    continue
+
+                # Quick save and quick load
+                if event.key == pygame.K_F5 and not self.game_over:
+                    self.save_state()
+                    continue
+                if event.key == pygame.K_F9:
+                    self.load_state()
+                    continue
+
                 # Allow restart
                 if self.game_over:
                     if event.key == pygame.K_r:
                         # Restart game
-                        self.game_over = False
-                        self.score = 0
-                        self.level = 1
                         self.paused = False
-                        self._create_objects()
+                        self.sim.reset()
+                        self._replay_saved = False
                     continue
 
                 # Pause during game
                 if event.key == pygame.K_p:
                     self.paused = not self.paused
-                    return
+                    continue
 
                 # Ignore movement keys
                 if self.paused:
                     continue
 
+                if event.key == pygame.K_a:
+                    self.autopilot = None if self.autopilot else Autopilot()
+                    continue
+
                 # Movement controls
                 if event.key == pygame.K_UP:
-                    self.snake.change_direction((0, -20))
+                    self.sim.turn((0, -20))
                 elif event.key == pygame.K_DOWN:
-                    self.snake.change_direction((0, 20))
+                    self.sim.turn((0, 20))
                 elif event.key == pygame.K_LEFT:
-                    self.snake.change_direction((-20, 0))
+                    self.sim.turn((-20, 0))
                 elif event.key == pygame.K_RIGHT:
-                    self.snake.change_direction((20, 0))
+                    self.sim.turn((20, 0))
+
+    def tick_rate(self):
+        """Simulation ticks per second: speed increases every level (+1 tick/s)."""
+        return self.base_speed + (self.level - 1)
+
+    def advance(self, frame_time):
+        """
+        Feed real elapsed time into the fixed-timestep accumulator and run
+        as many simulation ticks as fit. Returns the number of ticks run.
+        """
+        if self.game_over or self.paused:
+            # don't bank time while nothing moves
+            self._accumulator = 0.0
+            self._alpha = 0.0
+            return 0
+
+        self._accumulator += min(frame_time, self.max_frame_time)
+        ticks = 0
+        tick_time = 1.0 / self.tick_rate()
+        while self._accumulator >= tick_time and not self.game_over:
+            self.update()
+            self._accumulator -= tick_time
+            ticks += 1
+            tick_time = 1.0 / self.tick_rate()  # level may have changed
+        self._alpha = min(self._accumulator / tick_time, 1.0)
+        return ticks
 
     def update(self):
         """Updates all game objects."""
@@ -173,86 +296,212 @@ class Game:
         if self.game_over or self.paused:
             return
 
+        if self.autopilot is not None:
+            direction = self.autopilot.decide(self.sim)
+            if direction is not None:
+                self.sim.turn(direction)
 
-        self.snake.move()
-
-        # End the game if the snake hits the wall
-        if self.snake.is_out_of_bounds(self.width, self.height, top_margin=40):
-            print("Game Over: Snake hit the wall!")
-            self.game_over = True
-            return
+        self.sim.step()
+        if self.game_over:
+            self._save_replay()
 
-        # End the game if the snake hits an obstacle
-        head_rect = self.snake.get_head_rect()
-        for obs in self.obstacles:
-            if head_rect.colliderect(obs.get_rect()):
-                print("Game Over: Snake hit an obstacle!")
-                self.game_over = True
-                return
-
-        # End the game if the snake runs into itself
-        if self.snake.check_self_collision():
-            print("Game Over: Snake ran into itself!")
-            self.game_over = True
-            return
-
-        # Check snake–food collision
-        head_x, head_y = self.snake.segments[0]
-        if head_x == self.food.x and head_y == self.food.y:
-            # Snake eats food
-            if self.food.is_special:
-                # Special food: big bonus
-                for _ in range(3):
-                    self.snake.grow()        # grow by 3 segments total
-                self.score += 20             # +20 points
-                print(f"SPECIAL food eaten! Score is now {self.score}")
-            else:
-                # Normal food
-                self.snake.grow()            # +1 segment
-                self.score += 5              # +5 points
-                print(f"Food eaten! Score is now {self.score}")
-
-            # Respawn food somewhere safe (not on snake or obstacles)
-            self._respawn_food_safely()
+    def observe(self, crop=None, rotate=False):
+        """
+        The board as a NumPy channel tensor (see observation.py), updated
+        in place each call. With crop, only the window of that radius
+        around the head. Both are views: copy them to keep a tick.
+        """
+        if self._observation is None:
+            from observation import Observation  # imported here so the game runs without numpy
+            self._observation = Observation(self.sim, crop_radius=crop or 0)
+        tensor = self._observation.update()
+        if crop is not None:
+            return self._observation.crop(crop, rotate)
+        return tensor
+
+    def _save_replay(self):
+        """Write the current game to record_path, once per game."""
+        if self.record_path and not self._replay_saved and self.sim.ticks:
+            from replay import Replay
+            Replay.from_simulation(self.sim).save(self.record_path)
+            self._replay_saved = True
+
+    def save_state(self, path=None):
+        """Save the game in progress as a snapshot (to save_path by default)."""
+        path = path or self.save_path
+        if path:
+            self.sim.snapshot().save(path)
+            log.info("game_saved", path=path, tick=self.sim.ticks)
+
+    def load_state(self, path=None):
+        """Resume a game saved with save_state(). Returns False if there was nothing to load."""
+        from snapshot import Snapshot
+        path = path or self.save_path
+        if not path or not os.path.exists(path):
+            return False
+        snapshot = Snapshot.load(path)
+        width, height, top_margin, _ = snapshot.board
+        if (width, height, top_margin) != (self.sim.width, self.sim.height, self.sim.top_margin):
+            log.warning("save_mismatch", path=path, board=f"{width}x{height}")
+            return False
+        saved_map = snapshot.level_map[1] if snapshot.level_map else None
+        if saved_map != (self.sim.map_ref[1] if self.sim.map_ref else None):
+            log.warning("save_mismatch", path=path, map=snapshot.level_map)
+            return False
+        self.sim.restore(snapshot)
+        self.paused = False
+        self._replay_saved = False
+        self._accumulator = 0.0
+        self._frame_key = None  # force a full redraw
+        log.info("game_loaded", path=path, tick=self.sim.ticks)
+        return True
+
+    def _build_grid(self):
+        """Pre-render the grid lines over the whole window."""
+        background = pygame.Surface((self.width, self.height)).convert()
+        background.fill((15, 15, 20))
+        grid_color = (40, 40, 50) #grid lines
+        cell_size = self.snake.block_size
 
-            # Update level
-            self._update_level()
+        for x in range(0, self.width, cell_size):
+            pygame.draw.line(background, grid_color, (x, 0), (x, self.height))
+        for y in range(0, self.height, cell_size):
+            pygame.draw.line(background, grid_color, (0, y), (self.width, y))
+
+        return background
+
+    def _build_play_background(self):
+        """The grid with the top HUD bar, behind every gameplay frame."""
+        play_background = self._build_grid()
+        hud_rect = pygame.Rect(0, 0, self.width, HUD_HEIGHT)
+        pygame.draw.rect(play_background, (25, 25, 35), hud_rect)
+        # a map's walls never move, so they are part of the background
+        # (through the camera, the world's chunks carry them instead)
+        if self.camera is None:
+            size = self.snake.block_size
+            for x, y in self.sim.walls:
+                play_background.fill(WALL_COLOR, (x, y, size, size))
+        return play_background
 
     def _draw_game_objects(self):
         """Draw snake, food, obstacles, and HUD during normal gameplay."""
-        head_color, body_color = self._get_snake_colors_for_level()
-        self.snake.draw(self.screen, head_color=head_color, body_color=body_color)
-        self.food.draw(self.screen)
-        for obs in self.obstacles:
-            obs.draw(self.screen)
-
-        # top HUD bar
-        hud_height = 40
-        hud_rect = pygame.Rect(0, 0, self.width, hud_height)
-        pygame.draw.rect(self.screen, (25, 25, 35), hud_rect)
-
-        # Score and Level text
-        score_text = self.font_small.render(f"Score: {self.score}", True, (255, 255, 255))
-        self.screen.blit(score_text, (10, 10))
-        level_text = self.font_small.render(f"Level: {self.level}", True, (255, 255, 255))
-        level_rect = level_text.get_rect(topright=(self.width - 10, 10))
-        self.screen.blit(level_text, level_rect)
+        atlas = self._get_sprites_for_level()
+        if self.camera is not None:
+            self._draw_world(atlas)
+        elif self.interpolate and not self.paused:
+            self._draw_interpolated_snake(atlas)
+        else:
+            self.snake.draw(self.screen, atlas=atlas)
+        if self.camera is None:
+            self.food.draw(self.screen, atlas=atlas)
+            obstacle = atlas.obstacle
+            self.screen.blits([(obstacle, (obs.x, obs.y)) for obs in self.obstacles], doreturn=False)
+
+        self._draw_hud()
 
         # Paused message
         if self.paused:
-            paused_text = self.font_large.render("Paused", True, (255, 255, 0))
-            instr_text = self.font_small.render("Press P to resume", True, (255, 255, 0))
+            paused_text = self.text_cache.render(self.font_large, "Paused", (255, 255, 0))
+            instr_text = self.text_cache.render(self.font_small, "Press P to resume", (255, 255, 0))
             p_rect = paused_text.get_rect(center=(self.width // 2, self.height // 2 - 20))
             i_rect = instr_text.get_rect(center=(self.width // 2, self.height // 2 + 20))
             self.screen.blit(paused_text, p_rect)
             self.screen.blit(instr_text, i_rect)
 
+    def _draw_world(self, atlas):
+        """
+        Huge-board mode: draw what the camera sees, following the head.
+        Only cached background chunks, and the snake segments, food and
+        obstacles inside the view, are drawn.
+        """
+        camera = self.camera
+        block_size = self.snake.block_size
+        head = self.snake.segments[0]
+        camera.follow(head[0], head[1], block_size)
+        to_screen = camera.to_screen
+
+        self.screen.set_clip(camera.rect)
+        self.world_background.draw(self.screen, camera)
+
+        obstacle = atlas.obstacle
+        cells = self.sim.obstacle_cells
+        blits = [(obstacle, to_screen(*cell)) for cell in self._cells_in_view(cells, cells.__contains__)]
+        body = atlas.body
+        blits += [(body, to_screen(*cell))
+                  for cell in self._cells_in_view(self.snake.segments, self.snake.occupies)]
+        if camera.sees(self.food.x, self.food.y, block_size):
+            food = atlas.special_food if self.food.is_special else atlas.food
+            blits.append((food, to_screen(self.food.x, self.food.y)))
+        blits.append((atlas.head(self.snake.direction), to_screen(*head)))
+        self.screen.blits(blits, doreturn=False)
+        self.screen.set_clip(None)
+
+    def _cells_in_view(self, cells, contains):
+        """
+        The cells of a collection the camera can see. A collection smaller
+        than the view is filtered; a bigger one is looked up cell by cell
+        across the view, so the cost never grows past the view size.
+        """
+        camera = self.camera
+        block_size = self.snake.block_size
+        x0, y0, x1, y1 = camera.visible_cells(block_size)
+        view_cells = ((x1 - x0) // block_size + 1) * ((y1 - y0) // block_size + 1)
+        if len(cells) <= view_cells:
+            sees = camera.sees
+            return [cell for cell in cells if sees(cell[0], cell[1], block_size)]
+        return [(x, y) for y in range(y0, y1, block_size) for x in range(x0, x1, block_size)
+                if contains((x, y))]
+
+    def _draw_interpolated_snake(self, atlas):
+        """
+        Draw every segment part of the way towards where it will be on
+        the next tick, so movement looks smooth at high frame rates.
+        """
+        segments = self.snake.segments
+        alpha = self._alpha
+        head_x, head_y = segments[0]
+        dx, dy = self.snake.next_direction
+        # a growing snake keeps its tail in place on the next tick
+        last_moving = len(segments) if self.snake.grow_pending == 0 else len(segments) - 1
+
+        blits = []
+        ahead_x, ahead_y = head_x + dx, head_y + dy
+        for i, (x, y) in enumerate(segments):
+            if i < last_moving:
+                pos = (round(x + (ahead_x - x) * alpha), round(y + (ahead_y - y) * alpha))
+            else:
+                pos = (x, y)
+            blits.append((atlas.body, pos))
+            ahead_x, ahead_y = x, y
+        # head goes on top of the body
+        blits[0] = (atlas.head(self.snake.next_direction), blits[0][1])
+        blits.append(blits.pop(0))
+        self.screen.blits(blits, doreturn=False)
+
+    def _draw_hud(self):
+        """Draw the score and level text on the HUD bar."""
+        score_text = self.text_cache.render(self.font_small, f"Score: {self.score}", (255, 255, 255))
+        self.screen.blit(score_text, (10, 10))
+        level_text = self.text_cache.render(self.font_small, f"Level: {self.level}", (255, 255, 255))
+        level_rect = level_text.get_rect(topright=(self.width - 10, 10))
+        self.screen.blit(level_text, level_rect)
+
+        if self.show_profile:
+            for i, line in enumerate(self._profile_lines):
+                text = self.text_cache.render(self.font_tiny, line, (180, 220, 255))
+                self.screen.blit(text, text.get_rect(midtop=(self.width // 2, 6 + i * 15)))
+        self._hud_values = self._hud_state()
+
+    def _hud_state(self):
+        """Everything the HUD text shows; the HUD is redrawn when it changes."""
+        return (self.score, self.level, self.show_profile and self._profile_lines)
+
     def _draw_game_over_screen(self):
         """Draw the Game Over screen with final score and instructions."""
-        game_over_text = self.font_large.render("Game Over", True, (255, 255, 255))
-        score_text = self.font_small.render(f"Final Score: {self.score}", True, (255, 255, 255))
-        level_text = self.font_small.render(f"Final Level: {self.level}", True, (255, 255, 255))
-        instr_text = self.font_small.render("Press R to restart or ESC to quit", True, (255, 255, 255))
+        game_over_text = self.text_cache.render(self.font_large, "Game Over", (255, 255, 255))
+        score_text = self.text_cache.render(self.font_small, f"Final Score: {self.score}", (255, 255, 255))
+        level_text = self.text_cache.render(self.font_small, f"Final Level: {self.level}", (255, 255, 255))
+        instr_text = self.text_cache.render(self.font_small, "Press R to restart or ESC to quit", (255, 255, 255))
 
         # Center the texts
         go_rect = game_over_text.get_rect(center=(self.width // 2, self.height // 2 - 60))
@@ -267,31 +516,96 @@ class Game:
 
     def draw(self):
         """Draws everything to the screen."""
-        self.screen.fill((15, 15, 20))
-        grid_color = (40, 40, 50) #grid lines
-        cell_size = self.snake.block_size
-
-        for x in range(0, self.width, cell_size):
-            pygame.draw.line(self.screen, grid_color, (x, 0), (x, self.height))
-        for y in range(0, self.height, cell_size):
-            pygame.draw.line(self.screen, grid_color, (0, y), (self.width, y))
+        if (self.dirty_rects and not self.interpolate
+                and self._frame_key == self._current_frame_key()):
+            self._draw_changes()
+            return
 
         if not self.game_over:
+            self.screen.blit(self.play_background, (0, 0))
             self._draw_game_objects()
         else:
+            self.screen.blit(self.background, (0, 0))
             self._draw_game_over_screen()
 
+        self.profiler.mark("draw")
         pygame.display.flip()
+        self.profiler.mark("flip")
+        self.sim.changed_cells.clear()
+        self._frame_key = self._current_frame_key()
+
+        if "first_frame" not in self.startup_times:
+            self._startup_phase("first_frame")
+            log.info("startup", **{name: f"{seconds * 1000:.1f}ms"
+                                   for name, seconds in self.startup_times.items()})
+
+    def _current_frame_key(self):
+        """
+        Anything that changes the whole picture: a restart, a new level
+        (new snake colors), pausing or game over. A change forces a full frame.
+        """
+        return (id(self.sim.snake), self.level, self.paused, self.game_over)
+
+    def _draw_changes(self):
+        """Redraw only the cells the simulation marked, plus the HUD if needed."""
+        block_size = self.snake.block_size
+        atlas = self._get_sprites_for_level()
+        head = self.snake.segments[0]
+        dirty = []
+
+        for cell in set(self.sim.changed_cells):
+            rect = pygame.Rect(cell[0], cell[1], block_size, block_size)
+            self.screen.blit(self.play_background, rect, rect)
+            if cell == head:
+                self.snake.draw_head(self.screen, atlas=atlas)
+            elif self.snake.occupies(cell):
+                self.snake.draw_segment(self.screen, cell, atlas=atlas)
+            elif cell == (self.food.x, self.food.y):
+                self.food.draw(self.screen, atlas=atlas)
+            elif cell in self.sim.obstacle_cells:
+                self.screen.blit(atlas.obstacle, cell)
+            dirty.append(rect)
+        self.sim.changed_cells.clear()
+
+        if self._hud_values != self._hud_state():
+            hud_rect = pygame.Rect(0, 0, self.width, HUD_HEIGHT)
+            self.screen.blit(self.play_background, hud_rect, hud_rect)
+            self._draw_hud()
+            dirty.append(hud_rect)
+
+        self.profiler.mark("draw")
+        if dirty:
+            pygame.display.update(dirty)
+        self.profiler.mark("flip")
 
     def run(self):
         """Main game loop"""
+        profiler = self.profiler
+        previous = time.perf_counter()
         while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
+            now = time.perf_counter()
+            frame_time = now - previous
+            previous = now
+            profiler.begin_frame()
 
-            # Speed increases (every level +1 FPS)
-            dynamic_fps = self.base_speed + (self.level - 1)
-            self.clock.tick(dynamic_fps)
+            self.handle_events()
+            profiler.mark("events")
+            self.advance(frame_time)
+            profiler.mark("update")
+            self.draw()  # marks "draw" and "flip" itself
+
+            # Rendering and input run at a steady rate; game speed comes
+            # from the simulation tick rate in advance()
+            self.clock.tick(self.render_fps)
+            profiler.mark("sleep")
+            profiler.end_frame()
+
+            # refresh the overlay twice a second so it stays readable
+            if self.show_profile and profiler.frames % max(self.render_fps // 2, 1) == 0:
+                self._profile_lines = profiler.overlay_lines()
+
+        if self.profile_path:
+            profiler.dump(self.profile_path)
+        self._save_replay()
 
         pygame.quit()
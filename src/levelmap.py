@@ -0,0 +1,257 @@
+"""
+Designed maps: walls, a spawn point and zones where food never appears.
+
+File format, little endian:
+
+    b"PRMP", version            4s B
+    cols, rows                  u16 u16
+    spawn col, row, direction   u16 u16 u8   (direction: 0 up, 1 down, 2 left, 3 right)
+    zone count                  u16
+    zones                       count x (col, row, cols, rows) u16
+    walls                       ceil(cols * rows / 8) bytes, one bit per cell,
+                                row by row, lowest bit first
+
+Cells are counted over the playable area (below the HUD band).
+LevelMap.load() memory-maps the file and answers wall lookups straight
+from the bitmap, so a map with thousands of walls costs its file size,
+not thousands of objects.
+
+Text art, for the converter (python levelmap.py art.txt map.prm):
+
+    #        wall
+    x        no food here
+    S        spawn, facing right (or ^ v < > for the other directions)
+    . space  empty
+"""
+import argparse
+import mmap
+import struct
+import zlib
+
+MAGIC = b"PRMP"
+VERSION = 1
+_HEADER = struct.Struct("<4sBHHHHBH")
+_ZONE = struct.Struct("<HHHH")
+ARROWS = "^v<>"  # direction codes 0..3
+DIRECTIONS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+class LevelMap:
+    """
+    A map's walls as a bitmap plus its spawn and food exclusion zones.
+    walls is any bytes-like object (an mmap when loaded from a file).
+    """
+
+    def __init__(self, cols, rows, walls=None, spawn=None, direction=3, zones=()):
+        self.cols = cols
+        self.rows = rows
+        self.bits = walls if walls is not None else bytearray((cols * rows + 7) // 8)
+        # the normal game's start, (200, 200) px, when it fits
+        self.spawn = spawn if spawn is not None else (min(10, cols - 1), min(8, rows - 1))
+        self.direction = direction
+        self.zones = tuple(zones)  # (col, row, cols, rows) rectangles
+        self.path = None  # the file it was loaded from, for replays and saves to point at
+
+    def is_wall(self, col, row):
+        i = row * self.cols + col
+        return self.bits[i >> 3] >> (i & 7) & 1
+
+    def set_wall(self, col, row, wall=True):
+        i = row * self.cols + col
+        if wall:
+            self.bits[i >> 3] |= 1 << (i & 7)
+        else:
+            self.bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+    def wall_count(self):
+        return int.from_bytes(self.bits, "little").bit_count()
+
+    def walls(self):
+        """Every wall cell as (col, row). Empty bytes are skipped, so sparse maps are quick."""
+        cols = self.cols
+        for byte_index, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                i = byte_index * 8 + low.bit_length() - 1
+                yield i % cols, i // cols
+                byte ^= low
+
+    def in_zone(self, col, row):
+        return any(c <= col < c + w and r <= row < r + h for c, r, w, h in self.zones)
+
+    def spawn_body(self):
+        """The start snake's cells, head first, trailing away from its direction."""
+        col, row = self.spawn
+        dc, dr = DIRECTIONS[self.direction]
+        return [(col - k * dc, row - k * dr) for k in range(3)]
+
+    def check_spawn(self):
+        """Raise ValueError unless the start snake lies on the map, clear of walls."""
+        for col, row in self.spawn_body():
+            if not (0 <= col < self.cols and 0 <= row < self.rows) or self.is_wall(col, row):
+                raise ValueError(f"the spawn at {self.spawn} puts the snake on ({col}, {row}), "
+                                 "off the map or in a wall")
+
+    def on_board(self, block_size=20, top_margin=0):
+        """A BoardWalls view of this map for a board of that block size and HUD band."""
+        return BoardWalls(self, block_size, top_margin)
+
+    # -- files ------------------------------------------------------------
+
+    def to_bytes(self):
+        header = _HEADER.pack(MAGIC, VERSION, self.cols, self.rows, self.spawn[0], self.spawn[1],
+                              self.direction, len(self.zones))
+        zones = b"".join(_ZONE.pack(*zone) for zone in self.zones)
+        return header + zones + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Read a map from bytes or an mmap; the wall bitmap is a view, not a copy."""
+        magic, version, cols, rows, spawn_col, spawn_row, direction, count = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a map file")
+        if version != VERSION:
+            raise ValueError(f"unsupported map version {version}")
+        pos = _HEADER.size
+        zones = [_ZONE.unpack_from(data, pos + k * _ZONE.size) for k in range(count)]
+        pos += count * _ZONE.size
+        size = (cols * rows + 7) // 8
+        if len(data) < pos + size:
+            raise ValueError("map file is truncated")
+        walls = memoryview(data)[pos:pos + size]
+        return cls(cols, rows, walls, (spawn_col, spawn_row), direction, zones)
+
+    def checksum(self):
+        """CRC-32 of the map file's bytes, so a recording can tell it has the right map."""
+        return zlib.crc32(self.to_bytes())
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path, checksum=None):
+        """
+        Memory-map a map file. Its walls stay on disk until they are
+        looked at. With checksum, the file must still be that map.
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        level_map = cls.from_bytes(data)
+        if checksum is not None and level_map.checksum() != checksum:
+            raise ValueError(f"{path} has changed since the game was recorded on it")
+        level_map.path = path
+        return level_map
+
+    # -- text art -------------------------------------------------------------
+
+    @classmethod
+    def from_text(cls, text):
+        lines = text.rstrip("\n").split("\n")
+        rows, cols = len(lines), max(len(line) for line in lines)
+        level_map = cls(cols, rows)
+        runs = {}  # (col, width) -> [first row, rows] of the open zone with that span
+        zones = []
+        for row, line in enumerate(lines):
+            col = 0
+            spans = []
+            line = line.ljust(cols)
+            while col < cols:
+                char = line[col]
+                if char == "#":
+                    level_map.set_wall(col, row)
+                elif char == "S" or char in ARROWS:
+                    level_map.spawn = (col, row)
+                    level_map.direction = 3 if char == "S" else ARROWS.index(char)
+                elif char == "x":
+                    start = col
+                    while col + 1 < cols and line[col + 1] == "x":
+                        col += 1
+                    spans.append((start, col - start + 1))
+                elif char not in ". ":
+                    raise ValueError(f"unknown map character {char!r} at row {row}, column {col}")
+                col += 1
+            # runs with the same span on consecutive rows become one rectangle
+            for span in list(runs):
+                if span not in spans:
+                    first, height = runs.pop(span)
+                    zones.append((span[0], first, span[1], height))
+            for span in spans:
+                if span in runs:
+                    runs[span][1] += 1
+                else:
+                    runs[span] = [row, 1]
+        for span, (first, height) in runs.items():
+            zones.append((span[0], first, span[1], height))
+        level_map.zones = tuple(sorted(zones, key=lambda z: (z[1], z[0])))
+        level_map.check_spawn()
+        return level_map
+
+    def to_text(self):
+        grid = [["." for _ in range(self.cols)] for _ in range(self.rows)]
+        for c, r, w, h in self.zones:
+            for row in range(r, r + h):
+                grid[row][c:c + w] = "x" * w
+        for col, row in self.walls():
+            grid[row][col] = "#"
+        col, row = self.spawn
+        grid[row][col] = "S" if self.direction == 3 else ARROWS[self.direction]
+        return "\n".join("".join(line) for line in grid) + "\n"
+
+
+class BoardWalls:
+    """
+    A map's walls in pixel cells, for the rules: `cell in walls` is a
+    bit test. Also says where food may not go.
+    """
+
+    def __init__(self, level_map, block_size=20, top_margin=0):
+        self.map = level_map
+        self.block_size = block_size
+        self.top_margin = top_margin
+
+    def __contains__(self, cell):
+        col, rem_x = divmod(cell[0], self.block_size)
+        row, rem_y = divmod(cell[1] - self.top_margin, self.block_size)
+        level_map = self.map
+        if rem_x or rem_y or not (0 <= col < level_map.cols and 0 <= row < level_map.rows):
+            return False
+        i = row * level_map.cols + col
+        return level_map.bits[i >> 3] >> (i & 7) & 1 == 1
+
+    def __iter__(self):
+        size, top = self.block_size, self.top_margin
+        for col, row in self.map.walls():
+            yield col * size, row * size + top
+
+    def __len__(self):
+        return self.map.wall_count()
+
+    def no_food(self, cell):
+        """True inside a food exclusion zone."""
+        return self.map.in_zone(cell[0] // self.block_size, (cell[1] - self.top_margin) // self.block_size)
+
+    def cell(self, col, row):
+        return col * self.block_size, row * self.block_size + self.top_margin
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a text-art map to the binary map format")
+    parser.add_argument("source", help="text art: # wall, x no food, S/^/v/</> spawn, . empty")
+    parser.add_argument("target", help="map file to write")
+    parser.add_argument("--reverse", action="store_true", help="turn a map file back into text art")
+    args = parser.parse_args()
+
+    if args.reverse:
+        with open(args.target, "w") as f:
+            f.write(LevelMap.load(args.source).to_text())
+        return
+    with open(args.source) as f:
+        level_map = LevelMap.from_text(f.read())
+    level_map.save(args.target)
+    print(f"{args.target}: {level_map.cols}x{level_map.rows}, {level_map.wall_count()} walls, "
+          f"{len(level_map.zones)} food exclusion zones")
+
+
+if __name__ == "__main__":
+    main()
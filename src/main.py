@@ -1,4 +1,169 @@
-from game import Game
+import time
+LAUNCH_TIME = time.perf_counter()  # for the startup report
+
+import argparse
+import random
+
+
+def run_headless(games, max_ticks, seed=None):
+    """
+    Play games back to back without a window, as fast as the CPU allows.
+    With a seed, game i uses seed + i and the whole run is repeatable.
+    Prints a short summary at the end.
+    """
+    from engine import Simulation
+    from bots import random_turns
+
+    policy = random_turns(random.Random(seed))
+    sim = Simulation(seed=seed)
+    total_ticks = 0
+    scores = []
+    start = time.perf_counter()
+    for i in range(games):
+        sim.reset(None if seed is None else seed + i)
+        while sim.ticks < max_ticks and sim.step(policy(sim)):
+            pass
+        total_ticks += sim.ticks
+        scores.append(sim.score)
+    elapsed = time.perf_counter() - start
+
+    print(f"games: {games}  ticks: {total_ticks}  time: {elapsed:.3f}s  "
+          f"ticks/s: {total_ticks / max(elapsed, 1e-9):.0f}")
+    print(f"mean score: {sum(scores) / len(scores):.2f}  best score: {max(scores)}")
+
+
+def play_replay(path, seek=None):
+    """Re-simulate a saved replay at full speed and check it against the recording."""
+    from replay import Replay, ReplayPlayer
+
+    replay = Replay.load(path)
+    player = ReplayPlayer(replay)
+    start = time.perf_counter()
+    sim = player.play() if seek is None else player.seek(seek)
+    elapsed = time.perf_counter() - start
+
+    print(f"replay: seed {replay.seed}  tick {sim.ticks}/{replay.ticks}  score {sim.score}  "
+          f"level {sim.level}  ({sim.ticks / max(elapsed, 1e-9):.0f} ticks/s)")
+    if seek is None and not player.matches_recording():
+        print(f"MISMATCH: recording says {replay.ticks} ticks, score {replay.score}")
+
+
+def run_arena(snakes, size=(100, 80), seed=None, headless=False, max_ticks=1000):
+    """
+    Arena mode: many AI snakes on one board; crashed snakes respawn.
+    Headless runs max_ticks as fast as possible and prints the cost per
+    tick, otherwise the arena plays in a window until ESC.
+    """
+    from arena import Arena
+
+    block_size = 10  # small cells so a big board fits in the window
+    cols, rows = size
+    arena = Arena(cols * block_size, rows * block_size, seed=seed, block_size=block_size)
+    for _ in range(snakes):
+        arena.spawn(bot=True)
+
+    def tick():
+        _, dead, _, _ = arena.step()
+        for _ in dead:
+            arena.spawn(bot=True)
+
+    if headless:
+        start = time.perf_counter()
+        for _ in range(max_ticks):
+            tick()
+        elapsed = time.perf_counter() - start
+        print(f"arena: {snakes} snakes  {max_ticks} ticks  {elapsed / max_ticks * 1000:.2f} ms/tick  "
+              f"best score: {max(arena.scores.values(), default=0)}")
+        return
+
+    import pygame
+    from sprites import SpriteAtlas
+
+    pygame.display.init()
+    screen = pygame.display.set_mode((arena.width, arena.height))
+    pygame.display.set_caption("Snake Arena")
+    atlas = SpriteAtlas.get(block_size)
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        tick()
+        screen.fill((15, 15, 20))
+        arena.draw(screen, atlas)
+        pygame.display.flip()
+        clock.tick(arena.tick_rate())
+    pygame.quit()
+
 
 if __name__ == "__main__":
-    Game().run()
+    parser = argparse.ArgumentParser(description="Python Rush snake game")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the rules without a window, as fast as possible")
+    parser.add_argument("--games", type=int, default=100,
+                        help="number of headless games to play")
+    parser.add_argument("--max-ticks", type=int, default=10000,
+                        help="stop a headless game after this many ticks")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="redraw only changed cells instead of the whole window")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="render and input polling rate (game speed is separate)")
+    parser.add_argument("--interpolate", action="store_true",
+                        help="draw the snake gliding between cells")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="write per-phase frame timings to PATH (.json or .csv) on exit")
+    parser.add_argument("--log-level", choices=["debug", "info", "warning", "off"],
+                        help="game event log level (default: info, or off when headless)")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="attract mode: the autopilot plays (press A to take over)")
+    parser.add_argument("--world", metavar="COLSxROWS",
+                        help="huge-board mode: a board of this many cells seen through a camera")
+    parser.add_argument("--save", metavar="PATH",
+                        help="F5 saves the game in progress to PATH, F9 loads it")
+    parser.add_argument("--resume", action="store_true", help="with --save, start from the saved game")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="draw one frame, print how long each startup phase took and exit")
+    parser.add_argument("--arena", type=int, metavar="N",
+                        help="arena mode: N AI snakes on one board (size from --world, default 100x80)")
+    parser.add_argument("--map", metavar="PATH",
+                        help="play on a map file (make one from text art with levelmap.py)")
+    parser.add_argument("--seed", type=int, help="seed the game's randomness")
+    parser.add_argument("--record", metavar="PATH", help="save each finished game as a replay")
+    parser.add_argument("--replay", metavar="PATH", help="re-simulate a saved replay, headless")
+    parser.add_argument("--seek", type=int, help="with --replay, stop at this tick")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games must be at least 1")
+
+    from eventlog import log
+    headless = args.headless or args.replay
+    log.set_level(args.log_level or ("off" if headless else "info"))
+
+    world_size = tuple(int(n) for n in args.world.lower().split("x")) if args.world else None
+    level_map = None
+    if args.map:
+        if args.world:
+            parser.error("--map sets the board size; it can't be combined with --world")
+        from levelmap import LevelMap
+        level_map = LevelMap.load(args.map)
+    if args.replay:
+        play_replay(args.replay, args.seek)
+    elif args.arena:
+        run_arena(args.arena, world_size or (100, 80), args.seed, args.headless, args.max_ticks)
+    elif args.headless:
+        run_headless(args.games, args.max_ticks, args.seed)
+    else:
+        from game import Game
+        game = Game(dirty_rects=args.dirty_rects, render_fps=args.fps,
+                    interpolate=args.interpolate, profile_path=args.profile,
+                    seed=args.seed, record_path=args.record, autopilot=args.autopilot,
+                    world_size=world_size, save_path=args.save, launch_time=LAUNCH_TIME,
+                    level_map=level_map)
+        if args.startup_report:
+            game.draw()
+            print(game.startup_report())
+            raise SystemExit
+        if args.resume:
+            game.load_state()
+        game.run()
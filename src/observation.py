@@ -0,0 +1,138 @@
+"""
+The board as a stack of NumPy channels, for bots and learning agents.
+
+    tensor[BODY]      1 where the snake is (head included)
+    tensor[HEAD]      1 on the head
+    tensor[FOOD]      1 on normal food
+    tensor[SPECIAL]   1 on special food
+    tensor[OBSTACLE]  1 on obstacles
+    tensor[WALL]      1 on the HUD band and map walls (and off the board, in crops)
+
+One row per block of screen height, HUD rows included, so a pixel cell
+(x, y) is tensor[:, y // size, x // size].
+
+The tensor is kept up to date in place: after a normal tick update()
+only writes the old and new head, the dropped tail, the food and any
+new obstacles. Anything else (a new game, a restored snapshot, several
+ticks at once) falls back to a full rebuild.
+"""
+import numpy as np
+
+BODY, HEAD, FOOD, SPECIAL, OBSTACLE, WALL = range(6)
+CHANNELS = ("body", "head", "food", "special", "obstacle", "wall")
+
+
+class Observation:
+    """
+    Channel tensor for one Simulation. crop_radius reserves a wall
+    border around the board so crop() can return views instead of copies.
+    """
+
+    def __init__(self, sim, crop_radius=0):
+        self.sim = sim
+        self.size = sim.snake.block_size
+        self.rows = sim.height // self.size
+        self.cols = sim.width // self.size
+        self.pad = crop_radius
+        pad = self.pad
+
+        # the whole padded stack; self.tensor is the board inside it
+        self._padded = np.zeros((len(CHANNELS), self.rows + 2 * pad, self.cols + 2 * pad), dtype=np.uint8)
+        self._padded[WALL] = 1
+        self.tensor = self._padded[:, pad:pad + self.rows, pad:pad + self.cols]
+
+        self.rebuilds = 0
+        self._key = None
+        self.rebuild()
+
+    def __getattr__(self, name):
+        # obs.body, obs.head, ... are views of one channel
+        if name in CHANNELS:
+            return self.tensor[CHANNELS.index(name)]
+        raise AttributeError(name)
+
+    def _cell(self, cell):
+        return cell[1] // self.size, cell[0] // self.size
+
+    def _set(self, channel, cell, value):
+        row, col = cell[1] // self.size, cell[0] // self.size
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            self.tensor[channel, row, col] = value
+
+    def _remember(self):
+        sim, snake, food = self.sim, self.sim.snake, self.sim.food
+        self._key = (id(snake), sim.seed, sim.generation)
+        self._ticks = sim.ticks
+        self._head = snake.segments[0]
+        self._tail = snake.segments[-1]
+        self._food = (food.x, food.y, food.is_special)
+        self._obstacles = len(sim.obstacles)
+
+    def rebuild(self):
+        """Redraw every channel from the simulation. O(board)."""
+        sim, snake, food = self.sim, self.sim.snake, self.sim.food
+        self.tensor[:] = 0
+        self.tensor[WALL, :sim.top_margin // self.size] = 1
+        for cell in sim.walls:
+            self._set(WALL, cell, 1)
+        for cell in snake.segments:
+            self._set(BODY, cell, 1)
+        self._set(HEAD, snake.segments[0], 1)
+        self._set(SPECIAL if food.is_special else FOOD, (food.x, food.y), 1)
+        for obs in sim.obstacles:
+            self._set(OBSTACLE, (obs.x, obs.y), 1)
+        self.rebuilds += 1
+        self._remember()
+
+    def update(self):
+        """Catch up with the simulation. O(1) per tick when called every tick."""
+        sim, snake, food = self.sim, self.sim.snake, self.sim.food
+        if self._key != (id(snake), sim.seed, sim.generation) or sim.ticks not in (self._ticks, self._ticks + 1) \
+                or len(sim.obstacles) < self._obstacles:
+            self.rebuild()
+            return self.tensor
+
+        if sim.ticks != self._ticks:
+            head = snake.segments[0]
+            self._set(HEAD, self._head, 0)
+            self._set(HEAD, head, 1)
+            self._set(BODY, head, 1)
+            if not snake.occupies(self._tail):
+                self._set(BODY, self._tail, 0)
+            self._head = head
+            self._tail = snake.segments[-1]
+            self._ticks = sim.ticks
+
+        current = (food.x, food.y, food.is_special)
+        if current != self._food:
+            x, y, special = self._food
+            self._set(SPECIAL if special else FOOD, (x, y), 0)
+            self._set(SPECIAL if food.is_special else FOOD, (food.x, food.y), 1)
+            self._food = current
+
+        for obs in sim.obstacles[self._obstacles:]:
+            self._set(OBSTACLE, (obs.x, obs.y), 1)
+        self._obstacles = len(sim.obstacles)
+        return self.tensor
+
+    def crop(self, radius, rotate=False):
+        """
+        The (channels, 2r+1, 2r+1) window centred on the head, with
+        walls beyond the board. A view when radius <= crop_radius.
+        With rotate, the window is turned so the snake heads up.
+        """
+        row, col = self._cell(self.sim.snake.segments[0])
+        row = min(max(row, -1), self.rows) + self.pad  # a crashed head may be just off the board
+        col = min(max(col, -1), self.cols) + self.pad
+        if radius <= self.pad:
+            window = self._padded[:, row - radius:row + radius + 1, col - radius:col + radius + 1]
+        else:
+            padded = np.pad(self._padded, ((0, 0), (radius, radius), (radius, radius)))
+            padded[WALL, :radius] = padded[WALL, -radius:] = 1
+            padded[WALL, :, :radius] = padded[WALL, :, -radius:] = 1
+            window = padded[:, row:row + 2 * radius + 1, col:col + 2 * radius + 1]
+        if rotate:
+            dx, dy = self.sim.snake.direction
+            turns = {(0, -1): 0, (1, 0): 1, (0, 1): 2, (-1, 0): 3}[(np.sign(dx), np.sign(dy))]
+            window = np.rot90(window, turns, axes=(1, 2))
+        return window
@@ -1,5 +1,3 @@
-import pygame
-
 class Obstacle:
     """ Represents obstacles in the game that Snake must avoid """
     def __init__(self, x, y, size=20):
@@ -7,12 +5,15 @@ class Obstacle:
         self.y = y
         self.size = size
 
-    def draw(self, screen):
+    def draw(self, screen, atlas=None):
         """ Draws the obstacle as a gray block. """
-        rect = pygame.Rect(self.x, self.y, self.size, self.size)
-        pygame.draw.rect(screen, (100, 100, 100), rect)
+        if atlas is None:
+            from sprites import SpriteAtlas  # imported here so the rules run without pygame
+            atlas = SpriteAtlas.get(self.size)
+        screen.blit(atlas.obstacle, (self.x, self.y))
 
     def get_rect(self):
         """ collision detection"""
+        import pygame  # imported here so the rules run without pygame
         return pygame.Rect(self.x, self.y, self.size, self.size)
 
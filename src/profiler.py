@@ -0,0 +1,121 @@
+import csv
+import json
+import time
+from collections import deque
+
+PHASES = ("events", "update", "draw", "flip", "sleep")
+# upper edges (ms) of the frame-time histogram buckets; the last one is open
+HISTOGRAM_EDGES = (1, 2, 4, 8, 16, 33, 66)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(int(fraction * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    """
+    Times each phase of a frame (events, update, draw, flip, sleep) and
+    keeps the last `window` frames for rolling percentiles.
+
+    Phases are timed back to back: begin_frame() starts the clock, each
+    mark(phase) charges the time since the previous mark to that phase,
+    and end_frame() stores the frame. All times are in seconds.
+    """
+
+    def __init__(self, window=600):
+        self.window = window
+        self.samples = {phase: deque(maxlen=window) for phase in PHASES}
+        self.totals = deque(maxlen=window)
+        self.frames = 0
+        self._current = dict.fromkeys(PHASES, 0.0)
+        self._frame_start = 0.0
+        self._last = 0.0
+
+    def begin_frame(self):
+        self._frame_start = self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """Charge the time since the last mark to phase."""
+        now = time.perf_counter()
+        self._current[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        current = self._current
+        for phase in PHASES:
+            self.samples[phase].append(current[phase])
+            current[phase] = 0.0
+        self.totals.append(self._last - self._frame_start)
+        self.frames += 1
+
+    def stats(self, values):
+        """p50/p95/p99/mean/max of a sequence of frame times, in milliseconds."""
+        ordered = sorted(values)
+        if not ordered:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+        return {
+            "p50": percentile(ordered, 0.50) * 1000,
+            "p95": percentile(ordered, 0.95) * 1000,
+            "p99": percentile(ordered, 0.99) * 1000,
+            "mean": sum(ordered) / len(ordered) * 1000,
+            "max": ordered[-1] * 1000,
+        }
+
+    def histogram(self):
+        """Frame-time counts per bucket, keyed like '4-8ms' and '66+ms'."""
+        counts = dict.fromkeys([f"{lo}-{hi}ms" for lo, hi in zip((0,) + HISTOGRAM_EDGES, HISTOGRAM_EDGES)]
+                               + [f"{HISTOGRAM_EDGES[-1]}+ms"], 0)
+        labels = list(counts)
+        for total in self.totals:
+            ms = total * 1000
+            for i, edge in enumerate(HISTOGRAM_EDGES):
+                if ms < edge:
+                    counts[labels[i]] += 1
+                    break
+            else:
+                counts[labels[-1]] += 1
+        return counts
+
+    def summary(self):
+        """Rolling stats for the whole frame and for each phase."""
+        return {
+            "frames": self.frames,
+            "window": len(self.totals),
+            "frame": self.stats(self.totals),
+            "phases": {phase: self.stats(self.samples[phase]) for phase in PHASES},
+            "histogram": self.histogram(),
+        }
+
+    def overlay_lines(self):
+        """Two short lines of text for the HUD overlay."""
+        frame = self.stats(self.totals)
+        means = {phase: self.stats(self.samples[phase])["mean"] for phase in PHASES}
+        return (
+            f"frame p50 {frame['p50']:.1f}  p95 {frame['p95']:.1f}  p99 {frame['p99']:.1f} ms",
+            "ev {events:.1f} up {update:.1f} dr {draw:.1f} fl {flip:.1f} sl {sleep:.1f}".format(**means),
+        )
+
+    def dump(self, path):
+        """
+        Write the profile to path. A .csv file gets one row per recent
+        frame (ms); anything else gets the JSON summary plus those rows.
+        """
+        rows = [[round(self.totals[i] * 1000, 4)] + [round(self.samples[p][i] * 1000, 4) for p in PHASES]
+                for i in range(len(self.totals))]
+        header = ["frame_ms"] + [f"{phase}_ms" for phase in PHASES]
+
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(rows)
+        else:
+            data = self.summary()
+            data["columns"] = header
+            data["recent_frames"] = rows
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
@@ -0,0 +1,215 @@
+"""
+Compact replays: the seed plus the turn inputs of one game.
+
+Binary layout (all integers are unsigned LEB128 varints unless noted):
+
+    b"PRRP", version byte
+    width, height, top_margin
+    map path length             0 without a map
+    map path, checksum          UTF-8, then 4 bytes little endian (only with a map)
+    seed                        zigzag varint (seeds may be negative)
+    ticks, score                final tick count and score, for checking
+    input count
+    inputs                      varint((tick - previous tick) << 2 | direction)
+
+Directions are 0 up, 1 down, 2 left, 3 right. A game with a few hundred
+turns fits in well under a kilobyte. A game on a designed map points at
+the map file, which must still hold the same map to play it back.
+"""
+import bisect
+import struct
+
+from engine import Simulation
+from levelmap import LevelMap
+
+MAGIC = b"PRRP"
+VERSION = 4  # 2: food and obstacle placement from the order-free index; 3: the map; 4: varint seed
+DIRECTION_CODES = {(0, -1): 0, (0, 1): 1, (-1, 0): 2, (1, 0): 3}
+CODE_DIRECTIONS = {code: d for d, code in DIRECTION_CODES.items()}
+
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    """
+    Everything needed to re-simulate a game: board size, map, seed and
+    the turn inputs as (tick, direction) pairs.
+    """
+
+    def __init__(self, seed, width=600, height=600, top_margin=40, inputs=(),
+                 ticks=0, score=0, block_size=20, level_map=None):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.top_margin = top_margin
+        self.inputs = list(inputs)
+        self.ticks = ticks
+        self.score = score
+        self.block_size = block_size
+        self.level_map = level_map  # (map file path, checksum), or None without a map
+
+    @classmethod
+    def from_simulation(cls, sim):
+        """Replay of the game sim has played so far (sim.record_inputs must be on)."""
+        return cls(sim.seed, sim.width, sim.height, sim.top_margin, sim.inputs,
+                   sim.ticks, sim.score, sim.snake.block_size, sim.map_ref)
+
+    def load_map(self):
+        """The LevelMap the game was played on (None without one), checked against its checksum."""
+        if self.level_map is None:
+            return None
+        return LevelMap.load(*self.level_map)
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        for value in (self.width, self.height, self.top_margin):
+            _write_varint(out, value)
+        if self.level_map is None:
+            _write_varint(out, 0)
+        else:
+            path, checksum = self.level_map
+            if path is None:
+                raise ValueError("only a game on a map file can be recorded")
+            encoded = path.encode()
+            _write_varint(out, len(encoded))
+            out += encoded + struct.pack("<I", checksum)
+        _write_varint(out, self.seed << 1 if self.seed >= 0 else (-self.seed << 1) - 1)
+        _write_varint(out, self.ticks)
+        _write_varint(out, self.score)
+        _write_varint(out, len(self.inputs))
+        previous = 0
+        for tick, (dx, dy) in self.inputs:
+            code = DIRECTION_CODES[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
+            _write_varint(out, (tick - previous) << 2 | code)
+            previous = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data, block_size=20):
+        if data[:4] != MAGIC:
+            raise ValueError("not a replay file")
+        if data[4] != VERSION:
+            raise ValueError(f"unsupported replay version {data[4]}")
+        pos = 5
+        width, pos = _read_varint(data, pos)
+        height, pos = _read_varint(data, pos)
+        top_margin, pos = _read_varint(data, pos)
+        length, pos = _read_varint(data, pos)
+        level_map = None
+        if length:
+            path = bytes(data[pos:pos + length]).decode()
+            (checksum,) = struct.unpack_from("<I", data, pos + length)
+            level_map = (path, checksum)
+            pos += length + 4
+        zigzag, pos = _read_varint(data, pos)
+        seed = zigzag >> 1 if not zigzag & 1 else -(zigzag + 1 >> 1)
+        ticks, pos = _read_varint(data, pos)
+        score, pos = _read_varint(data, pos)
+        count, pos = _read_varint(data, pos)
+        inputs = []
+        tick = 0
+        for _ in range(count):
+            value, pos = _read_varint(data, pos)
+            tick += value >> 2
+            ux, uy = CODE_DIRECTIONS[value & 3]
+            inputs.append((tick, (ux * block_size, uy * block_size)))
+        return cls(seed, width, height, top_margin, inputs, ticks, score, block_size, level_map)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayPlayer:
+    """
+    Re-simulates a replay as fast as possible (no frame pacing).
+    A Snapshot of the state is kept every snapshot_every ticks while playing,
+    so seek() can jump back to the nearest one instead of starting over.
+    """
+
+    def __init__(self, replay, snapshot_every=1000):
+        self.replay = replay
+        self.snapshot_every = snapshot_every
+        self.sim = Simulation(replay.width, replay.height, replay.top_margin, seed=replay.seed)
+        level_map = replay.load_map()
+        if level_map is not None:
+            self.sim.load_map(level_map)
+        self._next_input = 0
+        self._snapshot_ticks = []
+        self._snapshots = []
+        self._take_snapshot()
+
+    @property
+    def tick(self):
+        return self.sim.ticks
+
+    def _take_snapshot(self):
+        tick = self.sim.ticks
+        if self._snapshot_ticks and self._snapshot_ticks[-1] >= tick:
+            return
+        self._snapshot_ticks.append(tick)
+        self._snapshots.append((self.sim.snapshot(), self._next_input))
+
+    def step(self):
+        """Feed this tick's inputs and run one tick. Returns False once the game ends."""
+        sim = self.sim
+        inputs = self.replay.inputs
+        i = self._next_input
+        while i < len(inputs) and inputs[i][0] == sim.ticks:
+            sim.turn(inputs[i][1])
+            i += 1
+        self._next_input = i
+        running = sim.step()
+        if sim.ticks % self.snapshot_every == 0:
+            self._take_snapshot()
+        return running
+
+    def play_to(self, tick):
+        """Run forward until the given tick or the end of the game."""
+        while self.sim.ticks < tick and not self.sim.game_over:
+            self.step()
+        return self.sim
+
+    def play(self):
+        """Run the whole replay and return the final simulation."""
+        return self.play_to(self.replay.ticks)
+
+    def seek(self, tick):
+        """Jump to any tick, going back through the nearest snapshot if needed."""
+        if tick < self.sim.ticks or tick - self.sim.ticks > self.snapshot_every:
+            index = bisect.bisect_right(self._snapshot_ticks, tick) - 1
+            if self._snapshot_ticks[index] > self.sim.ticks or tick < self.sim.ticks:
+                snapshot, next_input = self._snapshots[index]
+                self.sim.restore(snapshot)
+                self._next_input = next_input
+        return self.play_to(tick)
+
+    def matches_recording(self):
+        """True if the replayed game ended with the recorded tick count and score."""
+        return self.sim.ticks == self.replay.ticks and self.sim.score == self.replay.score
@@ -0,0 +1,399 @@
+"""
+Multiplayer server: one authoritative board, many snakes, players over TCP.
+
+    python server.py --port 8765                 # run a server
+    python server.py --load 300 --seconds 10     # server + 300 loopback bots, prints stats
+
+Every message is one line of JSON. Clients send commands:
+
+    "U", "D", "L", "R"   turn (queued like key presses)
+    "S"                  spawn, or respawn after dying
+
+The server sends a welcome and the full board once, then only what
+changed on each tick:
+
+    {"t": "welcome", "id": 7, "w": 1200, "h": 1200, "bs": 20}
+    {"t": "state", "n": 120, "snakes": {"7": [[x, y], ...]}, "scores": {"7": 0},
+     "food": [[x, y, special], ...], "obstacles": [[x, y], ...]}
+    {"t": "tick", "n": 121, "spawned": {"9": [[x, y], ...]}, "dead": ["3"],
+     "m": "RRUL...", "grew": ["7"], "food": [[x, y, special]], "eaten": [[x, y]],
+     "obstacles": [[x, y]], "scores": {"7": 5}}
+
+To apply a tick, add the spawned snakes at the end of the snake list,
+drop the dead ones, then move every remaining snake, in list order, one
+cell in the direction given by its letter in "m"; a snake also loses
+its last segment unless it is listed in "grew". So a move costs one
+byte per snake. Then add the "food" cells and drop the "eaten" ones, in
+that order. Empty fields are left out, and "food" and "obstacles" only
+list new ones. A tick is encoded once and the same bytes go to every
+client.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+
+from arena import Arena
+from engine import Rules
+from eventlog import log
+from profiler import percentile
+
+BLOCK_SIZE = 20
+COMMANDS = {"U": (0, -BLOCK_SIZE), "D": (0, BLOCK_SIZE), "L": (-BLOCK_SIZE, 0), "R": (BLOCK_SIZE, 0)}
+LETTERS = {direction: letter for letter, direction in COMMANDS.items()}
+
+
+def _encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+class SharedBoard(Arena):
+    """
+    The arena (see arena.py), keeping track of what happened between
+    ticks (joins, leaves, spawns) so it goes out with the next delta.
+    """
+
+    def __init__(self, width=1200, height=1200, seed=None, rules=None):
+        self._pending = self._empty_delta()
+        super().__init__(width, height, seed, rules, BLOCK_SIZE)
+        self._pending = self._empty_delta()  # the starting food goes out in full_state()
+
+    @staticmethod
+    def _empty_delta():
+        return {"spawned": {}, "dead": [], "scores": {}, "food": [], "eaten": []}
+
+    def _add_food(self):
+        cell = super()._add_food()
+        if cell is not None:
+            self._pending["food"].append([cell[0], cell[1], self.food[cell]])
+        return cell
+
+    def _take_food(self, cell):
+        special = super()._take_food(cell)
+        if special is not None:
+            self._pending["eaten"].append(list(cell))
+        return special
+
+    def spawn(self, player, bot=False):
+        """Give player a new snake. Returns False if there was no room."""
+        if player in self.snakes:
+            return True
+        if super().spawn(player, bot) is None:
+            return False
+        self._pending["spawned"][player] = list(self.snakes[player].segments)
+        self._pending["scores"][player] = 0
+        return True
+
+    def remove(self, player):
+        """Take a player's snake off the board (on disconnect)."""
+        if player in self.snakes:
+            self._pending["dead"].append(player)
+        super().remove(player)
+
+    def step(self):
+        """
+        Move every snake and return the tick's delta: spawned, dead,
+        grew, food added and eaten, obstacles and changed scores.
+        """
+        delta = self._pending
+        self._pending = self._empty_delta()
+        grew, dead, eaters, new_obstacles = super().step()
+        delta["dead"].extend(dead)
+        delta["grew"] = grew
+        delta["obstacles"] = new_obstacles
+        for player in eaters:
+            delta["scores"][player] = self.scores[player]
+        return delta
+
+    def full_state(self):
+        return {
+            "t": "state", "n": self.ticks,
+            "snakes": {str(p): [list(c) for c in s.segments] for p, s in self.snakes.items()},
+            "scores": {str(p): self.scores[p] for p in self.snakes},
+            "food": [[x, y, special] for (x, y), special in self.food.items()],
+            "obstacles": [list(c) for c in self.obstacle_cells],
+        }
+
+    def encode_delta(self, delta):
+        """The tick message for a delta from step(), as bytes ready to send."""
+        message = {"t": "tick", "n": self.ticks}
+        if delta["spawned"]:
+            message["spawned"] = {str(p): [list(c) for c in body] for p, body in delta["spawned"].items()}
+        if delta["dead"]:
+            message["dead"] = [str(p) for p in delta["dead"]]
+        # every living snake moved this tick, in board order
+        message["m"] = "".join(LETTERS[snake.direction] for snake in self.snakes.values())
+        if delta["grew"]:
+            message["grew"] = [str(p) for p in delta["grew"]]
+        if delta["food"]:
+            message["food"] = delta["food"]
+        if delta["eaten"]:
+            message["eaten"] = delta["eaten"]
+        if delta["obstacles"]:
+            message["obstacles"] = [list(c) for c in delta["obstacles"]]
+        if delta["scores"]:
+            message["scores"] = {str(p): s for p, s in delta["scores"].items()}
+        return _encode(message)
+
+
+class GameServer:
+    """
+    Runs a SharedBoard over TCP. One task per client reads its commands
+    (so input never waits on the tick), and one task ticks the board on
+    a fixed schedule and broadcasts each delta. Clients that fall more
+    than max_buffer bytes behind are disconnected instead of slowing
+    everyone down.
+    """
+
+    def __init__(self, board=None, host="127.0.0.1", port=8765, max_buffer=256 * 1024):
+        self.board = board or SharedBoard()
+        self.host = host
+        self.port = port
+        self.max_buffer = max_buffer
+        self.clients = {}  # player id -> StreamWriter
+        self.tick_times = deque(maxlen=1000)  # seconds spent per tick (step + encode + send)
+        self.bytes_sent = 0
+        self._ids = itertools.count(1)
+        self._server = None
+        self._ticker = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]  # the real one when port was 0
+        self._ticker = asyncio.create_task(self._tick_loop())
+        log.info("server_started", host=self.host, port=self.port)
+
+    async def stop(self):
+        self._ticker.cancel()
+        self._server.close()
+        for writer in list(self.clients.values()):
+            writer.close()
+        await self._server.wait_closed()
+
+    def _send(self, player, data):
+        writer = self.clients.get(player)
+        if writer is None:
+            return
+        if writer.transport.get_write_buffer_size() > self.max_buffer:
+            log.warning("client_too_slow", player=player)
+            self._disconnect(player)
+            return
+        writer.write(data)
+        self.bytes_sent += len(data)
+
+    def _disconnect(self, player):
+        writer = self.clients.pop(player, None)
+        if writer is not None:
+            writer.close()
+        self.board.remove(player)
+
+    async def _handle_client(self, reader, writer):
+        player = next(self._ids)
+        self.clients[player] = writer
+        board = self.board
+        log.debug("player_joined", player=player)
+        self._send(player, _encode({"t": "welcome", "id": player, "w": board.width,
+                                    "h": board.height, "bs": BLOCK_SIZE}))
+        self._send(player, _encode(board.full_state()))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.strip().decode(errors="replace")
+                if command in COMMANDS:
+                    board.turn(player, COMMANDS[command])
+                elif command == "S":
+                    board.spawn(player)
+        except ConnectionError:
+            pass
+        finally:
+            self._disconnect(player)
+            log.debug("player_left", player=player)
+
+    async def _tick_loop(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            next_tick += 1.0 / self.board.tick_rate()
+            delay = next_tick - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < -0.25:
+                next_tick = loop.time()  # too far behind: skip ahead instead of bursting
+            else:
+                await asyncio.sleep(0)  # let client readers run between late ticks
+
+            start = time.perf_counter()
+            data = self.board.encode_delta(self.board.step())
+            for player in list(self.clients):
+                self._send(player, data)
+            self.tick_times.append(time.perf_counter() - start)
+
+    def stats(self):
+        """Tick cost percentiles in milliseconds, and how many players are connected."""
+        times = sorted(self.tick_times)
+        return {
+            "clients": len(self.clients),
+            "snakes": len(self.board.snakes),
+            "ticks": self.board.ticks,
+            "tick_ms_p50": percentile(times, 0.5) * 1000,
+            "tick_ms_p99": percentile(times, 0.99) * 1000,
+            "tick_ms_max": (times[-1] if times else 0.0) * 1000,
+        }
+
+
+class BoardClient:
+    """
+    A player connection that keeps a mirror of the board from the
+    server's messages. With mirror=False it only follows whether its own
+    snake is alive, which is all the load generator needs.
+    """
+
+    def __init__(self, mirror=True):
+        self.mirror = mirror
+        self.alive = False
+        self.id = None
+        self.snakes = {}  # player id (str) -> deque of (x, y), head first
+        self.scores = {}
+        self.food = {}  # (x, y) -> is_special
+        self.obstacles = set()
+        self.tick = 0
+        self.bytes_received = 0
+        self._reader = None
+        self._writer = None
+
+    async def connect(self, host, port):
+        self._reader, self._writer = await asyncio.open_connection(host, port)
+
+    def send(self, command):
+        self._writer.write(command.encode() + b"\n")
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def receive(self):
+        """Read and apply one message. Returns it, or None when the server is gone."""
+        line = await self._reader.readline()
+        if not line:
+            return None
+        self.bytes_received += len(line)
+        message = json.loads(line)
+        self.apply(message)
+        return message
+
+    def apply(self, message):
+        kind = message["t"]
+        if kind == "welcome":
+            self.id = str(message["id"])
+        elif kind == "tick":
+            if self.id in message.get("spawned", ()):
+                self.alive = True
+            if self.id in message.get("dead", ()):
+                self.alive = False
+        if not self.mirror:
+            return
+
+        if kind == "state":
+            self.tick = message["n"]
+            self.snakes = {p: deque(map(tuple, body)) for p, body in message["snakes"].items()}
+            self.scores = dict(message["scores"])
+            self.food = {(x, y): special for x, y, special in message["food"]}
+            self.obstacles = {tuple(c) for c in message["obstacles"]}
+        elif kind == "tick":
+            self.tick = message["n"]
+            for p, body in message.get("spawned", {}).items():
+                self.snakes[p] = deque(map(tuple, body))
+            for p in message.get("dead", ()):
+                self.snakes.pop(p, None)
+            grew = set(message.get("grew", ()))
+            for (p, segments), letter in zip(self.snakes.items(), message["m"]):
+                dx, dy = COMMANDS[letter]
+                x, y = segments[0]
+                segments.appendleft((x + dx, y + dy))
+                if p not in grew:
+                    segments.pop()
+            for x, y, special in message.get("food", ()):
+                self.food[(x, y)] = special
+            for x, y in message.get("eaten", ()):
+                self.food.pop((x, y), None)
+            self.obstacles.update(tuple(c) for c in message.get("obstacles", ()))
+            self.scores.update(message.get("scores", {}))
+
+
+async def _bot(host, port, seconds, rng):
+    """Load generator player: turns at random and respawns when it dies."""
+    client = BoardClient(mirror=False)
+    await client.connect(host, port)
+    client.send("S")
+    deadline = time.perf_counter() + seconds
+    try:
+        while time.perf_counter() < deadline:
+            message = await client.receive()
+            if message is None:
+                break
+            if message["t"] != "tick":
+                continue
+            if not client.alive:
+                client.send("S")
+            elif rng.random() < 0.2:
+                client.send(rng.choice("UDLR"))
+    finally:
+        await client.close()
+    return client.bytes_received
+
+
+async def run_load(clients=100, seconds=5.0, width=2000, height=2000, seed=0, base_speed=10):
+    """Start a server and `clients` loopback bots in this process; return the server stats."""
+    board = SharedBoard(width, height, seed=seed, rules=Rules(base_speed=base_speed))
+    server = GameServer(board, port=0)
+    await server.start()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    received = await asyncio.gather(*(_bot(server.host, server.port, seconds, random.Random(rng.random()))
+                                      for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    stats = server.stats()
+    await server.stop()
+    stats["ticks_per_s"] = board.ticks / elapsed
+    stats["bytes_per_client_per_tick"] = sum(received) / max(clients * board.ticks, 1)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multiplayer snake server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--size", default="60x60", metavar="COLSxROWS", help="board size in cells")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--load", type=int, metavar="N",
+                        help="instead of serving, run N loopback bots against a local server and print stats")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of a --load run")
+    parser.add_argument("--log-level", choices=["debug", "info", "warning", "off"], default="info")
+    args = parser.parse_args()
+
+    log.set_level(args.log_level)
+    cols, rows = (int(n) for n in args.size.lower().split("x"))
+    if args.load:
+        log.set_level("warning")
+        stats = asyncio.run(run_load(args.load, args.seconds, cols * BLOCK_SIZE, rows * BLOCK_SIZE,
+                                     args.seed or 0))
+        print(json.dumps(stats, indent=2))
+    else:
+        async def serve():
+            server = GameServer(SharedBoard(cols * BLOCK_SIZE, rows * BLOCK_SIZE, seed=args.seed),
+                                args.host, args.port)
+            await server.start()
+            await asyncio.Event().wait()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
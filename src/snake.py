@@ -1,4 +1,34 @@
-import pygame
+from collections import deque
+from itertools import islice
+
+MAX_QUEUED_TURNS = 3  # key presses remembered between ticks
+
+
+class Segments(deque):
+    """
+    The snake's cells, head first. A deque, so adding a head and dropping
+    a tail are O(1), that still behaves like the list it used to be:
+    segments[1:] gives a list, and it equals a list of the same cells.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        return deque.__getitem__(self, index)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return deque.__eq__(self, other)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
 
 class Snake:
     """
@@ -10,44 +40,68 @@ class Snake:
         self.block_size = block_size
         start_x = 200
         start_y = 200
-        self.segments = [
+        # head is segments[0], also kept in head for the per-tick checks
+        self.set_segments([
             (start_x, start_y),
             (start_x - block_size, start_y),
             (start_x - 2 * block_size, start_y),
-        ]
+        ])
 
         # Movement direction (dx, dy)
         self.direction = (block_size, 0)
-        self.next_direction = self.direction
+        # turns waiting for upcoming moves, one is used per move
+        self.turn_queue = deque()
         self.grow_pending = 0
 
+    @property
+    def next_direction(self):
+        """Direction the next move will use."""
+        return self.turn_queue[0] if self.turn_queue else self.direction
+
     def change_direction(self, new_direction):
         """
-        Change direction for the next move and prevents reversing directly """
+        Queue a direction for an upcoming move and prevents reversing directly.
+        Each move uses one queued turn, so two quick presses inside one tick
+        both count. The reversal check is against the last queued direction.
+        """
+        last_dx, last_dy = self.turn_queue[-1] if self.turn_queue else self.direction
         new_dx, new_dy = new_direction
-        curr_dx, curr_dy = self.direction
-        next_dx, next_dy = self.next_direction
-        if (new_dx == -curr_dx and new_dy == -curr_dy) or \
-           (new_dx == -next_dx and new_dy == -next_dy):
+        if new_dx == -last_dx and new_dy == -last_dy:
             return  # do not allow 180-degree turn
-        self.next_direction = new_direction
+        if new_direction == (last_dx, last_dy):
+            return  # already heading that way
+        if len(self.turn_queue) >= MAX_QUEUED_TURNS:
+            return  # queue full, drop the extra press
+        self.turn_queue.append(new_direction)
 
     def move(self):
         """
         Moves the snake by adding a new head and removing the last tail segment.
-        the tail is NOT removed, so the snake grows.
+        If a grow is pending the tail is NOT removed, so the snake grows.
+        Returns the tail cell that was removed, or None when growing.
         """
-        self.direction = self.next_direction
-        head_x, head_y = self.segments[0]
+        if self.turn_queue:
+            self.direction = self.turn_queue.popleft()
+        head_x, head_y = self.head
         dx, dy = self.direction
-        new_head = (head_x + dx, head_y + dy)
-        self.segments.insert(0, new_head)
+        new_head = self.head = (head_x + dx, head_y + dy)
+        segments = self._segments
+        segments.appendleft(new_head)
+        cells = self._cells
+        cells[new_head] = cells.get(new_head, 0) + 1
 
         # If it still needs to grow, keep the tail
         if self.grow_pending > 0:
             self.grow_pending -= 1
+            return None
+
+        tail = segments.pop() # Remove tail to keep same length
+        count = cells[tail] - 1
+        if count:
+            cells[tail] = count
         else:
-            self.segments.pop() # Remove tail to keep same length
+            del cells[tail]
+        return tail
 
     def grow(self):
         """
@@ -55,58 +109,46 @@ class Snake:
         """
         self.grow_pending += 1
 
-    def draw(self, screen, head_color=(0, 220, 0), body_color=(0, 180, 0)):
+    def draw(self, screen, head_color=(0, 220, 0), body_color=(0, 180, 0), atlas=None):
         """
-        Draws the snake on the screen
+        Draws the snake on the screen by blitting pre-rendered sprites
         """
         if not self.segments:
             return
-        head_x, head_y = self.segments[0]
-        head_rect = pygame.Rect(head_x, head_y, self.block_size, self.block_size)
-        pygame.draw.rect(screen, head_color, head_rect)
-
-        # draw eyes on the head based on direction
-        eye_radius = 3
-        padding = 3
-        dx, dy = self.direction
-
-        if dx > 0:  # moving RIGHT
-            eye1 = (head_x + self.block_size - padding,
-                    head_y + padding)
-            eye2 = (head_x + self.block_size - padding,
-                    head_y + self.block_size - padding)
-        elif dx < 0:  # moving LEFT
-            eye1 = (head_x + padding,
-                    head_y + padding)
-            eye2 = (head_x + padding,
-                    head_y + self.block_size - padding)
-        elif dy < 0:  # moving UP
-            eye1 = (head_x + padding,
-                    head_y + padding)
-            eye2 = (head_x + self.block_size - padding,
-                    head_y + padding)
-        else:  # moving DOWN
-            eye1 = (head_x + padding,
-                    head_y + self.block_size - padding)
-            eye2 = (head_x + self.block_size - padding,
-                    head_y + self.block_size - padding)
-
-        pygame.draw.circle(screen, (0, 0, 0), eye1, eye_radius)
-        pygame.draw.circle(screen, (0, 0, 0), eye2, eye_radius)
-
-        # draw body
-        for (x, y) in self.segments[1:]:
-            rect = pygame.Rect(x, y, self.block_size, self.block_size)
-            pygame.draw.rect(screen, body_color, rect)
+        if atlas is None:
+            from sprites import SpriteAtlas  # imported here so the rules run without pygame
+            atlas = SpriteAtlas.get(self.block_size, head_color, body_color)
+        self.draw_head(screen, atlas=atlas)
+
+        # draw body in one batched call
+        body = atlas.body
+        screen.blits([(body, cell) for cell in islice(self.segments, 1, None)], doreturn=False)
+
+    def draw_segment(self, screen, cell, body_color=(0, 180, 0), atlas=None):
+        """Draws one body segment on the given (x, y) cell."""
+        if atlas is None:
+            from sprites import SpriteAtlas  # imported here so the rules run without pygame
+            atlas = SpriteAtlas.get(self.block_size, body_color=body_color)
+        screen.blit(atlas.body, cell)
+
+    def draw_head(self, screen, head_color=(0, 220, 0), atlas=None):
+        """Draws the head with its eyes facing the current direction."""
+        if atlas is None:
+            from sprites import SpriteAtlas  # imported here so the rules run without pygame
+            atlas = SpriteAtlas.get(self.block_size, head_color=head_color)
+        screen.blit(atlas.head(self.direction), self.segments[0])
 
     def check_self_collision(self):
         """Return True if the snake's head runs into its own body"""
         if len(self.segments) <= 3:
             return False
 
-        head = self.segments[0]
-        body = self.segments[1:]
-        return head in body
+        # the head cell is counted once for the head itself
+        return self._cells[self.head] > 1
+
+    def occupies(self, cell):
+        """Return True if any segment sits on the given (x, y) cell."""
+        return cell in self._cells
 
     def is_out_of_bounds(self, width, height, top_margin=40):
         """
@@ -115,7 +157,7 @@ class Snake:
         - x from 0 to width - block_size
         - y from top_margin to height - block_size
         """
-        head_x, head_y = self.segments[0]
+        head_x, head_y = self.head
 
         # left/right
         if head_x < 0 or head_x >= width:
@@ -129,6 +171,7 @@ class Snake:
 
     def get_head_rect(self):
         """for collision checks."""
+        import pygame  # imported here so the rules run without pygame
         head_x, head_y = self.segments[0]
         return pygame.Rect(head_x, head_y, self.block_size, self.block_size)
 
@@ -140,4 +183,27 @@ class Snake:
         dx = new_x - head_x
         dy = new_y - head_y
 
-        self.segments = [(x + dx, y + dy) for (x, y) in self.segments]
+        self.set_segments((x + dx, y + dy) for (x, y) in self.segments)
+
+    @property
+    def segments(self):
+        """The body as a Segments deque, head first. Assigning goes through set_segments()."""
+        return self._segments
+
+    @segments.setter
+    def segments(self, segments):
+        self.set_segments(segments)
+
+    def set_segments(self, segments):
+        """
+        Replace the whole body with the given cells, head first.
+        """
+        self._segments = Segments(segments)
+        self.head = self._segments[0] if self._segments else None
+        self._rebuild_cells()
+
+    def _rebuild_cells(self):
+        """Recount the occupancy map from scratch (only after bulk changes)."""
+        self._cells = {}
+        for cell in self._segments:
+            self._cells[cell] = self._cells.get(cell, 0) + 1
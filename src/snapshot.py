@@ -0,0 +1,155 @@
+"""
+Compact game state snapshots, for save/resume, seeking in replays and
+lookahead bots that branch many futures per tick.
+
+In memory a Snapshot is a handful of tuples sharing the (immutable)
+cell tuples of the live game. The free-cell index is left out: what it
+samples depends only on which cells are taken, so restoring rebuilds it
+from the snake, obstacles and food, and nothing grows with the board.
+On disk it is flat 32-bit integer arrays:
+
+    b"PRSN", version byte
+    seed                        i64, little endian
+    gauss_next                  f64 (NaN when unset)
+    map checksum, path length   u32 u16 (both 0 without a map)
+    map path                    UTF-8
+    int count, ints             i32 each, layout below
+    rng state                   625 x u32
+
+ints: width, height, top_margin, block_size, ticks, score, level,
+game_over, end_cause, grow_pending, dx, dy, food x, food y, special,
+then count-prefixed lists of (x, y) pairs: segments, queued turns and
+obstacles, and (tick, dx, dy) triples: inputs.
+
+A game on a designed map stores only the map file's path and checksum;
+the map is loaded again from there.
+"""
+import math
+import struct
+import sys
+from array import array
+
+MAGIC = b"PRSN"
+VERSION = 3  # 3: the map's path and checksum
+CAUSES = (None, "wall", "obstacle", "self")
+_HEADER = struct.Struct("<4sBqd")
+_MAP = struct.Struct("<IH")
+
+
+def _flatten(out, items):
+    out.append(len(items))
+    for item in items:
+        out.extend(item)
+
+
+def _unflatten(ints, pos, width=2):
+    count = ints[pos]
+    pos += 1
+    end = pos + count * width
+    items = tuple(zip(*[iter(ints[pos:end])] * width))
+    return items, end
+
+
+def _pack_map(level_map):
+    """The map part of the header: checksum, path length and path."""
+    if level_map is None:
+        return _MAP.pack(0, 0)
+    path, checksum = level_map
+    if path is None:
+        raise ValueError("only a game on a map file can be saved")
+    encoded = path.encode()
+    return _MAP.pack(checksum, len(encoded)) + encoded
+
+
+class Snapshot:
+    """
+    Everything needed to put a Simulation back in a given state.
+    Take one with Simulation.snapshot() and apply it with restore().
+    """
+
+    __slots__ = ("board", "seed", "rng_state", "scalars", "segments", "turn_queue",
+                 "obstacles", "inputs", "level_map")
+
+    def __init__(self, board, seed, rng_state, scalars, segments, turn_queue, obstacles, inputs=(),
+                 level_map=None):
+        self.board = board            # (width, height, top_margin, block_size)
+        self.seed = seed
+        self.rng_state = rng_state    # random.Random.getstate()
+        # (ticks, score, level, game_over, end_cause, grow_pending,
+        #  direction, food x, food y, food special)
+        self.scalars = scalars
+        self.segments = segments      # head first
+        self.turn_queue = turn_queue
+        self.obstacles = obstacles    # obstacle cells in the order they appeared
+        self.inputs = inputs          # recorded (tick, direction) turns, if recording
+        self.level_map = level_map    # (map file path, checksum), or None without a map
+
+    @property
+    def ticks(self):
+        return self.scalars[0]
+
+    @property
+    def score(self):
+        return self.scalars[1]
+
+    def to_bytes(self):
+        (ticks, score, level, game_over, end_cause, grow_pending,
+         (dx, dy), food_x, food_y, special) = self.scalars
+        ints = array("i", self.board)
+        ints.extend((ticks, score, level, game_over, CAUSES.index(end_cause), grow_pending,
+                     dx, dy, food_x, food_y, special))
+        _flatten(ints, self.segments)
+        _flatten(ints, self.turn_queue)
+        _flatten(ints, self.obstacles)
+        _flatten(ints, [(tick, dx, dy) for tick, (dx, dy) in self.inputs])
+
+        version, words, gauss_next = self.rng_state
+        rng = array("I", words)
+        if sys.byteorder == "big":
+            ints.byteswap()
+            rng.byteswap()
+        gauss = math.nan if gauss_next is None else gauss_next
+        return (_HEADER.pack(MAGIC, VERSION, self.seed, gauss) + _pack_map(self.level_map)
+                + struct.pack("<I", len(ints)) + ints.tobytes() + rng.tobytes())
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, gauss = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a snapshot file")
+        if version != VERSION:
+            raise ValueError(f"unsupported snapshot version {version}")
+        checksum, length = _MAP.unpack_from(data, _HEADER.size)
+        pos = _HEADER.size + _MAP.size
+        level_map = (bytes(data[pos:pos + length]).decode(), checksum) if length else None
+        pos += length
+        (count,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        ints = array("i", data[pos:pos + count * 4])
+        rng = array("I", data[pos + count * 4:])
+        if sys.byteorder == "big":
+            ints.byteswap()
+            rng.byteswap()
+
+        ints = ints.tolist()
+        board = tuple(ints[:4])
+        (ticks, score, level, game_over, cause, grow_pending,
+         dx, dy, food_x, food_y, special) = ints[4:15]
+        scalars = (ticks, score, level, bool(game_over), CAUSES[cause], grow_pending,
+                   (dx, dy), food_x, food_y, bool(special))
+        segments, pos = _unflatten(ints, 15)
+        turn_queue, pos = _unflatten(ints, pos)
+        obstacles, pos = _unflatten(ints, pos)
+        raw_inputs, pos = _unflatten(ints, pos, 3)
+        inputs = tuple((tick, (dx, dy)) for tick, dx, dy in raw_inputs)
+        rng_state = (3, tuple(rng), None if math.isnan(gauss) else gauss)
+        return cls(board, seed, rng_state, scalars, segments, turn_queue, obstacles, inputs, level_map)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
@@ -0,0 +1,90 @@
+import pygame
+
+# direction signs -> which head sprite to use
+RIGHT, LEFT, UP, DOWN = (1, 0), (-1, 0), (0, -1), (0, 1)
+
+
+class SpriteAtlas:
+    """
+    Every picture the game draws, pre-rendered once per block size and
+    snake palette: the head facing each direction, a body segment,
+    normal and special food, and an obstacle block.
+    Drawing then becomes plain blits.
+    """
+
+    _cache = {}
+
+    def __init__(self, block_size=20, head_color=(0, 220, 0), body_color=(0, 180, 0)):
+        self.block_size = block_size
+        self.heads = {d: self._make_head(head_color, d) for d in (RIGHT, LEFT, UP, DOWN)}
+        self.body = self._make_block(body_color)
+        self.food = self._make_food(special=False)
+        self.special_food = self._make_food(special=True)
+        self.obstacle = self._make_block((100, 100, 100))
+
+    @classmethod
+    def get(cls, block_size=20, head_color=(0, 220, 0), body_color=(0, 180, 0)):
+        """Return the atlas for this size and palette, building it on first use."""
+        key = (block_size, head_color, body_color)
+        atlas = cls._cache.get(key)
+        if atlas is None:
+            atlas = cls._cache[key] = cls(block_size, head_color, body_color)
+        return atlas
+
+    def head(self, direction):
+        """Head sprite for a (dx, dy) direction of any step size."""
+        dx, dy = direction
+        return self.heads[((dx > 0) - (dx < 0), (dy > 0) - (dy < 0))]
+
+    def _new_surface(self):
+        surface = pygame.Surface((self.block_size, self.block_size), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface
+
+    def _make_block(self, color):
+        surface = self._new_surface()
+        surface.fill(color)
+        return surface
+
+    def _make_head(self, head_color, direction):
+        """Head block with eyes placed on the side it is moving towards."""
+        surface = self._make_block(head_color)
+        size = self.block_size
+        eye_radius = 3
+        padding = 3
+
+        if direction == RIGHT:
+            eye1 = (size - padding, padding)
+            eye2 = (size - padding, size - padding)
+        elif direction == LEFT:
+            eye1 = (padding, padding)
+            eye2 = (padding, size - padding)
+        elif direction == UP:
+            eye1 = (padding, padding)
+            eye2 = (size - padding, padding)
+        else:  # DOWN
+            eye1 = (padding, size - padding)
+            eye2 = (size - padding, size - padding)
+
+        pygame.draw.circle(surface, (0, 0, 0), eye1, eye_radius)
+        pygame.draw.circle(surface, (0, 0, 0), eye2, eye_radius)
+        return surface
+
+    def _make_food(self, special):
+        """
+        Normal: red circle with a white shine
+        Special: blue circle with a gold shine
+        """
+        surface = self._new_surface()
+        center = self.block_size // 2
+        radius = self.block_size // 2 - 2
+        shine = (center - radius // 2, center - radius // 2)
+
+        if special:
+            pygame.draw.circle(surface, (0, 120, 255), (center, center), radius)
+            pygame.draw.circle(surface, (255, 215, 0), shine, 3)
+        else:
+            pygame.draw.circle(surface, (220, 40, 40), (center, center), radius)
+            pygame.draw.circle(surface, (255, 255, 255), shine, 2)
+        return surface
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from arena import Arena, EMPTY, OBSTACLE
+from engine import Rules
+from snake import Snake
+
+RIGHT, LEFT, UP, DOWN = (20, 0), (-20, 0), (0, -20), (0, 20)
+
+
+def place(arena, snake_id, body, direction):
+    """Put a snake with the given cells (head first) on the board."""
+    snake = Snake()
+    snake.set_segments(body)
+    snake.direction = direction
+    arena.snakes[snake_id] = snake
+    arena.scores[snake_id] = 0
+    for cell in body:
+        arena.grid[arena._index(cell)] = snake_id
+
+
+class TestArena(unittest.TestCase):
+    def setUp(self):
+        self.arena = Arena(400, 400, seed=1, rules=Rules(start_obstacles=0))
+        self.arena.food.clear()
+
+    def test_head_to_head_kills_both(self):
+        """Two heads entering the same cell on the same tick both crash."""
+        place(self.arena, 1, [(100, 200), (80, 200), (60, 200)], RIGHT)
+        place(self.arena, 2, [(140, 200), (160, 200), (180, 200)], LEFT)
+        _, dead, _, _ = self.arena.step()
+        self.assertEqual(dead, [1, 2])
+        self.assertEqual(list(self.arena.grid).count(EMPTY), len(self.arena.grid))
+
+    def test_following_a_tail_is_safe(self):
+        """All tails move before heads, so a snake may enter the cell another's tail leaves."""
+        place(self.arena, 1, [(100, 200), (80, 200), (60, 200)], RIGHT)
+        place(self.arena, 2, [(160, 200), (140, 200), (120, 200)], RIGHT)
+        _, dead, _, _ = self.arena.step()
+        self.assertEqual(dead, [])
+
+    def test_body_and_obstacle_crashes(self):
+        """A head on another body or an obstacle crashes; the other snake lives."""
+        place(self.arena, 1, [(100, 180), (100, 160), (100, 140)], DOWN)
+        place(self.arena, 2, [(120, 200), (100, 200), (80, 200)], RIGHT)
+        place(self.arena, 3, [(300, 300), (280, 300), (260, 300)], RIGHT)
+        self.arena.grid[self.arena._index((320, 300))] = OBSTACLE
+        _, dead, _, _ = self.arena.step()
+        self.assertEqual(dead, [1, 3])
+        self.assertIn(2, self.arena.snakes)
+
+    def test_grid_matches_snakes(self):
+        """With many bots running, the grid always lists exactly the snakes' cells."""
+        arena = Arena(60 * 20, 60 * 20, seed=3)
+        for _ in range(40):
+            arena.spawn(bot=True)
+        for _ in range(300):
+            _, dead, _, _ = arena.step()
+            for _ in dead:
+                arena.spawn(bot=True)
+        expected = {arena._index(c): i for i, s in arena.snakes.items() for c in s.segments}
+        owners = {i: owner for i, owner in enumerate(arena.grid) if owner > 0}
+        self.assertEqual(owners, expected)
+        self.assertTrue(any(score > 0 for score in arena.scores.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+from collections import deque
+
+sys.path.append(os.path.dirname(__file__))
+
+from engine import Simulation
+from autopilot import Autopilot
+
+
+class TestAutopilot(unittest.TestCase):
+    def test_plays_much_better_than_chance(self):
+        """The autopilot should eat a good amount of food before dying."""
+        sim = Simulation(seed=1)
+        pilot = Autopilot(budget=None)
+        while sim.ticks < 3000 and sim.step(pilot.decide(sim)):
+            pass
+        self.assertGreaterEqual(sim.score, 100)
+
+    def test_never_turns_into_a_wall(self):
+        """With food behind a wall-side head, the chosen move stays on the board."""
+        sim = Simulation(seed=2)
+        sim.clear_obstacles()
+        sim.snake.set_segments([(580, 300), (560, 300), (540, 300)])
+        direction = Autopilot(budget=None).decide(sim)
+        self.assertIn(direction, [(0, -20), (0, 20)])
+
+    def test_tiny_budget_falls_back_to_survival_rule(self):
+        """When the budget is already spent, a legal move still comes back."""
+        sim = Simulation(seed=3)
+        pilot = Autopilot(budget=-1)
+        direction = pilot.decide(sim)
+        self.assertIsNotNone(direction)
+        self.assertEqual(pilot.fallbacks, 1)
+
+    def test_new_obstacle_is_repaired_in_place(self):
+        """After an obstacle lands on the path, the kept distances match a fresh BFS."""
+        sim = Simulation(seed=4)
+        sim.clear_obstacles()
+        pilot = Autopilot(budget=None)
+        for _ in range(3):
+            sim.step(pilot.decide(sim))
+        settled = set(pilot._dist)
+        cell = next(c for c, d in pilot._dist.items() if d == 3)
+        sim.add_obstacle(*cell)
+        pilot.decide(sim)
+
+        food = (sim.food.x, sim.food.y)
+        fresh, queue = {food: 0}, deque([food])
+        while queue:
+            current = queue.popleft()
+            for nxt in pilot._neighbours(sim, current):
+                if nxt not in fresh:
+                    fresh[nxt] = fresh[current] + 1
+                    queue.append(nxt)
+        self.assertEqual(pilot._food, food)  # the same search, not a new one
+        self.assertNotIn(cell, pilot._dist)
+        self.assertGreater(len(settled & set(pilot._dist)), 3)  # the rest of the map was kept
+        for c, d in pilot._dist.items():
+            self.assertEqual(d, fresh[c])
+
+
+if __name__ == "__main__":
+    unittest.main()
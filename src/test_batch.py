@@ -0,0 +1,41 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from batch import play_chunk, run_batch, RECORD_FIELDS
+from engine import Rules
+from eventlog import log, INFO
+
+
+class TestBatch(unittest.TestCase):
+    def test_chunk_records_are_flat_and_complete(self):
+        """play_chunk returns one fixed-width record per game."""
+        records = play_chunk("random", Rules().as_dict(), 100, 5, max_ticks=500)
+        self.assertEqual(len(records), 5 * len(RECORD_FIELDS))
+        self.assertEqual(list(records[::len(RECORD_FIELDS)]), [100, 101, 102, 103, 104])
+
+    def test_results_do_not_depend_on_worker_count(self):
+        """Per-game seeds make a pooled run match a single-process run."""
+        single = run_batch(60, "random", seed=7, workers=1, chunk_size=16, max_ticks=500)
+        pooled = run_batch(60, "random", seed=7, workers=2, chunk_size=16, max_ticks=500)
+        self.assertEqual(single.games, 60)
+        self.assertEqual(single.summary(), pooled.summary())
+
+    def test_rules_change_the_outcome(self):
+        """Knobs in Rules reach the simulation (no obstacles means no obstacle deaths)."""
+        stats = run_batch(50, "random", Rules(start_obstacles=0, obstacles_per_level=0),
+                          workers=1, max_ticks=500)
+        self.assertNotIn("obstacle", stats.causes)
+
+    def test_single_process_run_keeps_the_callers_log(self):
+        """Worker setup silences the log, but only for the run itself."""
+        self.addCleanup(log.set_level, log.level)
+        log.set_level(INFO)
+        run_batch(5, "random", workers=1, max_ticks=50)
+        self.assertEqual(log.level, INFO)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(__file__))
+
+import pygame
+from camera import Camera, ChunkedBackground
+from freecells import GridFreeCells
+from game import Game
+
+
+class TestCamera(unittest.TestCase):
+
+    def tearDown(self):
+        pygame.quit()
+
+    def test_follow_stays_inside_the_world(self):
+        """The view centers on the head but never scrolls past an edge."""
+        camera = Camera(600, 560, 40000, 40000, screen_pos=(0, 40))
+        camera.follow(20000, 20000, 20)
+        self.assertEqual((camera.x, camera.y), (20000 + 10 - 300, 20000 + 10 - 280))
+        self.assertEqual(camera.to_screen(20000, 20000), (290, 310))
+        camera.follow(0, 0, 20)
+        self.assertEqual((camera.x, camera.y), (0, 0))
+        camera.follow(39980, 39980, 20)
+        self.assertEqual((camera.x, camera.y), (40000 - 600, 40000 - 560))
+
+    def test_background_chunks_are_cached(self):
+        """Scrolling back over the same area renders no new chunks."""
+        pygame.display.set_mode((600, 600))
+        background = ChunkedBackground(40000, 40000, chunk_cells=16)
+        camera = Camera(600, 560, 40000, 40000)
+        screen = pygame.display.get_surface()
+        camera.follow(1000, 1000)
+        background.draw(screen, camera)
+        first = background.renders
+        for x in range(1000, 1200, 20):
+            camera.follow(x, 1000)
+            background.draw(screen, camera)
+        camera.follow(1000, 1000)
+        background.draw(screen, camera)
+        self.assertLessEqual(first, 9)
+        self.assertLessEqual(background.renders, first + 3)
+
+    def test_huge_world_game_draws(self):
+        """A 2000x2000-cell world plays and draws through the camera."""
+        game = Game(world_size=(2000, 2000), seed=4)
+        self.assertIsInstance(game.sim.free_cells, GridFreeCells)
+        for _ in range(5):
+            game.update()
+            game.draw()
+        self.assertFalse(game.game_over)
+        head_on_screen = game.camera.to_screen(*game.snake.segments[0])
+        self.assertTrue(game.camera.rect.collidepoint(head_on_screen))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from engine import Simulation
+
+
+class TestSimulation(unittest.TestCase):
+    def test_starts_with_three_obstacles(self):
+        """A new game has score 0, level 1 and three obstacles."""
+        sim = Simulation()
+        self.assertEqual(sim.score, 0)
+        self.assertEqual(sim.level, 1)
+        self.assertEqual(len(sim.obstacles), 3)
+
+    def test_step_moves_snake_right(self):
+        """step() with no action keeps moving in the current direction."""
+        sim = Simulation()
+        sim.clear_obstacles()
+        sim.food.x, sim.food.y = 0, 580
+        sim.step()
+        self.assertEqual(sim.snake.segments[0], (220, 200))
+
+    def test_wall_ends_game(self):
+        """Driving into the top HUD band ends the game."""
+        sim = Simulation()
+        sim.clear_obstacles()
+        sim.food.x, sim.food.y = 0, 580
+        while sim.step((0, -20)):
+            pass
+        self.assertTrue(sim.game_over)
+        self.assertLess(sim.snake.segments[0][1], 40)
+
+    def test_eating_food_scores_and_grows(self):
+        """Eating normal food adds 5 points and one segment."""
+        sim = Simulation()
+        sim.clear_obstacles()
+        sim.food.x, sim.food.y = 220, 200
+        sim.food.is_special = False
+        sim.step()
+        sim.step()
+        self.assertEqual(sim.score, 5)
+        self.assertEqual(len(sim.snake.segments), 4)
+
+    def test_obstacle_ends_game(self):
+        """Moving onto an indexed obstacle cell ends the game."""
+        sim = Simulation()
+        sim.clear_obstacles()
+        sim.food.x, sim.food.y = 0, 580
+        sim.add_obstacle(240, 200)
+        self.assertTrue(sim.step())
+        self.assertFalse(sim.step())
+        self.assertTrue(sim.game_over)
+
+
+if __name__ == "__main__":
+    unittest.main()
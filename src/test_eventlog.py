@@ -0,0 +1,48 @@
+import io
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from eventlog import EventLog, DEBUG, INFO
+
+
+class TestEventLog(unittest.TestCase):
+    def test_records_below_level_are_dropped(self):
+        """Nothing is buffered for levels that are switched off."""
+        out = io.StringIO()
+        log = EventLog(level=INFO, stream=out)
+        log.debug("food_respawned", x=0, y=40)
+        self.assertEqual(len(log._buffer), 0)
+        log.set_level("off")
+        log.warning("no_free_cell")
+        self.assertEqual(len(log._buffer), 0)
+        log.close()
+        self.assertEqual(out.getvalue(), "")
+
+    def test_the_shared_log_is_quiet_by_default(self):
+        """Playing games through the rules prints nothing unless a caller turns events on."""
+        script = ("from engine import Simulation\n"
+                  "sim = Simulation(seed=1)\n"
+                  "while sim.step(): pass\n")
+        done = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True)
+        self.assertEqual(done.stdout, "")
+
+    def test_records_are_written_on_flush(self):
+        """Kept records are written as 'time LEVEL event key=value' lines."""
+        out = io.StringIO()
+        log = EventLog(level=DEBUG, stream=out, flush_interval=60)
+        log.info("food_eaten", special=False, score=5)
+        log.debug("obstacle_added", x=20, y=60)
+        log.close()
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].endswith("INFO food_eaten special=False score=5"))
+        self.assertTrue(lines[1].endswith("DEBUG obstacle_added x=20 y=60"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from importlib.util import find_spec
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(__file__))
+
+import pygame
+import export
+from engine import Simulation
+from eventlog import log
+from replay import Replay
+
+
+def lzw_decode(data, min_size):
+    """Plain GIF LZW decoder, to check the encoder against."""
+    clear, end = 1 << min_size, (1 << min_size) + 1
+    size, pos, out = min_size + 1, 0, bytearray()
+    table, previous = None, None
+    total = len(data) * 8
+    while pos + size <= total:
+        code = int.from_bytes(data[pos >> 3:(pos >> 3) + 3].ljust(3, b"\0"), "little") >> (pos & 7) & ((1 << size) - 1)
+        pos += size
+        if code == clear:
+            table = [bytes([i]) for i in range(clear)] + [b"", b""]
+            size, previous = min_size + 1, None
+            continue
+        if code == end:
+            break
+        if previous is None:
+            entry = table[code]
+        else:
+            entry = table[code] if code < len(table) else previous + previous[:1]
+            table.append(previous + entry[:1])
+        out += entry
+        previous = entry
+        if len(table) == 1 << size and size < 12:
+            size += 1
+    return bytes(out)
+
+
+def gif_frames(path):
+    """Yield (delay, composited canvas of palette indices) for every frame of a GIF."""
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:6] == b"GIF89a"
+    width, height, flags = struct.unpack_from("<HHB", data, 6)
+    pos = 13 + 3 * (2 << (flags & 7))
+    canvas = bytearray(width * height)
+    delay = transparent = None
+    while data[pos] != 0x3B:
+        if data[pos] == 0x21:
+            label = data[pos + 1]
+            pos += 2
+            if label == 0xF9:
+                packed, delay, transparent = struct.unpack_from("<BHB", data, pos + 1)
+                transparent = transparent if packed & 1 else None
+            while data[pos]:
+                pos += data[pos] + 1
+            pos += 1
+            continue
+        left, top, w, h, _ = struct.unpack_from("<HHHHB", data, pos + 1)
+        pos += 10
+        min_size = data[pos]
+        pos += 1
+        stream = bytearray()
+        while data[pos]:
+            stream += data[pos + 1:pos + 1 + data[pos]]
+            pos += data[pos] + 1
+        pos += 1
+        pixels = lzw_decode(bytes(stream), min_size)
+        assert len(pixels) == w * h
+        for row in range(h):
+            for col in range(w):
+                value = pixels[row * w + col]
+                if value != transparent:
+                    canvas[(top + row) * width + left + col] = value
+        yield delay, bytes(canvas)
+
+
+def indices(writer, surface):
+    """What the writer's palette makes of a surface, as a canvas of indices."""
+    exact = {color: i for i, color in enumerate(export._palette()[:export.TRANSPARENT])}
+    out = bytearray()
+    for y in range(surface.get_height()):
+        for x in range(surface.get_width()):
+            r, g, b, _ = surface.get_at((x, y))
+            out.append(exact.get((r, g, b), writer._lut[(r >> 3) << 10 | (g >> 3) << 5 | b >> 3]))
+    return bytes(out)
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.log_level = log.level
+        log.set_level("off")
+        pygame.display.init()
+        self.screen = pygame.display.set_mode((64, 48))
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        log.set_level(self.log_level)
+        pygame.quit()
+
+    def test_lzw_round_trip(self):
+        """Long inputs cross every code size and the table reset at 4095 codes."""
+        data = bytes((i * 7919 >> 3) % 251 for i in range(60000)) + bytes(20000)
+        self.assertEqual(lzw_decode(bytes(export._lzw(data)), 8), data)
+
+    @unittest.skipIf(find_spec("numpy") is None, "numpy is not installed")
+    def test_gif_frames_decode_to_what_was_drawn(self):
+        path = os.path.join(self.dir, "clip.gif")
+        writer = export.GifWriter(path, 64, 48)
+        expected = []
+        for i in range(4):
+            self.screen.fill((15, 15, 20))
+            pygame.draw.rect(self.screen, (0, 220, 0), (i * 10, 10, 10, 10))
+            writer.write(self.screen, 0.1)
+            expected.append(indices(writer, self.screen))
+        writer.write(self.screen, 0.25)  # unchanged: the last frame just lasts longer
+        writer.close()
+
+        frames = list(gif_frames(path))
+        self.assertEqual([delay for delay, _ in frames], [10, 10, 10, 35])
+        self.assertEqual([canvas for _, canvas in frames], expected)
+
+    @unittest.skipIf(find_spec("numpy") is None, "numpy is not installed")
+    def test_palette_colors_are_kept_exactly(self):
+        """Pure black (the snake's eyes) stays black, not the darkest gray next to it."""
+        path = os.path.join(self.dir, "exact.gif")
+        writer = export.GifWriter(path, 64, 48)
+        self.screen.fill((0, 0, 0))
+        pygame.draw.rect(self.screen, (6, 6, 6), (0, 0, 10, 10))
+        pygame.draw.rect(self.screen, (51, 102, 153), (20, 0, 10, 10))
+        writer.write(self.screen, 0.1)
+        writer.close()
+
+        palette = export._palette()
+        (_, canvas), = gif_frames(path)
+        self.assertEqual(palette[canvas[64 * 30]], (0, 0, 0))
+        self.assertEqual(palette[canvas[0]], (6, 6, 6))
+        self.assertEqual(palette[canvas[20]], (51, 102, 153))
+
+    def test_png_export_of_a_replay(self):
+        """A replay renders through Game.draw, one PNG per tick in the asked range."""
+        sim = Simulation(seed=3)
+        sim.record_inputs = True
+        for _ in range(30):
+            sim.step()
+        replay = Replay.from_simulation(sim)
+        target = os.path.join(self.dir, "frames")
+        frames = export.export_replay(replay, target, start=10, end=20)
+        self.assertEqual(frames, 11)
+        names = sorted(os.listdir(target))
+        self.assertEqual(len(names), 11)
+        pygame.display.init()
+        self.assertEqual(pygame.image.load(os.path.join(target, names[0])).get_size(), (600, 600))
+
+    def test_huge_board_replays_export_through_the_camera(self):
+        """A replay without the HUD band is drawn like huge-board mode, not squeezed under a HUD."""
+        sim = Simulation(2000, 1600, top_margin=0, seed=4)
+        sim.record_inputs = True
+        for _ in range(5):
+            sim.step()
+        target = os.path.join(self.dir, "world")
+        self.assertEqual(export.export_replay(Replay.from_simulation(sim), target), 6)
+        pygame.display.init()
+        self.assertEqual(pygame.image.load(os.path.join(target, "frame_00000.png")).get_size(), (600, 600))
+        with self.assertRaises(ValueError):
+            export.export_replay(Replay(1, 600, 600, top_margin=10), target)
+
+    def test_saved_games_export_from_their_inputs(self):
+        sim = Simulation(seed=8)
+        sim.record_inputs = True
+        sim.turn((0, 20))
+        for _ in range(5):
+            sim.step()
+        replay = export.replay_from_snapshot(sim.snapshot())
+        self.assertEqual((replay.seed, replay.ticks, replay.inputs), (8, 5, [(0, (0, 20))]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+import freecells
+from freecells import FreeCells
+from engine import Simulation
+
+
+class TestFreeCells(unittest.TestCase):
+    def test_take_and_release(self):
+        """Taken cells leave the index and come back on release."""
+        cells = FreeCells([(0, 40), (20, 40), (40, 40)])
+        cells.take((20, 40))
+        self.assertEqual(len(cells), 2)
+        self.assertNotIn((20, 40), cells)
+        cells.release((20, 40))
+        self.assertIn((20, 40), cells)
+        self.assertEqual(len(cells), 3)
+
+    def test_sample_finds_last_free_cell(self):
+        """sample() always succeeds while one free cell is left."""
+        cells = FreeCells.for_board(100, 140, block_size=20, top_margin=40)
+        all_cells = [(x, y) for y in range(40, 140, 20) for x in range(0, 100, 20)]
+        for cell in all_cells[:-1]:
+            cells.take(cell)
+        self.assertEqual(cells.sample(), all_cells[-1])
+        cells.take(all_cells[-1])
+        self.assertIsNone(cells.sample())
+
+    def test_board_index_ignores_off_board_cells(self):
+        """The board index samples only free, on-board cells, and can be emptied and refilled."""
+        cells = freecells.for_board(60, 100, block_size=20, top_margin=40)
+        self.assertEqual(len(cells), 9)
+        for cell in [(0, 40), (20, 40), (40, 40), (0, 60), (20, 60), (40, 60), (0, 80), (20, 80)]:
+            cells.take(cell)
+        self.assertEqual(cells.sample(), (40, 80))
+        cells.take((40, 80))
+        self.assertIsNone(cells.sample())
+        cells.release((20, 60))
+        self.assertIn((20, 60), cells)
+        self.assertNotIn((60, 60), cells)
+
+    def test_board_index_ignores_take_order(self):
+        """The same taken cells give the same samples however they were taken, sparse or dense."""
+        cells = [(x, y) for y in range(40, 240, 20) for x in range(0, 200, 20)]
+        for count in (50, 95):
+            taken = random.Random(count).sample(cells, count)
+            forward = freecells.for_board(200, 240)
+            for cell in taken:
+                forward.take(cell)
+            backward = freecells.for_board(200, 240)
+            for cell in reversed(cells):
+                backward.take(cell)
+            for cell in set(cells) - set(taken):
+                backward.release(cell)
+            self.assertEqual(len(forward), 100 - count)
+            self.assertEqual(list(forward), [cell for cell in cells if cell not in taken])
+            for seed in range(20):
+                cell = forward.sample(random.Random(seed))
+                self.assertEqual(cell, backward.sample(random.Random(seed)))
+                self.assertIn(cell, forward)
+
+    def test_full_board_picks_follow_takes_and_releases(self):
+        """Past 7/8 full, picks come from the counts, which must track every change."""
+        cells = [(x, y) for y in range(40, 640, 20) for x in range(0, 600, 20)]
+        index = freecells.for_board(600, 640)
+        rng = random.Random(2)
+        for cell in cells[:880]:
+            index.take(cell)
+        index.sample(rng)  # the counts are built here...
+        free = set(cells[880:])
+        for _ in range(300):  # ...and kept up to date from then on
+            taken = rng.choice(cells)
+            if taken in free:
+                index.take(taken)
+                free.discard(taken)
+            else:
+                index.release(taken)
+                free.add(taken)
+            self.assertEqual(len(index), len(free))
+            self.assertIn(index.sample(rng), free)
+        self.assertEqual(set(index), free)
+        self.assertEqual({index.copy().sample(random.Random(seed)) for seed in range(2000)}, free)
+
+    def test_simulation_keeps_index_in_sync(self):
+        """Free cells never include the snake, the food or an obstacle."""
+        sim = Simulation()
+        for _ in range(50):
+            if not sim.step():
+                break
+            for cell in sim.snake.segments:
+                self.assertNotIn(cell, sim.free_cells)
+            self.assertNotIn((sim.food.x, sim.food.y), sim.free_cells)
+            for obs in sim.obstacles:
+                self.assertNotIn((obs.x, obs.y), sim.free_cells)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.dirname(__file__))
+
+import fuzz
+from eventlog import log, INFO
+from snake import Snake
+
+
+def reversing_change_direction(self, new_direction):
+    """A broken Snake.change_direction that lets the snake turn back on itself."""
+    self.turn_queue.append(new_direction)
+
+
+class TestFuzz(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(log.set_level, log.level)
+        log.set_level("off")
+
+    def test_the_rules_hold(self):
+        result = fuzz.run_fuzz(cases=150, workers=1)
+        self.assertEqual(result["cases"], 150)
+        self.assertGreater(result["ticks"], 150 * 10)
+        self.assertEqual(result["failures"], [])
+
+    def test_cases_do_not_depend_on_worker_count(self):
+        single = fuzz.run_fuzz(cases=60, seed=5, workers=1, chunk_size=16)
+        pooled = fuzz.run_fuzz(cases=60, seed=5, workers=2, chunk_size=16)
+        self.assertEqual(single, pooled)
+
+    def test_a_broken_rule_is_found_and_shrunk(self):
+        """Allowing reversals is caught, and the failure shrinks to the one reversing turn."""
+        with mock.patch.object(Snake, "change_direction", reversing_change_direction):
+            result = fuzz.run_fuzz(cases=50, workers=1, max_failures=1)
+            self.assertTrue(result["failures"])
+            failure = result["failures"][0]
+            self.assertEqual(failure["invariant"], "reversal")
+
+            shrunk = fuzz.shrink(failure)
+            self.assertTrue(shrunk["reproduced"])
+            self.assertEqual(len(shrunk["inputs"]), 1)
+            self.assertLessEqual(len(shrunk["inputs"]), len(failure["inputs"]))
+            self.assertEqual(fuzz.replay_failure(shrunk).invariant, "reversal")
+        self.assertIsNone(fuzz.replay_failure(shrunk))  # fixed again
+
+    def test_food_on_the_snake_is_caught(self):
+        """A respawn that ignores the free-cell index puts food on taken cells."""
+        sim_step = fuzz.Simulation.step
+
+        def step(sim, action=None):
+            running = sim_step(sim, action)
+            if running:
+                sim.food.x, sim.food.y = sim.snake.segments[-1]
+            return running
+
+        with mock.patch.object(fuzz.Simulation, "step", step):
+            ticks, inputs, violation = fuzz.play_case(fuzz.make_case(1))
+        self.assertEqual((ticks, violation.invariant), (1, "food"))
+
+    def test_single_process_run_keeps_the_callers_log(self):
+        """Worker setup silences the log, but only for the run itself."""
+        log.set_level(INFO)
+        fuzz.run_fuzz(cases=5, workers=1)
+        self.assertEqual(log.level, INFO)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from autopilot import Autopilot
+from engine import Simulation, Rules
+from levelmap import LevelMap
+from replay import Replay, ReplayPlayer
+from snapshot import Snapshot
+
+ART = """\
+##############################
+#............................#
+#..xxx.......................#
+#..xxx.......................#
+#.........S..................#
+#.................#..........#
+#.................#..........#
+#.................#..........#
+#............................#
+##############################
+"""
+
+
+class TestLevelMap(unittest.TestCase):
+    def setUp(self):
+        self.map = LevelMap.from_text(ART)
+
+    def test_text_art(self):
+        self.assertEqual((self.map.cols, self.map.rows), (30, 10))
+        self.assertEqual(self.map.wall_count(), 30 * 2 + 8 * 2 + 3)
+        self.assertEqual((self.map.spawn, self.map.direction), ((10, 4), 3))
+        self.assertEqual(self.map.zones, ((3, 2, 3, 2),))
+        self.assertTrue(self.map.is_wall(18, 6))
+        self.assertFalse(self.map.is_wall(17, 6))
+        self.assertEqual(self.map.to_text(), ART)
+
+    def test_spawn_must_be_on_the_map_and_clear_of_walls(self):
+        with self.assertRaises(ValueError):
+            LevelMap.from_text("S....\n.....\n")  # the body would trail off the left edge
+        with self.assertRaises(ValueError):
+            LevelMap.from_text(".#S..\n.....\n")  # ...or lie in a wall
+        bad = LevelMap(30, 10, spawn=(10, 0), direction=1)  # heading down from the top row
+        with self.assertRaises(ValueError):
+            Simulation(600, 240).load_map(bad)
+
+    def test_file_round_trip_is_memory_mapped(self):
+        path = os.path.join(tempfile.mkdtemp(), "level.prm")
+        self.map.save(path)
+        self.assertEqual(os.path.getsize(path), 16 + 8 + (30 * 10 + 7) // 8)
+        loaded = LevelMap.load(path)
+        self.assertIsInstance(loaded.bits, memoryview)
+        self.assertEqual(sorted(loaded.walls()), sorted(self.map.walls()))
+        self.assertEqual((loaded.spawn, loaded.zones), (self.map.spawn, self.map.zones))
+        with self.assertRaises(ValueError):
+            LevelMap.from_bytes(b"nope" + bytes(20))
+
+    def test_simulation_plays_on_the_map(self):
+        """Walls kill, never hold food or obstacles, and food stays out of the zones."""
+        sim = Simulation(600, 240, seed=1, rules=Rules(start_obstacles=20))
+        sim.load_map(self.map)
+        self.assertEqual(sim.snake.segments[0], (200, 120))
+        self.assertEqual(len(sim.obstacles), 20)
+        walls = set(sim.walls)
+        self.assertEqual(len(walls), self.map.wall_count())
+        self.assertFalse(walls & set(sim.obstacle_cells))
+        for _ in range(300):
+            food = (sim.food.x, sim.food.y)
+            self.assertNotIn(food, walls)
+            self.assertFalse(sim.walls.no_food(food))
+            sim._respawn_food_safely()
+
+        sim.reset(2)
+        sim.clear_obstacles()
+        while sim.step():
+            pass
+        self.assertEqual((sim.end_cause, sim.snake.segments[0]), ("wall", (580, 120)))
+
+    def test_food_finds_the_last_cell_outside_the_zones(self):
+        """When the random draws keep landing in zones, a scan still finds the free cell."""
+        sim = Simulation(600, 240, seed=5, rules=Rules(start_obstacles=0))
+        sim.load_map(LevelMap(30, 10, zones=[(0, 0, 30, 9), (0, 9, 29, 1)]))
+        self.assertEqual((sim.food.x, sim.food.y), sim.walls.cell(29, 9))
+        sim.free_cells.release((sim.food.x, sim.food.y))
+        sim.food.MAX_TRIES = 1
+        self.assertTrue(sim.food.respawn(sim.free_cells))
+        self.assertEqual((sim.food.x, sim.food.y), sim.walls.cell(29, 9))
+        self.assertFalse(sim.food.respawn(sim.free_cells))  # now taken by the food itself
+
+    def test_map_games_replay_and_resume_from_the_map_file(self):
+        """Replays and saves point at the map file, and refuse one that has changed."""
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "level.prm")
+        self.map.save(path)
+        sim = Simulation(600, 240, seed=6)
+        sim.load_map(LevelMap.load(path))
+        sim.record_inputs = True
+        pilot = Autopilot(budget=None)
+        while sim.ticks < 200 and sim.step(pilot.decide(sim)):
+            pass
+
+        replay = Replay.from_bytes(Replay.from_simulation(sim).to_bytes())
+        self.assertEqual(replay.level_map, (path, self.map.checksum()))
+        player = ReplayPlayer(replay)
+        self.assertEqual(list(player.play().snake.segments), list(sim.snake.segments))
+        self.assertTrue(player.matches_recording())
+
+        save = os.path.join(directory, "game.snap")
+        sim.snapshot().save(save)
+        resumed = Simulation.from_snapshot(Snapshot.load(save))
+        self.assertEqual(sorted(resumed.walls), sorted(sim.walls))
+        self.assertEqual(list(resumed.snake.segments), list(sim.snake.segments))
+
+        self.map.set_wall(1, 1)
+        self.map.save(path)
+        with self.assertRaises(ValueError):
+            ReplayPlayer(replay)
+        with self.assertRaises(ValueError):
+            Simulation.from_snapshot(Snapshot.load(save))
+
+        sim.load_map(self.map)  # built in memory, so there is no file to point at
+        with self.assertRaises(ValueError):
+            Replay.from_simulation(sim).to_bytes()
+
+    def test_autopilot_avoids_walls(self):
+        sim = Simulation(600, 240, seed=4, rules=Rules(start_obstacles=0))
+        sim.load_map(self.map)
+        pilot = Autopilot(budget=None)
+        for _ in range(300):
+            sim.turn(pilot.decide(sim) or sim.snake.direction)
+            if not sim.step():
+                break
+        self.assertNotEqual(sim.end_cause, "wall")
+
+    def test_game_draws_walls_from_the_background(self):
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        import pygame
+        from camera import WALL_COLOR
+        from game import Game
+
+        game = Game(level_map=self.map, seed=1)
+        self.assertEqual((game.width, game.height), (600, 240))
+        game.draw()
+        self.assertEqual(tuple(game.screen.get_at((365, 145)))[:3], WALL_COLOR)  # (18, 5) + HUD
+        # a map bigger than the window is played through the camera
+        big = LevelMap.from_text("\n".join(["#" * 80] + ["#" + "." * 78 + "#"] * 60 + ["#" * 80]))
+        game = Game(level_map=big, seed=1)
+        self.assertIsNotNone(game.camera)
+        game.draw()
+        self.assertEqual(tuple(game.play_background.get_at((300, 5)))[:3], (25, 25, 35))  # HUD, not a wall
+        camera = game.camera
+        x, y = camera.to_screen(0, camera.y + 100)  # the map's left wall, where the camera shows it
+        self.assertEqual(tuple(game.screen.get_at((x + 5, y + 5)))[:3], WALL_COLOR)
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    unittest.main()
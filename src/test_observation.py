@@ -0,0 +1,86 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+try:
+    import numpy as np
+except ImportError:  # observations are optional
+    np = None
+
+from engine import Simulation
+
+if np is not None:
+    from observation import Observation, HEAD, FOOD, SPECIAL, WALL
+
+RIGHT, LEFT, UP, DOWN = (20, 0), (-20, 0), (0, -20), (0, 20)
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestObservation(unittest.TestCase):
+    def test_channels_match_the_game(self):
+        sim = Simulation(seed=4)
+        obs = Observation(sim)
+        self.assertEqual(obs.tensor.shape, (6, 30, 30))
+        self.assertEqual(obs.head[10, 10], 1)           # (200, 200) px
+        self.assertEqual(obs.body.sum(), 3)
+        self.assertEqual(obs.obstacle.sum(), len(sim.obstacles))
+        self.assertEqual(obs.tensor[FOOD].sum() + obs.tensor[SPECIAL].sum(), 1)
+        self.assertTrue((obs.wall[:2] == 1).all() and obs.wall[2:].sum() == 0)
+
+    def test_incremental_updates_match_a_rebuild(self):
+        """Many games of random play: the in-place tensor always equals a fresh one."""
+        rng = random.Random(2)
+        sim = Simulation(seed=9)
+        obs = Observation(sim)
+        for _ in range(2000):
+            if sim.game_over:
+                sim.reset()
+            sim.step(rng.choice((RIGHT, LEFT, UP, DOWN, None)))
+            tensor = obs.update()
+            fresh = Observation(sim).tensor
+            self.assertTrue((tensor == fresh).all(), f"tick {sim.ticks}")
+        self.assertLess(obs.rebuilds, 100)  # only on new games
+
+    def test_restoring_another_game_at_the_same_tick_rebuilds(self):
+        """A restored snapshot from another board is noticed even when the tick count matches."""
+        sim, other = Simulation(seed=5), Simulation(seed=5)
+        obs = Observation(sim)
+        for _ in range(6):
+            sim.step(DOWN)
+            other.step()
+        obs.update()
+        sim.restore(other.snapshot())
+        self.assertTrue((obs.update() == Observation(sim).tensor).all())
+
+    def test_views_share_memory(self):
+        sim = Simulation(seed=1)
+        obs = Observation(sim, crop_radius=3)
+        tensor = obs.tensor
+        sim.step()
+        self.assertIs(obs.update(), tensor)
+        self.assertTrue(np.shares_memory(obs.crop(2), tensor))
+        self.assertEqual(obs.head[10, 11], 1)
+
+    def test_crop_pads_with_walls_and_turns_with_the_snake(self):
+        sim = Simulation(seed=1, rules=None)
+        sim.clear_obstacles()
+        sim.snake.teleport_to(0, 300)  # left edge, heading right
+        obs = Observation(sim, crop_radius=2)
+        window = obs.crop(2)
+        self.assertEqual(window.shape, (6, 5, 5))
+        self.assertEqual(window[HEAD, 2, 2], 1)
+        self.assertTrue((window[WALL, :, :2] == 1).all())
+        # heading right: turned so the board ahead is up and the wall behind is down
+        turned = obs.crop(2, rotate=True)
+        self.assertTrue((turned[WALL, 3:] == 1).all())
+        self.assertEqual(turned[WALL, :2].sum(), 0)
+        # a bigger window than reserved is a padded copy
+        self.assertEqual(obs.crop(4).shape, (6, 9, 9))
+        self.assertEqual(obs.crop(4)[HEAD, 4, 4], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,7 +14,7 @@ class TestObstacle(unittest.TestCase):
 
     @classmethod
     def setUpClass(cls):
-        pygame.init()
+        pygame.display.init()
 
     @classmethod
     def tearDownClass(cls):
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from profiler import FrameProfiler, PHASES, percentile
+
+
+class TestFrameProfiler(unittest.TestCase):
+    def test_percentile_nearest_rank(self):
+        """Percentiles pick values from the sorted samples."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.50), 51)
+        self.assertEqual(percentile(values, 0.99), 100)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_frames_are_recorded_per_phase(self):
+        """Each end_frame stores one sample per phase and one total."""
+        profiler = FrameProfiler(window=5)
+        for _ in range(8):
+            profiler.begin_frame()
+            for phase in PHASES:
+                profiler.mark(phase)
+            profiler.end_frame()
+        self.assertEqual(profiler.frames, 8)
+        self.assertEqual(len(profiler.totals), 5)  # rolling window
+        summary = profiler.summary()
+        self.assertEqual(set(summary["phases"]), set(PHASES))
+        self.assertEqual(sum(summary["histogram"].values()), 5)
+
+    def test_dump_json_and_csv(self):
+        """dump() writes JSON or CSV depending on the file name."""
+        profiler = FrameProfiler()
+        profiler.begin_frame()
+        profiler.mark("update")
+        profiler.end_frame()
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "profile.json")
+            csv_path = os.path.join(tmp, "profile.csv")
+            profiler.dump(json_path)
+            profiler.dump(csv_path)
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)["frames"], 1)
+            with open(csv_path) as f:
+                self.assertEqual(len(f.read().splitlines()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
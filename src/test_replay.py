@@ -0,0 +1,78 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from engine import Simulation
+from replay import Replay, ReplayPlayer
+
+DIRECTIONS = [(0, -20), (0, 20), (-20, 0), (20, 0)]
+
+
+def play_random_game(seed, max_ticks=2000):
+    """Record one game driven by random turns."""
+    rng = random.Random(seed)
+    sim = Simulation(seed=seed)
+    sim.record_inputs = True
+    while sim.ticks < max_ticks:
+        action = rng.choice(DIRECTIONS) if rng.random() < 0.3 else None
+        if not sim.step(action):
+            break
+    return sim
+
+
+class TestReplay(unittest.TestCase):
+    def test_same_seed_gives_same_board(self):
+        """Two games with the same seed start identically."""
+        a = Simulation(seed=42)
+        b = Simulation(seed=42)
+        self.assertEqual((a.food.x, a.food.y), (b.food.x, b.food.y))
+        self.assertEqual([(o.x, o.y) for o in a.obstacles], [(o.x, o.y) for o in b.obstacles])
+
+    def test_bytes_round_trip(self):
+        """Encoding and decoding keeps the seed and every input."""
+        sim = play_random_game(3)
+        replay = Replay.from_simulation(sim)
+        decoded = Replay.from_bytes(replay.to_bytes())
+        self.assertEqual(decoded.seed, replay.seed)
+        self.assertEqual(decoded.inputs, replay.inputs)
+        self.assertEqual((decoded.ticks, decoded.score), (sim.ticks, sim.score))
+
+    def test_any_seed_round_trips(self):
+        """Negative and huge seeds are valid for random.Random, so replays must keep them."""
+        for seed in (-7, -2 ** 70, 2 ** 70):
+            sim = Simulation(seed=seed)
+            sim.record_inputs = True
+            sim.step((0, 20))
+            decoded = Replay.from_bytes(Replay.from_simulation(sim).to_bytes())
+            self.assertEqual(decoded.seed, seed)
+            self.assertEqual(ReplayPlayer(decoded).play().ticks, sim.ticks)
+
+    def test_playback_reproduces_game(self):
+        """Replaying the inputs ends on the same tick, score and snake."""
+        for seed in range(5):
+            sim = play_random_game(seed)
+            player = ReplayPlayer(Replay.from_bytes(Replay.from_simulation(sim).to_bytes()))
+            replayed = player.play()
+            self.assertTrue(player.matches_recording())
+            self.assertEqual(list(replayed.snake.segments), list(sim.snake.segments))
+
+    def test_seek_backwards_uses_snapshots(self):
+        """Seeking back and forth lands on the same state as playing straight through."""
+        sim = play_random_game(11)
+        replay = Replay.from_simulation(sim)
+        target = sim.ticks // 2
+        straight = ReplayPlayer(replay, snapshot_every=10).play_to(target)
+
+        player = ReplayPlayer(replay, snapshot_every=10)
+        player.play()
+        seeked = player.seek(target)
+        self.assertEqual(seeked.ticks, target)
+        self.assertEqual(list(seeked.snake.segments), list(straight.snake.segments))
+        self.assertEqual(seeked.score, straight.score)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from engine import Rules
+from server import SharedBoard, GameServer, BoardClient
+
+
+def board_state(board):
+    return {str(p): list(s.segments) for p, s in board.snakes.items()}
+
+
+def mirror_state(client):
+    return {p: list(segments) for p, segments in client.snakes.items()}
+
+
+class TestSharedBoard(unittest.TestCase):
+    def test_deltas_keep_a_mirror_in_sync(self):
+        """Applying only the tick deltas reproduces the server's board."""
+        rng = random.Random(1)
+        board = SharedBoard(400, 400, seed=1)
+        client = BoardClient()
+        client.apply(board.full_state())
+        for player in range(1, 9):
+            board.spawn(player)
+        for _ in range(200):
+            for player in list(board.snakes):
+                if rng.random() < 0.3:
+                    board.turn(player, rng.choice([(0, -20), (0, 20), (-20, 0), (20, 0)]))
+            if rng.random() < 0.1:
+                board.spawn(rng.randrange(1, 12))
+            client.apply(json.loads(board.encode_delta(board.step())))
+            self.assertEqual(mirror_state(client), board_state(board))
+            self.assertEqual(client.food, board.food)
+
+
+class TestGameServer(unittest.TestCase):
+    def test_loopback_clients_follow_the_board(self):
+        """Clients over real sockets end up with the server's board."""
+        async def scenario():
+            server = GameServer(SharedBoard(400, 400, seed=3, rules=Rules(base_speed=100)), port=0)
+            await server.start()
+            clients = [BoardClient() for _ in range(3)]
+            for client in clients:
+                await client.connect(server.host, server.port)
+                client.send("S")
+            while clients[0].tick < 30:
+                await clients[0].receive()
+
+            server._ticker.cancel()  # freeze the board, then let everyone catch up
+            for client in clients:
+                while client.tick < server.board.ticks:
+                    await client.receive()
+                self.assertEqual(mirror_state(client), board_state(server.board))
+                self.assertEqual(client.food, server.board.food)
+            for client in clients:
+                await client.close()
+            await server.stop()
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -29,6 +29,59 @@ class TestSnake(unittest.TestCase):
         snake.move()
         self.assertEqual(len(snake.segments), original_length + 1)
 
+    def test_two_turns_in_one_tick_are_both_used(self):
+        """UP then LEFT before one move should turn up, then left on the next move"""
+        snake = Snake()
+        snake.change_direction((0, -20))
+        snake.change_direction((-20, 0))
+        snake.move()
+        self.assertEqual(snake.direction, (0, -20))
+        snake.move()
+        self.assertEqual(snake.direction, (-20, 0))
+
+    def test_reversal_checked_against_last_queued_turn(self):
+        """A press that reverses the last queued turn is ignored"""
+        snake = Snake()
+        snake.change_direction((0, -20))
+        snake.change_direction((0, 20))
+        self.assertEqual(list(snake.turn_queue), [(0, -20)])
+        snake.change_direction((-20, 0))  # fine after UP, although it reverses RIGHT
+        self.assertEqual(list(snake.turn_queue), [(0, -20), (-20, 0)])
+
+    def test_self_collision_when_head_turns_into_body(self):
+        """A long snake that turns back on itself should collide"""
+        snake = Snake()
+        for _ in range(3):
+            snake.grow()
+        for direction in [(20, 0), (0, 20), (-20, 0), (0, -20)]:
+            snake.change_direction(direction)
+            snake.move()
+        self.assertTrue(snake.check_self_collision())
+        self.assertTrue(snake.occupies(snake.segments[0]))
+
+    def test_segments_still_slice_like_a_list(self):
+        """segments[1:] is the body as a list, as it was before the deque"""
+        snake = Snake()
+        snake.move()
+        self.assertEqual(snake.segments[1:], [(200, 200), (180, 200)])
+        self.assertEqual(snake.segments[0], snake.head)
+
+    def test_segments_equal_a_list_of_the_same_cells(self):
+        snake = Snake()
+        self.assertTrue(snake.segments == [(200, 200), (180, 200), (160, 200)])
+        self.assertFalse(snake.segments != [(200, 200), (180, 200), (160, 200)])
+        self.assertNotEqual(snake.segments, [(200, 200), (180, 200)])
+
+    def test_assigning_segments_keeps_the_snake_consistent(self):
+        """A plain list assigned to segments is indexed like set_segments() would."""
+        snake = Snake()
+        snake.segments = [(300, 300), (280, 300), (260, 300)]
+        self.assertEqual(snake.head, (300, 300))
+        self.assertTrue(snake.occupies((260, 300)))
+        self.assertFalse(snake.occupies((200, 200)))
+        snake.move()
+        self.assertEqual(snake.segments, [(320, 300), (300, 300), (280, 300)])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from engine import Simulation
+from snapshot import Snapshot
+
+DIRECTIONS = [(0, -20), (0, 20), (-20, 0), (20, 0)]
+
+
+def state(sim):
+    """Everything that shows, for comparing two games."""
+    return (sim.ticks, sim.score, sim.level, sim.game_over, list(sim.snake.segments),
+            (sim.food.x, sim.food.y, sim.food.is_special), [(o.x, o.y) for o in sim.obstacles])
+
+
+def play(sim, moves):
+    for move in moves:
+        if not sim.step(move):
+            break
+    return state(sim)
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        self.moves = [rng.choice(DIRECTIONS) if rng.random() < 0.3 else None for _ in range(300)]
+        # a long snake with a few level-up obstacles makes a busier state
+        self.sim = Simulation(seed=8)
+        self.sim.snake.grow_pending = 20
+        self.sim.score = 55
+        self.sim._update_level()
+
+    def test_restore_replays_the_same_future(self):
+        """After restore, the same moves give the same game, food spawns included."""
+        snap = self.sim.snapshot()
+        first = play(self.sim, self.moves)
+        self.sim.restore(snap)
+        self.assertEqual(play(self.sim, self.moves), first)
+
+    def test_restore_rebuilds_the_free_cells(self):
+        """Snapshots don't carry the free-cell index; restore rebuilds the same one."""
+        play(self.sim, self.moves[:50])
+        free = len(self.sim.free_cells)
+        snap = self.sim.snapshot()
+        play(self.sim, self.moves[50:])
+        self.sim.restore(snap)
+        self.assertEqual(len(self.sim.free_cells), free)
+        for cell in self.sim.snake.segments:
+            self.assertNotIn(cell, self.sim.free_cells)
+        self.assertNotIn((self.sim.food.x, self.sim.food.y), self.sim.free_cells)
+
+    def test_clone_is_independent(self):
+        """Moving a clone leaves the original untouched."""
+        before = state(self.sim)
+        clone = self.sim.clone()
+        play(clone, self.moves)
+        self.assertEqual(state(self.sim), before)
+        self.assertEqual(play(self.sim, self.moves), state(clone))
+
+    def test_save_and_load(self):
+        """A snapshot survives a trip through a file, and resumes identically."""
+        self.sim.record_inputs = True
+        play(self.sim, self.moves[:40])
+        path = os.path.join(tempfile.mkdtemp(), "save.snap")
+        self.sim.snapshot().save(path)
+        expected = play(self.sim, self.moves[40:])
+
+        resumed = Simulation.from_snapshot(Snapshot.load(path))
+        self.assertEqual(resumed.inputs, self.sim.inputs[:len(resumed.inputs)])
+        self.assertEqual(play(resumed, self.moves[40:]), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.append(os.path.dirname(__file__))
+
+import pygame
+from sprites import SpriteAtlas
+
+
+class TestSpriteAtlas(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        pygame.display.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def test_atlas_is_built_once_per_palette(self):
+        """Asking twice for the same size and colors returns the same atlas."""
+        first = SpriteAtlas.get(20, (0, 220, 0), (0, 180, 0))
+        self.assertIs(first, SpriteAtlas.get(20, (0, 220, 0), (0, 180, 0)))
+        self.assertIsNot(first, SpriteAtlas.get(20, (0, 210, 255), (0, 150, 220)))
+
+    def test_head_sprite_follows_direction(self):
+        """Each direction gets its own head sprite, all one block in size."""
+        atlas = SpriteAtlas.get(20)
+        right = atlas.head((20, 0))
+        self.assertIs(right, atlas.head((1, 0)))
+        self.assertIsNot(right, atlas.head((0, -20)))
+        self.assertEqual(right.get_size(), (20, 20))
+        self.assertEqual(atlas.body.get_at((10, 10))[:3], (0, 180, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+from textcache import TextCache
+
+
+class CountingFont:
+    """Stands in for pygame.font.Font and counts render calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def render(self, text, antialias, color):
+        self.calls += 1
+        return (text, color)
+
+
+class TestTextCache(unittest.TestCase):
+    def test_same_text_is_rendered_once(self):
+        """Rendering the same string twice only rasterizes it once."""
+        font = CountingFont()
+        cache = TextCache()
+        first = cache.render(font, "Score: 5", (255, 255, 255))
+        second = cache.render(font, "Score: 5", (255, 255, 255))
+        self.assertIs(first, second)
+        self.assertEqual(font.calls, 1)
+        cache.render(font, "Score: 10", (255, 255, 255))
+        self.assertEqual(font.calls, 2)
+
+    def test_least_recently_used_is_evicted(self):
+        """The cache never grows past maxsize and drops the oldest entry."""
+        font = CountingFont()
+        cache = TextCache(maxsize=2)
+        cache.render(font, "a", (0, 0, 0))
+        cache.render(font, "b", (0, 0, 0))
+        cache.render(font, "a", (0, 0, 0))  # "a" is now most recent
+        cache.render(font, "c", (0, 0, 0))  # evicts "b"
+        self.assertEqual(len(cache), 2)
+        cache.render(font, "a", (0, 0, 0))
+        self.assertEqual(font.calls, 3)
+        cache.render(font, "b", (0, 0, 0))
+        self.assertEqual(font.calls, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
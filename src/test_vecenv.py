@@ -0,0 +1,110 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(__file__))
+
+try:
+    import numpy as np
+except ImportError:  # the batched environment is optional
+    np = None
+
+from engine import Rules
+
+if np is not None:
+    from vecenv import VecEnv, EMPTY, SNAKE, OBSTACLE, UP, DOWN, LEFT, RIGHT
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestVecEnv(unittest.TestCase):
+    def make(self, n=1, **rules):
+        rules.setdefault("start_obstacles", 0)
+        return VecEnv(n, seed=3, rules=Rules(**rules))
+
+    def put_food(self, env, i, row, col, special=False):
+        env.food[i] = row * env.cols + col
+        env.food_special[i] = special
+
+    def test_start_matches_the_game(self):
+        """Heads start at (200, 200) px heading right, length 3, with the start obstacles."""
+        env = VecEnv(4, seed=1)
+        self.assertTrue((env.head_row == 8).all() and (env.head_col == 10).all())
+        self.assertEqual(list(env.body_cells(0)), [250, 249, 248])
+        self.assertTrue(((env.occupancy == SNAKE).sum(axis=(1, 2)) == 3).all())
+        self.assertTrue(((env.occupancy == OBSTACLE).sum(axis=(1, 2)) == 3).all())
+
+    def test_small_boards_start_in_the_middle(self):
+        env = VecEnv(2, cols=6, rows=5, seed=1, rules=Rules(start_obstacles=0))
+        self.assertTrue((env.head_row == 2).all() and (env.head_col == 3).all())
+        self.assertEqual(list(env.body_cells(0)), [15, 14, 13])
+        with self.assertRaises(ValueError):
+            VecEnv(1, cols=3, rows=5)
+
+    def test_eating_grows_and_scores(self):
+        env = self.make()
+        self.put_food(env, 0, 8, 11)
+        rewards, dones = env.step([-1])
+        self.assertEqual((rewards[0], dones[0]), (5, False))
+        self.assertEqual(env.grow[0], 1)
+        env.step([-1])
+        self.assertEqual(env.length[0], 4)
+
+        self.put_food(env, 0, 8, 13, special=True)
+        rewards, _ = env.step([-1])
+        self.assertEqual((rewards[0], env.score[0], env.grow[0]), (20, 25, 3))
+
+    def test_level_up_adds_obstacles(self):
+        env = self.make()
+        env.score[0] = 15
+        self.put_food(env, 0, 8, 11)
+        env.step([-1])
+        self.assertEqual(env.level[0], 2)
+        self.assertEqual((env.occupancy[0] == OBSTACLE).sum(), 1)
+
+    def test_reversing_is_ignored(self):
+        env = self.make()
+        env.step([LEFT])
+        self.assertEqual((env.direction[0], env.head_col[0]), (RIGHT, 11))
+
+    def test_crashes_end_and_reset_games(self):
+        """Wall, obstacle and self crashes finish the game and the board starts over."""
+        env = self.make(3)
+        env.head_row[0] = 0
+        env.occupancy[1, 8, 11] = OBSTACLE
+        env.score[2] = 40
+        env.head_row[2] = 7  # pretend the body is right below: turning down hits it
+        env.occupancy[2, 8, 10] = SNAKE
+        rewards, dones = env.step([UP, -1, DOWN])
+        self.assertEqual(list(dones), [True, True, True])
+        self.assertEqual(env.final_score[2], 40)
+        self.assertEqual(env.episodes, 3)
+        self.assertTrue((env.length == 3).all() and (env.score == 0).all())
+
+    def test_chasing_the_tail_is_safe(self):
+        """A 4-long snake circling in a 2x2 square moves into its tail's cell every tick."""
+        env = self.make()
+        self.put_food(env, 0, 8, 11)
+        env.step([-1])
+        env.step([DOWN])  # length 4 now: (9,11) (8,11) (8,10) (8,9)
+        for action in (LEFT, UP, RIGHT, DOWN) * 3:
+            _, dones = env.step([action])
+            self.assertFalse(dones[0])
+
+    def test_invariants_over_random_play(self):
+        """The grid, the ring buffers and the scores stay consistent over many games."""
+        env = VecEnv(64, seed=7)
+        actions = np.random.default_rng(0)
+        for _ in range(500):
+            env.step(actions.integers(-1, 4, size=64))
+        self.assertGreater(env.episodes, 0)
+        for i in range(64):
+            body = env.body_cells(i)
+            self.assertEqual(len(set(body.tolist())), env.length[i])
+            self.assertTrue((env._occ[i, body] == SNAKE).all())
+            self.assertEqual((env._occ[i] == SNAKE).sum(), env.length[i])
+            self.assertEqual(env._occ[i, env.food[i]], EMPTY)
+            self.assertEqual(env.level[i], env.score[i] // 20 + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
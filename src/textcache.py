@@ -0,0 +1,38 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    Remembers rendered text surfaces so a string is only rasterized
+    once per (font, text, color). Keeps at most maxsize surfaces and
+    drops the least recently used one when full.
+    """
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, color, antialias=True):
+        """Same as font.render(text, antialias, color), but cached."""
+        key = (font, text, color, antialias)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.maxsize:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Forget every cached surface."""
+        self._surfaces.clear()
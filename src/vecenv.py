@@ -0,0 +1,198 @@
+"""
+Batched environment: thousands of independent boards stepped at once
+with NumPy, for training bots.
+
+Every board is a slice of the same structure-of-arrays state:
+
+    occupancy    (n, rows, cols) int8    EMPTY / SNAKE / OBSTACLE
+    body         (n, rows * cols) int32  ring buffer of cell indices, head at head_ptr
+    head_row/col, length, grow, direction, food, food_special, score, level, ticks
+
+Cells are numbered row * cols + col over the playable area (below the
+HUD band, so the default 30 x 28 board is the normal 600 x 600 game).
+The rules are the ones in engine.Simulation.step: walls, obstacles,
+self-collision (the tail moves out first), normal and special food,
+a level every points_per_level points with new obstacles, and finished
+games start over by themselves.
+
+Actions are direction codes: 0 up, 1 down, 2 left, 3 right, or -1 to
+keep going. Reversing is ignored, like in the game.
+"""
+import numpy as np
+
+from engine import Rules
+
+EMPTY, SNAKE, OBSTACLE = 0, 1, 2
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+ROW_STEP = np.array([-1, 1, 0, 0], dtype=np.int32)
+COL_STEP = np.array([0, 0, -1, 1], dtype=np.int32)
+OPPOSITE = np.array([DOWN, UP, RIGHT, LEFT], dtype=np.int8)
+
+
+class VecEnv:
+    """num_envs snake games in lockstep. step(actions) -> (rewards, dones)."""
+
+    def __init__(self, num_envs, cols=30, rows=28, seed=None, rules=None):
+        if cols < 4 or rows < 1:
+            raise ValueError(f"a {cols} x {rows} board has no room for a 3-long snake to move")
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.rules = rules or Rules()
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.occupancy = np.zeros((n, rows, cols), dtype=np.int8)
+        self._occ = self.occupancy.reshape(n, self.cells)  # flat view of the same memory
+        self.body = np.zeros((n, self.cells), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.head_row = np.zeros(n, dtype=np.int32)
+        self.head_col = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.grow = np.zeros(n, dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.food = np.zeros(n, dtype=np.int32)
+        self.food_special = np.zeros(n, dtype=bool)
+        self.score = np.zeros(n, dtype=np.int32)
+        self.level = np.zeros(n, dtype=np.int32)
+        self.ticks = np.zeros(n, dtype=np.int32)
+        self.final_score = np.zeros(n, dtype=np.int32)  # score of each board's last finished game
+        self.episodes = 0
+        self._all = np.arange(n)
+
+        self.reset()
+
+    def reset(self, envs=None):
+        """Start new games on the given boards (all of them by default)."""
+        envs = self._all if envs is None else envs
+        if len(envs) == 0:
+            return
+        self._occ[envs] = EMPTY
+        # the single-player start, length 3 heading right: the game's cell
+        # (10, 8) on boards that big, otherwise the middle of the board
+        row = min(8, self.rows // 2)
+        col = min(10, self.cols // 2)
+        start = [row * self.cols + col - 2, row * self.cols + col - 1, row * self.cols + col]
+        self.body[envs, :3] = start
+        for cell in start:
+            self._occ[envs, cell] = SNAKE
+        self.head_ptr[envs] = 2
+        self.head_row[envs] = row
+        self.head_col[envs] = col
+        self.length[envs] = 3
+        self.grow[envs] = 0
+        self.direction[envs] = RIGHT
+        self.score[envs] = 0
+        self.level[envs] = 1
+        self.ticks[envs] = 0
+
+        self.food[envs] = -1
+        self._respawn_food(envs)
+        for _ in range(self.rules.start_obstacles):
+            self._add_obstacles(envs)
+
+    # -- random placement -------------------------------------------------
+
+    def _free_cells(self, envs, tries=32):
+        """One random empty, food-free cell per board in envs (-1 if a board is full)."""
+        cells = self.rng.integers(0, self.cells, size=len(envs))
+        bad = (self._occ[envs, cells] != EMPTY) | (cells == self.food[envs])
+        for _ in range(tries):
+            if not bad.any():
+                return cells
+            redo = np.flatnonzero(bad)
+            cells[redo] = self.rng.integers(0, self.cells, size=len(redo))
+            bad[redo] = (self._occ[envs[redo], cells[redo]] != EMPTY) | (cells[redo] == self.food[envs[redo]])
+        # nearly full boards: pick from the actual free cells
+        for i in np.flatnonzero(bad):
+            free = np.flatnonzero(self._occ[envs[i]] == EMPTY)
+            free = free[free != self.food[envs[i]]]
+            cells[i] = self.rng.choice(free) if len(free) else -1
+        return cells
+
+    def _respawn_food(self, envs):
+        cells = self._free_cells(envs)
+        self.food[envs] = cells
+        self.food_special[envs] = self.rng.random(len(envs)) < self.rules.special_food_chance
+
+    def _add_obstacles(self, envs):
+        cells = self._free_cells(envs)
+        placed = cells >= 0
+        self._occ[envs[placed], cells[placed]] = OBSTACLE
+
+    # -- stepping ---------------------------------------------------------------
+
+    def step(self, actions=None):
+        """
+        Advance every board one tick. actions is an array of direction
+        codes (or -1) per board. Returns (rewards, dones): points scored
+        this tick and which games ended (those boards are already reset;
+        their score is in final_score).
+        """
+        n = self.num_envs
+        envs = self._all
+        rules = self.rules
+
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int8)
+            turn = (actions >= 0) & (actions != OPPOSITE[self.direction])
+            self.direction = np.where(turn, actions, self.direction)
+
+        new_row = self.head_row + ROW_STEP[self.direction]
+        new_col = self.head_col + COL_STEP[self.direction]
+        wall = (new_row < 0) | (new_row >= self.rows) | (new_col < 0) | (new_col >= self.cols)
+        new_head = np.where(wall, 0, new_row * self.cols + new_col)
+
+        # the tail moves out first (unless growing), so chasing it is safe
+        growing = self.grow > 0
+        moving = np.flatnonzero(~growing)
+        tails = self.body[moving, (self.head_ptr[moving] - self.length[moving] + 1) % self.cells]
+        self._occ[moving, tails] = EMPTY
+
+        hit = self._occ[envs, new_head]
+        dead = wall | (hit == OBSTACLE) | (hit == SNAKE)
+        alive = np.flatnonzero(~dead)
+
+        # move the heads of the survivors
+        head = new_head[alive]
+        self.head_ptr[alive] = (self.head_ptr[alive] + 1) % self.cells
+        self.body[alive, self.head_ptr[alive]] = head
+        self._occ[alive, head] = SNAKE
+        self.head_row[alive] = new_row[alive]
+        self.head_col[alive] = new_col[alive]
+        grew = alive[growing[alive]]
+        self.length[grew] += 1
+        self.grow[grew] -= 1
+        self.ticks += 1
+
+        # eating
+        rewards = np.zeros(n, dtype=np.int32)
+        eaters = alive[head == self.food[alive]]
+        if len(eaters):
+            special = self.food_special[eaters]
+            points = np.where(special, rules.special_food_points, rules.food_points)
+            self.grow[eaters] += np.where(special, rules.special_food_growth, 1)
+            self.score[eaters] += points
+            rewards[eaters] = points
+            self._respawn_food(eaters)
+
+            new_level = self.score[eaters] // rules.points_per_level + 1
+            leveled = eaters[new_level > self.level[eaters]]
+            self.level[eaters] = np.maximum(self.level[eaters], new_level)
+            for _ in range(rules.obstacles_per_level):
+                self._add_obstacles(leveled)
+
+        # finished games start over
+        done = np.flatnonzero(dead)
+        if len(done):
+            self.final_score[done] = self.score[done]
+            self.episodes += len(done)
+            self.reset(done)
+        return rewards, dead
+
+    def body_cells(self, env):
+        """The cells of one board's snake, head first (for checks and drawing)."""
+        ptr, length = self.head_ptr[env], self.length[env]
+        order = (ptr - np.arange(length)) % self.cells
+        return self.body[env, order]